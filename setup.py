@@ -24,6 +24,7 @@ setup(
         "dev": [
             "pytest",
             "pytest-cov",
+            "pytest-xdist",
             "flake8",
             "black",
             "mypy",
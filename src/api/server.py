@@ -778,8 +778,14 @@ def create_app(test_config=None):
         Returns:
             JSON: Installation status.
         """
-        installation_config = request.json
-        return jsonify(install_wizard.run_installation(installation_config))
+        installation_config = request.get_json(silent=True)
+        if not isinstance(installation_config, dict):
+            return jsonify({"status": "error", "message": "Installation configuration must be a JSON object"}), 400
+        
+        # "force" controls the run rather than being part of the configuration
+        installation_config = dict(installation_config)
+        force = bool(installation_config.pop('force', False))
+        return jsonify(install_wizard.run_installation(installation_config, force=force))
     
     @app.route('/debug', methods=['GET'])
     def debug():
@@ -10,12 +10,16 @@ This module provides a step-by-step installation wizard for setting up the Pi-PV
 """
 
 import os
+import json
 import time
+import hashlib
 import logging
 import subprocess
+import sys
 import platform
 import tempfile
-from typing import Dict, Any, List
+from collections import deque
+from typing import Dict, Any, List, Optional
 
 from src.core import config, docker_manager, storage_manager, network_manager, service_manager, system_info
 
@@ -52,6 +56,16 @@ INSTALLATION_STAGES = {
     "finalization": "Finalizing Installation"
 }
 
+# Most recent log entries kept for the installation status
+MAX_LOG_ENTRIES = 5000
+
+
+def _format_log_line(level: Optional[str], message: str) -> str:
+    """Format a message, stamped with the current time, as a status log line."""
+    prefix = f"{level}: " if level else ""
+    return f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {prefix}{message}"
+
+
 # Installation status tracking
 class InstallationStatus:
     def __init__(self):
@@ -59,10 +73,18 @@ class InstallationStatus:
         self.stage_progress = 0  # 0-100 for each stage
         self.overall_progress = 0  # 0-100 for overall installation
         self.status = "not_started"  # not_started, in_progress, completed, failed
-        self.logs = []
+        # Log lines are formatted once when added, so status polls only copy them
+        self._log_lines = deque(maxlen=MAX_LOG_ENTRIES)
         self.errors = []
+        self.warnings = set()  # distinct warning messages, for O(1) "did X fire?" checks
         self.start_time = None
         self.end_time = None
+        self.completed_steps = []  # step names checkpointed for resuming
+    
+    @property
+    def logs(self) -> List[str]:
+        """Formatted log lines, oldest first, for the most recent MAX_LOG_ENTRIES entries."""
+        return list(self._log_lines)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert installation status to a dictionary."""
@@ -81,17 +103,20 @@ class InstallationStatus:
     
     def add_log(self, message: str) -> None:
         """Add a log message."""
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        log_entry = f"[{timestamp}] {message}"
-        self.logs.append(log_entry)
+        self._log_lines.append(_format_log_line(None, message))
         logger.info(message)
     
+    def add_warning(self, warning: str) -> None:
+        """Add a warning message, also recorded in the set of warnings raised."""
+        self._log_lines.append(_format_log_line("WARNING", warning))
+        self.warnings.add(warning)
+        logger.warning(warning)
+    
     def add_error(self, error: str) -> None:
         """Add an error message."""
-        timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        error_entry = f"[{timestamp}] ERROR: {error}"
-        self.errors.append(error_entry)
-        self.logs.append(error_entry)
+        line = _format_log_line("ERROR", error)
+        self.errors.append(line)
+        self._log_lines.append(line)
         logger.error(error)
     
     def update_progress(self, stage: str, progress: int) -> None:
@@ -155,7 +180,9 @@ def check_system_compatibility() -> Dict[str, Any]:
         # Get system information
         _installation_status.update_progress("pre_check", 30)
         sys_info = system_info.get_system_info()
-        _installation_status.add_log(f"Retrieved system info: {sys_info}")
+        _installation_status.add_log("Retrieved system info")
+        # The full dump is only useful for debugging, so let logging format it lazily
+        logger.debug("Retrieved system info: %s", sys_info)
         
         # Memory check (minimum 2GB recommended)
         # Use pre-calculated GB values if available
@@ -329,7 +356,7 @@ def setup_network_configuration(network_config: Dict[str, Any]) -> Dict[str, Any
                 
                 if missing_vpn_fields:
                     warning_msg = f"VPN enabled but missing fields: {', '.join(missing_vpn_fields)}"
-                    _installation_status.add_log(f"WARNING: {warning_msg}")
+                    _installation_status.add_warning(warning_msg)
         
         # Update Tailscale configuration if provided
         if "tailscale" in network_config:
@@ -343,7 +370,7 @@ def setup_network_configuration(network_config: Dict[str, Any]) -> Dict[str, Any
             }
             
             if current_config["tailscale"]["enabled"] and not current_config["tailscale"]["auth_key"]:
-                _installation_status.add_log("WARNING: Tailscale enabled but no auth key provided")
+                _installation_status.add_warning("Tailscale enabled but no auth key provided")
         
         # Configure VPN through network manager if VPN is enabled
         if current_config["vpn"]["enabled"]:
@@ -423,7 +450,7 @@ def setup_storage_configuration(storage_config: Dict[str, Any]) -> Dict[str, Any
                             critical_mount_failures.append(error_msg)
                         continue
                     elif validation_result["status"] == "warning":
-                        _installation_status.add_log(f"WARNING: {validation_result.get('message')}")
+                        _installation_status.add_warning(str(validation_result.get('message')))
                     
                     # Attempt mounting with our enhanced mount_drive function
                     mount_result = storage_manager.mount_drive(
@@ -458,9 +485,9 @@ def setup_storage_configuration(storage_config: Dict[str, Any]) -> Dict[str, Any
                         _installation_status.add_log(f"Unmounting {mount_path} due to verification failure")
                         storage_manager.unmount_drive(mount_path)
                     elif verify_result["status"] == "warning":
-                        _installation_status.add_log(f"WARNING: {verify_result.get('message')}")
+                        _installation_status.add_warning(str(verify_result.get('message')))
                 else:
-                    _installation_status.add_log("WARNING: Skipping mount point with missing device or path")
+                    _installation_status.add_warning("Skipping mount point with missing device or path")
             
             # Block installation if critical mounts failed
             if critical_mount_failures:
@@ -567,7 +594,7 @@ def setup_storage_configuration(storage_config: Dict[str, Any]) -> Dict[str, Any
             elif share_type == "nfs" and shares:
                 _installation_status.add_log("Setting up NFS exports")
                 # Would need to implement NFS export configuration
-                _installation_status.add_log("WARNING: NFS export configuration not yet implemented")
+                _installation_status.add_warning("NFS export configuration not yet implemented")
         
         # Save updated configuration
         config.save_config_wrapper(current_config)
@@ -637,10 +664,10 @@ def setup_service_selection(services_config: Dict[str, Any]) -> Dict[str, Any]:
         has_media_server = any(merged_services["media_servers"].values())
         
         if not has_download_client:
-            _installation_status.add_log("WARNING: No download client selected")
+            _installation_status.add_warning("No download client selected")
         
         if not has_media_server:
-            _installation_status.add_log("WARNING: No media server selected")
+            _installation_status.add_warning("No media server selected")
         
         # Save services configuration
         config.save_services_config(merged_services)
@@ -687,7 +714,7 @@ def install_dependencies() -> Dict[str, Any]:
         
         if not has_sudo:
             warning_msg = "Not running as root and no sudo privileges. Some dependency installations may fail."
-            _installation_status.add_log(f"WARNING: {warning_msg}")
+            _installation_status.add_warning(warning_msg)
         
         _installation_status.update_progress("dependency_install", 30)
         
@@ -874,7 +901,7 @@ def setup_docker() -> Dict[str, Any]:
                                         subprocess.run(["sudo", "-n", "true"], check=True, capture_output=True)
                                         usermod_cmd = ["sudo"] + usermod_cmd
                                     except (subprocess.SubprocessError, FileNotFoundError):
-                                        _installation_status.add_log("WARNING: Unable to add user to docker group. You may need to run Docker commands with sudo.")
+                                        _installation_status.add_warning("Unable to add user to docker group. You may need to run Docker commands with sudo.")
                                         return {
                                             "status": "warning",
                                             "message": "Docker installed but user not added to docker group"
@@ -885,14 +912,14 @@ def setup_docker() -> Dict[str, Any]:
                                 _installation_status.add_log("NOTE: You may need to log out and back in for this change to take effect")
                             
                             except Exception as e:
-                                _installation_status.add_log(f"WARNING: Failed to add user to docker group: {str(e)}")
+                                _installation_status.add_warning(f"Failed to add user to docker group: {str(e)}")
                                 return {
                                     "status": "warning",
                                     "message": f"Docker installed but failed to add user to docker group: {str(e)}"
                                 }
             
             except Exception as e:
-                _installation_status.add_log(f"WARNING: Error during Docker group configuration: {str(e)}")
+                _installation_status.add_warning(f"Error during Docker group configuration: {str(e)}")
         
         _installation_status.update_progress("docker_setup", 90)
         
@@ -923,7 +950,7 @@ def setup_docker() -> Dict[str, Any]:
                         subprocess.run(["sudo", "-n", "true"], check=True, capture_output=True)
                         start_cmd = ["sudo"] + start_cmd
                     except (subprocess.SubprocessError, FileNotFoundError):
-                        _installation_status.add_log("WARNING: Unable to start Docker service. Please start it manually.")
+                        _installation_status.add_warning("Unable to start Docker service. Please start it manually.")
                         return {
                             "status": "warning",
                             "message": "Docker installed but service not started"
@@ -933,7 +960,7 @@ def setup_docker() -> Dict[str, Any]:
                 _installation_status.add_log("Docker service started")
         
         except Exception as e:
-            _installation_status.add_log(f"WARNING: Error checking/starting Docker service: {str(e)}")
+            _installation_status.add_warning(f"Error checking/starting Docker service: {str(e)}")
         
         _installation_status.update_progress("docker_setup", 100)
         _installation_status.add_log("Docker setup completed")
@@ -1137,9 +1164,9 @@ WantedBy=multi-user.target
                     subprocess.run(["systemctl", "enable", "pi-pvarr-mounts.service"], check=True)
                     _installation_status.add_log("Mount wait service installed and enabled")
                 except Exception as e:
-                    _installation_status.add_log(f"WARNING: Could not create systemd service: {str(e)}")
+                    _installation_status.add_warning(f"Could not create systemd service: {str(e)}")
             else:
-                _installation_status.add_log("WARNING: systemd not detected, mount wait service not installed")
+                _installation_status.add_warning("systemd not detected, mount wait service not installed")
                 
                 # Create a cron job as alternative
                 crontab_cmd = "@reboot /opt/pi-pvarr/bin/wait-for-mounts.sh >> /var/log/pi-pvarr/mount-check.log 2>&1"
@@ -1162,7 +1189,7 @@ WantedBy=multi-user.target
                         os.unlink(temp_name)
                         _installation_status.add_log("Mount wait script added to crontab")
                 except Exception as e:
-                    _installation_status.add_log(f"WARNING: Could not update crontab: {str(e)}")
+                    _installation_status.add_warning(f"Could not update crontab: {str(e)}")
         
         # Add any customizations for specific services here
         # For example, if Jellyfin is enabled and some specific configuration is needed
@@ -1243,12 +1270,100 @@ def finalize_installation() -> Dict[str, Any]:
         }
 
 
-def run_installation(installation_config: Dict[str, Any]) -> Dict[str, Any]:
+# Steps run by run_installation after the compatibility check:
+# (log message, step function name, installation_config key passed to the step).
+# They cannot run concurrently. The configuration steps each read-modify-write
+# the same config file, setup_docker and install_dependencies both take the
+# package manager lock, the container steps need the compose files, and a
+# failed configuration step must stop the run before any packages are installed.
+_INSTALLATION_STEPS = (
+    ("Step 2: Basic configuration setup", "setup_basic_configuration", "user_config"),
+    ("Step 3: Network configuration setup", "setup_network_configuration", "network_config"),
+    ("Step 4: Storage configuration setup", "setup_storage_configuration", "storage_config"),
+    ("Step 5: Service selection setup", "setup_service_selection", "services_config"),
+    ("Step 6: Installing dependencies", "install_dependencies", None),
+    ("Step 7: Setting up Docker", "setup_docker", None),
+    ("Step 8: Generating Docker Compose files", "generate_compose_files", None),
+    ("Step 9: Creating Docker containers", "create_containers", None),
+    ("Step 10: Post-installation configuration", "perform_post_installation", None),
+    ("Step 11: Finalizing installation", "finalize_installation", None)
+)
+
+
+def _get_install_state_file() -> str:
+    """
+    Get the path of the checkpoint file for an interrupted installation.
+    
+    Returns:
+        str: Path to install_state.json in the configuration directory.
+    """
+    return os.path.join(config.get_config_dir(), 'install_state.json')
+
+
+def _load_completed_steps(config_hash: str) -> List[str]:
+    """
+    Load the steps an interrupted run with the same configuration completed.
+    
+    Args:
+        config_hash (str): Hash of the installation configuration being run.
+    
+    Returns:
+        List[str]: Completed step names, or an empty list if there is no
+            checkpoint or it was written for a different configuration.
+    """
+    try:
+        with open(_get_install_state_file(), 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return []
+    
+    # A checkpoint of the wrong shape is stale, not a reason to fail the run
+    if not isinstance(state, dict) or state.get("config_hash") != config_hash:
+        return []
+    completed_steps = state.get("completed_steps")
+    return completed_steps if isinstance(completed_steps, list) else []
+
+
+def _checkpoint_step(step_name: str, config_hash: str) -> None:
+    """
+    Record a completed step so a resumed run can skip it.
+    
+    Args:
+        step_name (str): Name of the step that completed successfully.
+        config_hash (str): Hash of the installation configuration being run.
+    """
+    _installation_status.completed_steps.append(step_name)
+    
+    try:
+        state_file = _get_install_state_file()
+        config.ensure_config_dir_exists(os.path.dirname(state_file))
+        with open(state_file, 'w') as f:
+            json.dump({"config_hash": config_hash, "completed_steps": _installation_status.completed_steps}, f)
+    except IOError as e:
+        # A missing checkpoint only means a resumed run repeats this step
+        _installation_status.add_warning(f"Could not save installation checkpoint: {str(e)}")
+
+
+def _clear_checkpoint() -> None:
+    """Remove the checkpoint so the next run starts from the first step."""
+    try:
+        os.remove(_get_install_state_file())
+    except OSError:
+        # Nothing to clear, or the file cannot be removed; either way the
+        # config hash keeps a stale checkpoint from applying to a new run
+        pass
+
+
+def run_installation(installation_config: Dict[str, Any], force: bool = False) -> Dict[str, Any]:
     """
     Run the complete installation process.
     
+    Steps completed by an earlier, interrupted run with the same configuration
+    are skipped, so retrying after a failure resumes at the failed step.
+    
     Args:
         installation_config (Dict[str, Any]): Installation configuration.
+        force (bool, optional): Discard any checkpoint and run every step. Defaults to False.
     
     Returns:
         Dict[str, Any]: Dictionary with installation status.
@@ -1262,102 +1377,52 @@ def run_installation(installation_config: Dict[str, Any]) -> Dict[str, Any]:
     _installation_status.add_log("Starting installation process")
     
     try:
-        # Step 1: System compatibility check
-        _installation_status.add_log("Step 1: System compatibility check")
-        compatibility_result = check_system_compatibility()
-        
-        if compatibility_result.get("status") == "error":
-            _installation_status.status = "failed"
-            return get_installation_status()
-        
-        if not compatibility_result.get("compatible", True):
-            _installation_status.add_log("WARNING: System may not be fully compatible. Continuing anyway.")
-        
-        # Step 2: Basic configuration setup
-        _installation_status.add_log("Step 2: Basic configuration setup")
-        user_config = installation_config.get("user_config", {})
-        config_result = setup_basic_configuration(user_config)
-        
-        if config_result.get("status") == "error":
-            _installation_status.status = "failed"
-            return get_installation_status()
-        
-        # Step 3: Network configuration setup
-        _installation_status.add_log("Step 3: Network configuration setup")
-        network_config = installation_config.get("network_config", {})
-        network_result = setup_network_configuration(network_config)
-        
-        if network_result.get("status") == "error":
-            _installation_status.status = "failed"
-            return get_installation_status()
-        
-        # Step 4: Storage configuration setup
-        _installation_status.add_log("Step 4: Storage configuration setup")
-        storage_config = installation_config.get("storage_config", {})
-        storage_result = setup_storage_configuration(storage_config)
-        
-        if storage_result.get("status") == "error":
-            _installation_status.status = "failed"
-            return get_installation_status()
-        
-        # Step 5: Service selection setup
-        _installation_status.add_log("Step 5: Service selection setup")
-        services_config = installation_config.get("services_config", {})
-        services_result = setup_service_selection(services_config)
-        
-        if services_result.get("status") == "error":
-            _installation_status.status = "failed"
-            return get_installation_status()
-        
-        # Step 6: Install dependencies
-        _installation_status.add_log("Step 6: Installing dependencies")
-        dependencies_result = install_dependencies()
-        
-        if dependencies_result.get("status") == "error":
-            _installation_status.status = "failed"
-            return get_installation_status()
-        
-        # Step 7: Docker setup
-        _installation_status.add_log("Step 7: Setting up Docker")
-        docker_result = setup_docker()
-        
-        if docker_result.get("status") == "error":
-            _installation_status.status = "failed"
-            return get_installation_status()
-        
-        # Step 8: Generate Docker Compose files
-        _installation_status.add_log("Step 8: Generating Docker Compose files")
-        compose_result = generate_compose_files()
-        
-        if compose_result.get("status") == "error":
-            _installation_status.status = "failed"
-            return get_installation_status()
-        
-        # Step 9: Create Docker containers
-        _installation_status.add_log("Step 9: Creating Docker containers")
-        container_result = create_containers()
-        
-        if container_result.get("status") == "error":
-            _installation_status.status = "failed"
-            return get_installation_status()
-        
-        # Step 10: Post-installation configuration
-        _installation_status.add_log("Step 10: Post-installation configuration")
-        post_result = perform_post_installation()
-        
-        if post_result.get("status") == "error":
-            _installation_status.status = "failed"
-            return get_installation_status()
-        
-        # Step 11: Finalize installation
-        _installation_status.add_log("Step 11: Finalizing installation")
-        final_result = finalize_installation()
+        # A checkpoint only applies to a run with the same configuration
+        config_hash = hashlib.sha256(json.dumps(installation_config, sort_keys=True).encode()).hexdigest()
+        if force:
+            _clear_checkpoint()
+            resumed_steps = []
+        else:
+            resumed_steps = _load_completed_steps(config_hash)
         
-        if final_result.get("status") == "error":
-            _installation_status.status = "failed"
-            return get_installation_status()
+        # Step 1: System compatibility check
+        if "check_system_compatibility" in resumed_steps:
+            _installation_status.add_log("Step 1: System compatibility check already completed, skipping")
+            _installation_status.completed_steps.append("check_system_compatibility")
+        else:
+            _installation_status.add_log("Step 1: System compatibility check")
+            compatibility_result = check_system_compatibility()
+            
+            if compatibility_result.get("status") == "error":
+                _installation_status.status = "failed"
+                return get_installation_status()
+            
+            if not compatibility_result.get("compatible", True):
+                _installation_status.add_warning("System may not be fully compatible. Continuing anyway.")
+            
+            _checkpoint_step("check_system_compatibility", config_hash)
+        
+        # Steps 2-11 run strictly in order and stop at the first error
+        for log_message, step_name, config_key in _INSTALLATION_STEPS:
+            if step_name in resumed_steps:
+                _installation_status.add_log(f"{log_message} already completed, skipping")
+                _installation_status.completed_steps.append(step_name)
+                continue
+            
+            _installation_status.add_log(log_message)
+            
+            # Look the step up on this module at call time so tests can patch it
+            step = getattr(sys.modules[__name__], step_name)
+            step_result = step(installation_config.get(config_key, {})) if config_key else step()
+            
+            if step_result.get("status") == "error":
+                _installation_status.status = "failed"
+                return get_installation_status()
+            
+            _checkpoint_step(step_name, config_hash)
         
-        # Installation completed successfully
+        # Installation completed successfully, so the next run starts over
+        _clear_checkpoint()
         _installation_status.status = "completed"
         _installation_status.add_log("Installation process completed successfully")
         
@@ -1366,4 +1431,5 @@ def run_installation(installation_config: Dict[str, Any]) -> Dict[str, Any]:
     except Exception as e:
         error_msg = f"Unexpected error during installation: {str(e)}"
         _installation_status.add_error(error_msg)
-        _installation_status.status = "failed"        return get_installation_status()
+        _installation_status.status = "failed"
+        return get_installation_status()
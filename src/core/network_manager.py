@@ -10,10 +10,171 @@ This module provides functions to manage network-related functionality:
 
 import os
 import re
+import copy
 import json
+import socket
 import subprocess
+import time
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import psutil
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+# Use orjson to parse probe output when it is installed; its decode error
+# subclasses json.JSONDecodeError, so the handlers below catch both
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Conditionally import Docker client
+try:
+    import docker
+    DOCKER_AVAILABLE = True
+except ImportError:
+    DOCKER_AVAILABLE = False
+
+# Address families, resolved once instead of per address
+_AF_LINK = psutil.AF_LINK
+_AF_INET = socket.AF_INET
+_AF_INET6 = socket.AF_INET6
+
+# Seconds get_network_info waits for each network probe
+_PROBE_TIMEOUT = 15
+
+# Gluetun VPN_SERVICE_PROVIDER names for the short provider values sent by the
+# install wizard; any other provider name is passed through unchanged
+_VPN_PROVIDER_NAMES = {
+    'pia': 'private internet access'
+}
+
+# Commands run on every VPN and Tailscale poll
+_IPINFO_ARGV = ("curl", "-s", "https://ipinfo.io")
+_TAILSCALE_STATUS_ARGV = ("tailscale", "status", "--json")
+
+# Cached probe results keyed by function name: (monotonic timestamp, ttl, result)
+_TTL_CACHE: Dict[str, tuple] = {}
+
+
+def _ttl_cache(seconds: float, error_seconds: float = 0.5):
+    """
+    Cache a probe's result for a few seconds.
+    
+    VPN and Tailscale state changes on human timescales, so repeated polls
+    within the TTL reuse the last result instead of spawning new processes.
+    Error results are kept for the shorter error_seconds so a broken daemon
+    is not hammered but recovers quickly.
+    
+    Args:
+        seconds (float): How long a successful result is reused.
+        error_seconds (float): How long an error result is reused.
+    
+    Returns:
+        Callable: Decorator for argument-less probe functions.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper():
+            cached = _TTL_CACHE.get(func.__name__)
+            now = time.monotonic()
+            if cached and now - cached[0] < cached[1]:
+                result = cached[2]
+            else:
+                result = func()
+                is_error = isinstance(result, dict) and result.get('status') == 'error'
+                _TTL_CACHE[func.__name__] = (now, error_seconds if is_error else seconds, result)
+            
+            # Callers get their own deep copy so changing any nested dict
+            # cannot alter the cached result
+            return copy.deepcopy(result)
+        return wrapper
+    return decorator
+
+
+def _invalidate(*names: str) -> None:
+    """Drop the cached results of the named probes."""
+    for name in names:
+        _TTL_CACHE.pop(name, None)
+
+
+def _clear_cache() -> None:
+    """Drop all cached probe results."""
+    _TTL_CACHE.clear()
+    _parse_tailscale_status.cache_clear()
+
+
+# Docker client shared by the VPN probes, created on first use
+_docker_client = None
+
+
+def _get_docker_client():
+    """
+    Get the shared Docker client, connecting on first use.
+    
+    Returns:
+        docker.DockerClient: Client connected to the local Docker daemon.
+    """
+    global _docker_client
+    if _docker_client is None:
+        _docker_client = docker.from_env()
+    return _docker_client
+
+
+@_ttl_cache(seconds=1)
+def _net_if_addrs() -> Dict[str, List[Any]]:
+    """Get psutil interface addresses, shared by callers within one second."""
+    return psutil.net_if_addrs()
+
+
+@_ttl_cache(seconds=1)
+def _net_if_stats() -> Dict[str, Any]:
+    """Get psutil interface stats, shared by callers within one second."""
+    return psutil.net_if_stats()
+
+
+def _build_interface(name: str, addresses: List[Any], stats: Optional[Any]) -> Dict[str, Any]:
+    """
+    Build the details of one network interface from its psutil data.
+    
+    Args:
+        name (str): Interface name.
+        addresses (List[Any]): psutil addresses of the interface.
+        stats (Optional[Any]): psutil stats of the interface, if available.
+    
+    Returns:
+        Dict[str, Any]: Interface details.
+    """
+    mac = None
+    ip_addresses = []
+    
+    # Single pass over the addresses: the link address is the MAC, IPv4 and
+    # IPv6 addresses are listed (IPv6 has no broadcast address)
+    for addr in addresses:
+        family = addr.family
+        if family == _AF_LINK:
+            mac = addr.address
+        elif family == _AF_INET or family == _AF_INET6:
+            ip_addresses.append({
+                'address': addr.address,
+                'netmask': addr.netmask,
+                'broadcast': addr.broadcast if family == _AF_INET else None
+            })
+    
+    if name.startswith(('eth', 'en')):
+        interface_type = 'ethernet'
+    elif name.startswith('wl'):
+        interface_type = 'wireless'
+    else:
+        interface_type = 'other'
+    
+    return {
+        'addresses': ip_addresses,
+        'up': stats.isup if stats else False,
+        'speed': stats.speed if stats else 0,
+        'mtu': stats.mtu if stats else 0,
+        'mac': mac,
+        'type': interface_type
+    }
 
 
 def get_network_interfaces() -> Dict[str, Any]:
@@ -23,51 +184,25 @@ def get_network_interfaces() -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Dictionary with network interface information.
     """
-    interfaces = {}
-    
     try:
-        # Get all network interfaces using psutil
-        net_if_addrs = psutil.net_if_addrs()
-        net_if_stats = psutil.net_if_stats()
+        # Get all network interfaces using psutil; a burst of polls shares one
+        # getifaddrs/netlink read
+        net_if_addrs = _net_if_addrs()
+        net_if_stats = _net_if_stats()
         
-        for interface_name, addresses in net_if_addrs.items():
+        interfaces = {
+            interface_name: _build_interface(interface_name, addresses, net_if_stats.get(interface_name))
+            for interface_name, addresses in net_if_addrs.items()
             # Skip loopback and docker interfaces
-            if interface_name == 'lo' or interface_name.startswith('docker'):
-                continue
-            
-            # Initialize interface details
-            interfaces[interface_name] = {
-                'addresses': [],
-                'up': net_if_stats.get(interface_name, {}).isup if interface_name in net_if_stats else False,
-                'speed': net_if_stats.get(interface_name, {}).speed if interface_name in net_if_stats else 0,
-                'mtu': net_if_stats.get(interface_name, {}).mtu if interface_name in net_if_stats else 0,
-                'mac': None,
-                'type': 'ethernet' if interface_name.startswith('eth') or interface_name.startswith('en') else 
-                        'wireless' if interface_name.startswith('wlan') or interface_name.startswith('wl') else 'other'
-            }
-            
-            # Add addresses (IPv4, IPv6, MAC)
-            for addr in addresses:
-                if addr.family == psutil.AF_LINK:
-                    interfaces[interface_name]['mac'] = addr.address
-                elif addr.family == 2:  # IPv4
-                    interfaces[interface_name]['addresses'].append({
-                        'address': addr.address,
-                        'netmask': addr.netmask,
-                        'broadcast': addr.broadcast
-                    })
-                elif addr.family == 10:  # IPv6
-                    interfaces[interface_name]['addresses'].append({
-                        'address': addr.address,
-                        'netmask': addr.netmask,
-                        'broadcast': None
-                    })
+            if interface_name != 'lo' and not interface_name.startswith('docker')
+        }
     except Exception as e:
         return {'status': 'error', 'message': f"Error getting network interfaces: {str(e)}"}
     
     return {'status': 'success', 'interfaces': interfaces}
 
 
+@_ttl_cache(seconds=3)
 def get_vpn_status() -> Dict[str, Any]:
     """
     Get VPN connection status.
@@ -82,31 +217,23 @@ def get_vpn_status() -> Dict[str, Any]:
         'location': None
     }
     
+    if not DOCKER_AVAILABLE:
+        return {'status': 'error', 'message': "Docker Python SDK is not installed. VPN status is unavailable."}
+    
     try:
-        # Check if the gluetun container is running
-        gluetun_running = False
-        
-        docker_ps = subprocess.run(
-            ["docker", "ps", "--format", "{{.Names}}"],
-            capture_output=True, text=True, check=True
-        )
-        containers = docker_ps.stdout.splitlines()
+        # Check if a gluetun or other VPN container is running; the daemon
+        # matches any of the name filters, so no docker CLI process is needed
+        containers = _get_docker_client().containers.list(filters={'name': ['gluetun', 'vpn']})
         
-        for container in containers:
-            if 'gluetun' in container.lower() or 'vpn' in container.lower():
-                gluetun_running = True
-                result['provider'] = 'gluetun'
-                break
-        
-        if gluetun_running:
-            # Get the external IP address to verify VPN connection
-            curl_output = subprocess.run(
-                ["docker", "exec", container, "curl", "-s", "https://ipinfo.io"],
-                capture_output=True, text=True, check=True
-            )
+        if containers:
+            container = containers[0]
+            result['provider'] = 'gluetun'
+            
+            # Get the external IP address from inside the container to verify VPN connection
+            ipinfo_output = container.exec_run(_IPINFO_ARGV).output
             
             try:
-                ipinfo = json.loads(curl_output.stdout)
+                ipinfo = _json_loads(ipinfo_output)
                 result['connected'] = True
                 result['ip_address'] = ipinfo.get('ip')
                 result['location'] = f"{ipinfo.get('city', '')}, {ipinfo.get('country', '')}"
@@ -138,6 +265,7 @@ def configure_vpn(vpn_config: Dict[str, Any]) -> Dict[str, Any]:
         
         # Get required VPN parameters
         provider = vpn_config.get('provider', '').strip().lower()
+        provider = _VPN_PROVIDER_NAMES.get(provider, provider)
         username = vpn_config.get('username', '').strip()
         password = vpn_config.get('password', '').strip()
         region = vpn_config.get('region', '').strip()
@@ -163,8 +291,53 @@ def configure_vpn(vpn_config: Dict[str, Any]) -> Dict[str, Any]:
         
     except Exception as e:
         return {'status': 'error', 'message': f"Error configuring VPN: {str(e)}"}
+    finally:
+        # The next status poll must see the new configuration
+        _invalidate('get_vpn_status')
+
+
+@_ttl_cache(seconds=30)
+def _tailscale_installed() -> bool:
+    """
+    Check whether the tailscale binary is installed.
+    
+    Installing or removing Tailscale happens on human timescales, so the
+    result is reused for 30 seconds instead of being checked on every poll.
+    
+    Returns:
+        bool: True if /usr/bin/tailscale exists.
+    """
+    return os.path.exists('/usr/bin/tailscale')
+
+
+@functools.lru_cache(maxsize=4)
+def _parse_tailscale_status(stdout: str) -> Tuple[bool, Optional[str], Optional[str]]:
+    """
+    Extract the fields we report from `tailscale status --json` output.
+    
+    The output is usually identical between polls, so parsed results are
+    kept for the last few distinct outputs rather than re-parsing the JSON.
+    
+    Args:
+        stdout (str): Output of `tailscale status --json`.
+    
+    Returns:
+        Tuple[bool, Optional[str], Optional[str]]: Whether the backend is
+        running, the first Tailscale IP and the hostname.
+    
+    Raises:
+        json.JSONDecodeError: If the output is not valid JSON.
+    """
+    status_data = _json_loads(stdout)
+    self_info = status_data.get('Self', {})
+    return (
+        status_data.get('BackendState') == 'Running',
+        self_info.get('TailscaleIPs', [None])[0],
+        self_info.get('HostName')
+    )
 
 
+@_ttl_cache(seconds=3)
 def get_tailscale_status() -> Dict[str, Any]:
     """
     Get Tailscale VPN status.
@@ -181,24 +354,19 @@ def get_tailscale_status() -> Dict[str, Any]:
     
     try:
         # Check if tailscale is installed
-        result['installed'] = os.path.exists('/usr/bin/tailscale')
+        result['installed'] = _tailscale_installed()
         
         if result['installed']:
             # Check if tailscale is running
             tailscale_status = subprocess.run(
-                ["tailscale", "status", "--json"],
+                _TAILSCALE_STATUS_ARGV,
                 capture_output=True, text=True, check=False
             )
             
             if tailscale_status.returncode == 0:
                 try:
-                    status_data = json.loads(tailscale_status.stdout)
-                    result['running'] = status_data.get('BackendState') == 'Running'
-                    
-                    # Get self info
-                    self_info = status_data.get('Self', {})
-                    result['ip_address'] = self_info.get('TailscaleIPs', [None])[0]
-                    result['hostname'] = self_info.get('HostName')
+                    (result['running'], result['ip_address'],
+                     result['hostname']) = _parse_tailscale_status(tailscale_status.stdout)
                 except json.JSONDecodeError:
                     pass
         
@@ -248,6 +416,26 @@ def configure_tailscale(tailscale_config: Dict[str, Any]) -> Dict[str, Any]:
         
     except Exception as e:
         return {'status': 'error', 'message': f"Error configuring Tailscale: {str(e)}"}
+    finally:
+        # tailscale up/down changes the state, so the next poll must probe again
+        _invalidate('get_tailscale_status', '_tailscale_installed')
+
+
+def _probe_result(future, description: str) -> Dict[str, Any]:
+    """
+    Wait for a network probe and convert any exception into an error result.
+    
+    Args:
+        future: Future of a submitted network probe.
+        description (str): What the probe checks, used in the error message.
+    
+    Returns:
+        Dict[str, Any]: The probe result, or an error result if it raised.
+    """
+    try:
+        return future.result(timeout=_PROBE_TIMEOUT)
+    except Exception as e:
+        return {'status': 'error', 'message': f"Error getting {description}: {str(e)}"}
 
 
 def get_network_info() -> Dict[str, Any]:
@@ -257,14 +445,20 @@ def get_network_info() -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Dictionary with all network information.
     """
-    # Get interface information
-    interfaces_info = get_network_interfaces()
-    
-    # Get VPN status
-    vpn_status = get_vpn_status()
-    
-    # Get Tailscale status
-    tailscale_status = get_tailscale_status()
+    # The interface, VPN and Tailscale probes are independent, so run them
+    # concurrently. A probe that fails or times out is reported as an error
+    # without holding up the others, so the pool is not waited on at shutdown.
+    executor = ThreadPoolExecutor(max_workers=3)
+    try:
+        interfaces_future = executor.submit(get_network_interfaces)
+        vpn_future = executor.submit(get_vpn_status)
+        tailscale_future = executor.submit(get_tailscale_status)
+        
+        interfaces_info = _probe_result(interfaces_future, "network interfaces")
+        vpn_status = _probe_result(vpn_future, "VPN status")
+        tailscale_status = _probe_result(tailscale_future, "Tailscale status")
+    finally:
+        executor.shutdown(wait=False)
     
     # Combine all information
     network_info = {
@@ -272,4 +466,5 @@ def get_network_info() -> Dict[str, Any]:
         'vpn': vpn_status.get('vpn', {'connected': False, 'provider': None}),
         'tailscale': tailscale_status.get('tailscale', {'installed': False, 'running': False})
     }
-        return network_info
+    
+    return network_info
@@ -13,13 +13,52 @@ This module provides functions to retrieve system information such as:
 """
 
 import os
+import functools
 import platform
+import shutil
 import subprocess
 import re
+import threading
 import psutil
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 
 
+_THERMAL_ZONE_TEMP = '/sys/class/thermal/thermal_zone0/temp'
+
+# File descriptor kept open on the thermal zone so dashboard polls only cost
+# a pread; sysfs regenerates the value on every read from offset 0
+_temp_fd: Optional[int] = None
+_temp_fd_lock = threading.Lock()
+
+
+def _read_thermal_zone() -> float:
+    """
+    Read the thermal_zone0 temperature through the persistent descriptor.
+    
+    Returns:
+        float: Temperature in Celsius.
+    
+    Raises:
+        OSError: If the thermal zone cannot be opened or read.
+        ValueError: If the value is not a number.
+    """
+    global _temp_fd
+    with _temp_fd_lock:
+        if _temp_fd is None:
+            _temp_fd = os.open(_THERMAL_ZONE_TEMP, os.O_RDONLY)
+        fd = _temp_fd
+    try:
+        return int(os.pread(fd, 16, 0)) / 1000.0
+    except OSError:
+        # Drop the descriptor so the next call reopens the file
+        with _temp_fd_lock:
+            if _temp_fd == fd:
+                _temp_fd = None
+        os.close(fd)
+        raise
+
+
 def get_hostname() -> str:
     """
     Get the system hostname.
@@ -30,9 +69,13 @@ def get_hostname() -> str:
     return platform.node()
 
 
-def get_os_info() -> Dict[str, str]:
+@functools.lru_cache(maxsize=1)
+def _read_os_info() -> Dict[str, str]:
     """
-    Get information about the operating system.
+    Collect operating system details.
+    
+    The kernel release and os-release contents only change across a reboot,
+    so they are gathered once; callers get copies from get_os_info.
     
     Returns:
         Dict[str, str]: Dictionary containing OS name, release, and pretty name.
@@ -62,6 +105,16 @@ def get_os_info() -> Dict[str, str]:
     return os_info
 
 
+def get_os_info() -> Dict[str, str]:
+    """
+    Get information about the operating system.
+    
+    Returns:
+        Dict[str, str]: Dictionary containing OS name, release, and pretty name.
+    """
+    return dict(_read_os_info())
+
+
 def get_memory_info() -> Dict[str, Any]:
     """
     Get information about system memory usage.
@@ -145,20 +198,25 @@ def get_disk_info(path: str = '/') -> Dict[str, Any]:
         Dict[str, Any]: Dictionary containing disk total, free, used, and percentage.
     """
     try:
-        # Try using psutil first
-        disk = psutil.disk_usage(path)
+        # Read the filesystem statistics directly, computing the figures the
+        # way psutil.disk_usage does without its wrapper overhead
+        stats = os.statvfs(path)
+        total = stats.f_blocks * stats.f_frsize
+        free = stats.f_bavail * stats.f_frsize
+        used = (stats.f_blocks - stats.f_bfree) * stats.f_frsize
+        usable = used + free
         
         # Ensure we have valid values
-        if disk.total > 0:
+        if total > 0:
             return {
-                'total': disk.total,
-                'free': disk.free,
-                'used': disk.used,
-                'percent': disk.percent,
-                'source': 'psutil'
+                'total': total,
+                'free': free,
+                'used': used,
+                'percent': round(used / usable * 100, 1) if usable else 0,
+                'source': 'statvfs'
             }
         
-        # If disk.total is 0, try using df command on Linux
+        # If total is 0, try using df command on Linux
         if platform.system().lower() == 'linux':
             try:
                 output = subprocess.check_output(['df', '-B', '1', path], universal_newlines=True)
@@ -181,25 +239,6 @@ def get_disk_info(path: str = '/') -> Dict[str, Any]:
                         }
             except Exception as e:
                 print(f"Error running df command: {str(e)}")
-                
-        # Try looking at the statfs information
-        try:
-            import os
-            stats = os.statvfs(path)
-            total = stats.f_blocks * stats.f_frsize
-            free = stats.f_bfree * stats.f_frsize
-            used = total - free
-            percent = (used / total) * 100 if total > 0 else 0
-            
-            return {
-                'total': total,
-                'free': free,
-                'used': used,
-                'percent': percent,
-                'source': 'statvfs'
-            }
-        except Exception as e:
-            print(f"Error using statvfs: {str(e)}")
     
     except Exception as e:
         print(f"Error getting disk info: {str(e)}")
@@ -214,6 +253,17 @@ def get_disk_info(path: str = '/') -> Dict[str, Any]:
     }
 
 
+@functools.lru_cache(maxsize=1)
+def _get_cpu_model() -> str:
+    """
+    Get the CPU model, which cannot change while the process runs.
+    
+    Returns:
+        str: The processor name reported by the platform.
+    """
+    return platform.processor()
+
+
 def get_cpu_info() -> Dict[str, Any]:
     """
     Get information about the CPU.
@@ -222,7 +272,7 @@ def get_cpu_info() -> Dict[str, Any]:
         Dict[str, Any]: Dictionary containing CPU model, cores, and usage percentage.
     """
     return {
-        'model': platform.processor(),
+        'model': _get_cpu_model(),
         'cores': os.cpu_count() or 1,
         'percent': psutil.cpu_percent(interval=0.5)
     }
@@ -236,13 +286,10 @@ def get_temperature() -> Optional[float]:
         Optional[float]: CPU temperature in Celsius, or None if not available.
     """
     # Try to get temperature from thermal_zone0 (Linux)
-    if os.path.exists('/sys/class/thermal/thermal_zone0/temp'):
-        try:
-            with open('/sys/class/thermal/thermal_zone0/temp', 'r') as f:
-                temp = float(f.read().strip()) / 1000.0
-                return temp
-        except Exception:
-            pass
+    try:
+        return _read_thermal_zone()
+    except Exception:
+        pass
     
     # Try using vcgencmd for Raspberry Pi
     if os.path.exists('/usr/bin/vcgencmd'):
@@ -257,6 +304,28 @@ def get_temperature() -> Optional[float]:
     return None
 
 
+@functools.lru_cache(maxsize=1)
+def _read_device_model() -> Optional[str]:
+    """
+    Read the device tree model string.
+    
+    The hardware model cannot change while the process runs, so it is read
+    once and reused by every later Raspberry Pi check.
+    
+    Returns:
+        Optional[str]: The model string, or None if it is not available.
+    """
+    if os.path.exists('/proc/device-tree/model'):
+        try:
+            # The model is a single short NUL-terminated string
+            with open('/proc/device-tree/model', 'rb') as f:
+                return f.read(128).decode('utf-8', 'replace').strip('\0').strip()
+        except Exception:
+            pass
+    
+    return None
+
+
 def is_raspberry_pi() -> Dict[str, Any]:
     """
     Check if the system is a Raspberry Pi.
@@ -269,16 +338,11 @@ def is_raspberry_pi() -> Dict[str, Any]:
         'model': 'Not a Raspberry Pi'
     }
     
-    # Check for Raspberry Pi model file
-    if os.path.exists('/proc/device-tree/model'):
-        try:
-            with open('/proc/device-tree/model', 'r') as f:
-                model = f.read().strip('\0').strip()
-                if 'raspberry pi' in model.lower():
-                    result['is_raspberry_pi'] = True
-                    result['model'] = model
-        except Exception:
-            pass
+    # Check the Raspberry Pi model file
+    model = _read_device_model()
+    if model and 'raspberry pi' in model.lower():
+        result['is_raspberry_pi'] = True
+        result['model'] = model
     
     return result
 
@@ -290,14 +354,9 @@ def is_docker_installed() -> bool:
     Returns:
         bool: True if Docker is installed, False otherwise.
     """
-    try:
-        subprocess.run(['docker', '--version'], 
-                      check=True, 
-                      stdout=subprocess.PIPE, 
-                      stderr=subprocess.PIPE)
-        return True
-    except Exception:
-        return False
+    # Looking the binary up on PATH answers the question without forking
+    # `docker --version`
+    return shutil.which('docker') is not None
 
 
 def is_tailscale_installed() -> bool:
@@ -352,16 +411,31 @@ def get_system_info() -> Dict[str, Any]:
         Dict[str, Any]: Dictionary containing all system information.
     """
     try:
-        hostname = get_hostname()
-        os_info = get_os_info()
-        memory_info = get_memory_info()
-        disk_info = get_disk_info('/')
-        cpu_info = get_cpu_info()
-        temperature = get_temperature()
-        raspberry_pi_info = is_raspberry_pi()
-        docker_installed = is_docker_installed()
-        tailscale_installed = is_tailscale_installed()
-        network_info = get_network_info()
+        # The probes are independent and mostly wait on the kernel, a
+        # subprocess or the CPU sampling interval, so run them side by side.
+        # A probe that raises re-raises here and takes the fallback below.
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            hostname_future = executor.submit(get_hostname)
+            os_info_future = executor.submit(get_os_info)
+            memory_info_future = executor.submit(get_memory_info)
+            disk_info_future = executor.submit(get_disk_info, '/')
+            cpu_info_future = executor.submit(get_cpu_info)
+            temperature_future = executor.submit(get_temperature)
+            raspberry_pi_future = executor.submit(is_raspberry_pi)
+            docker_installed_future = executor.submit(is_docker_installed)
+            tailscale_installed_future = executor.submit(is_tailscale_installed)
+            network_info_future = executor.submit(get_network_info)
+            
+            hostname = hostname_future.result()
+            os_info = os_info_future.result()
+            memory_info = memory_info_future.result()
+            disk_info = disk_info_future.result()
+            cpu_info = cpu_info_future.result()
+            temperature = temperature_future.result()
+            raspberry_pi_info = raspberry_pi_future.result()
+            docker_installed = docker_installed_future.result()
+            tailscale_installed = tailscale_installed_future.result()
+            network_info = network_info_future.result()
         
         # Calculate memory values in GB for easier display
         memory_total_gb = round(memory_info['total'] / (1024.0 ** 3), 1) if memory_info['total'] > 0 else 0
@@ -7,13 +7,118 @@ This module contains shared fixtures and configuration for all tests.
 import pytest
 import os
 import sys
+from werkzeug.test import EnvironBuilder
 
 # Add the root directory to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(
     os.path.dirname(__file__), '..')))
 
+from src.api.server import create_app  # noqa: E402
+from src.core import install_wizard  # noqa: E402
+
 
 # Add shared fixtures here
+@pytest.fixture(scope="session")
+def app():
+    """
+    Create the Flask application once per test session.
+
+    Tests stub the core modules with mocks rather than mutating app state,
+    so a single app can safely be shared by every API test.
+    """
+    return create_app({"TESTING": True})
+
+
+@pytest.fixture(scope="session")
+def _client(app):
+    """Create the Flask test client once per test session."""
+    return app.test_client()
+
+
+@pytest.fixture
+def client(_client):
+    """Flask test client for the shared application, with cookies cleared."""
+    if _client.cookie_jar is not None:
+        _client.cookie_jar.clear()
+    return _client
+
+
+@pytest.fixture
+def wsgi_get(app):
+    """
+    Issue a GET straight to the shared app's WSGI callable.
+
+    Skips the test client's cookie jar and response wrapping for tests that
+    only need the status code and raw body. Returns (status_code, body).
+    """
+    def get(path):
+        environ = EnvironBuilder(method='GET', path=path).get_environ()
+        status = []
+
+        def start_response(status_line, headers, exc_info=None):
+            status.append(int(status_line.split(' ', 1)[0]))
+
+        body = b''.join(app.wsgi_app(environ, start_response))
+        return status[0], body
+
+    return get
+
+
+class Recorder:
+    """
+    Callable stand-in that records its calls and returns a fixed value.
+
+    A lighter alternative to MagicMock for patched functions whose calls are
+    only counted or inspected; call_args and call_count mirror MagicMock's.
+    """
+
+    def __init__(self, return_value=None):
+        self.return_value = return_value
+        self.calls = []
+
+    def __call__(self, *args, **kwargs):
+        self.calls.append((args, kwargs))
+        return self.return_value
+
+    @property
+    def call_args(self):
+        """The (args, kwargs) of the most recent call, or None if never called."""
+        return self.calls[-1] if self.calls else None
+
+    @property
+    def call_count(self):
+        """The number of times the recorder has been called."""
+        return len(self.calls)
+
+
+@pytest.fixture(scope="session")
+def recorder():
+    """The Recorder class, for creating call-recording stand-ins in tests."""
+    return Recorder
+
+
+def _assert_ok(result, message=None):
+    """Assert that a core function result succeeded, optionally with an exact message."""
+    assert result["status"] == "success", result.get("message")
+    if message is not None:
+        assert result["message"] == message
+
+
+@pytest.fixture(scope="session")
+def assert_ok():
+    """Helper asserting a successful core function result and, optionally, its message."""
+    return _assert_ok
+
+
+# Each xdist worker imports its own install_wizard module and this fixture resets
+# its global status, so no test needs an xdist_group to avoid aliasing it
+@pytest.fixture(autouse=True)
+def installation_status():
+    """Give every test a fresh global installation status."""
+    install_wizard._installation_status = install_wizard.InstallationStatus()
+    return install_wizard._installation_status
+
+
 @pytest.fixture
 def temp_dir(tmpdir):
     """Create a temporary directory for test files."""
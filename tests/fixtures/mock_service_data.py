@@ -0,0 +1,143 @@
+"""
+Mock data for service manager tests.
+"""
+
+from typing import Dict, Any
+
+
+def get_mock_service_info() -> Dict[str, Any]:
+    """
+    Get mock service information grouped by category.
+    
+    Returns:
+        Dict[str, Any]: Mock service information data.
+    """
+    return {
+        "arr_apps": {
+            "sonarr": {
+                "name": "sonarr",
+                "enabled": True,
+                "description": "TV Series Management",
+                "default_port": 8989,
+                "docker_image": "linuxserver/sonarr:latest",
+                "status": "running",
+                "url": "http://localhost:8989",
+                "ports": [{"container": "8989", "host": "8989", "protocol": "tcp"}]
+            },
+            "radarr": {
+                "name": "radarr",
+                "enabled": True,
+                "description": "Movie Management",
+                "default_port": 7878,
+                "docker_image": "linuxserver/radarr:latest",
+                "status": "running",
+                "url": "http://localhost:7878",
+                "ports": [{"container": "7878", "host": "7878", "protocol": "tcp"}]
+            }
+        },
+        "download_clients": {
+            "transmission": {
+                "name": "transmission",
+                "enabled": True,
+                "description": "Torrent Client",
+                "default_port": 9091,
+                "docker_image": "linuxserver/transmission:latest",
+                "status": "running",
+                "url": "http://localhost:9091",
+                "ports": [{"container": "9091", "host": "9091", "protocol": "tcp"}]
+            }
+        },
+        "media_servers": {
+            "jellyfin": {
+                "name": "jellyfin",
+                "enabled": True,
+                "description": "Media Server",
+                "default_port": 8096,
+                "docker_image": "linuxserver/jellyfin:latest",
+                "status": "running",
+                "url": "http://localhost:8096",
+                "ports": [{"container": "8096", "host": "8096", "protocol": "tcp"}]
+            }
+        },
+        "utilities": {
+            "portainer": {
+                "name": "portainer",
+                "enabled": True,
+                "description": "Docker Management",
+                "default_port": 9000,
+                "docker_image": "portainer/portainer-ce:latest",
+                "status": "running",
+                "url": "http://localhost:9000",
+                "ports": [{"container": "9000", "host": "9000", "protocol": "tcp"}]
+            }
+        }
+    }
+
+
+def get_mock_compatibility_info() -> Dict[str, Any]:
+    """
+    Get mock service compatibility information.
+    
+    Returns:
+        Dict[str, Any]: Mock compatibility information data.
+    """
+    return {
+        "status": "success",
+        "system_info": {
+            "architecture": "aarch64",
+            "memory_gb": 4,
+            "is_raspberry_pi": True,
+            "pi_model": "Raspberry Pi 4 Model B Rev 1.2",
+            "has_hw_transcoding": True
+        },
+        "compatibility": {
+            "media_servers": {
+                "jellyfin": {
+                    "compatible": True,
+                    "recommended": True,
+                    "notes": "Recommended for ARM platforms"
+                },
+                "plex": {
+                    "compatible": True,
+                    "recommended": False,
+                    "notes": "Limited transcoding on ARM platforms"
+                }
+            },
+            "arr_apps": {
+                "sonarr": {"compatible": True, "recommended": True, "notes": "Core service"},
+                "radarr": {"compatible": True, "recommended": True, "notes": "Core service"}
+            }
+        }
+    }
+
+
+def get_mock_docker_compose_result() -> Dict[str, Any]:
+    """
+    Get mock Docker Compose generation result.
+    
+    Returns:
+        Dict[str, Any]: Mock Docker Compose result data.
+    """
+    return {
+        "status": "success",
+        "message": "Docker Compose file generated successfully",
+        "compose_file": "version: '3.7'\nservices:\n  sonarr:\n    image: linuxserver/sonarr:latest\n",
+        "temp_file_path": "/tmp/docker-compose-12345.yml"
+    }
+
+
+def get_mock_service_installation_status() -> Dict[str, Any]:
+    """
+    Get mock service installation status.
+    
+    Returns:
+        Dict[str, Any]: Mock service installation status data.
+    """
+    return {
+        "status": "success",
+        "installation_status": "running",
+        "compose_file_exists": True,
+        "active_services": 5,
+        "enabled_services": 6,
+        "service_info": {}  # This would contain the full service info, omitted for brevity
+    }
@@ -6,17 +6,32 @@ These tests verify the complete end-to-end flow of key API operations.
 
 import json
 import pytest
+from types import MappingProxyType
 from unittest.mock import patch, MagicMock
 
-from src.api.server import create_app
 
+# Installation status updates returned by successive status polls. Built once
+# at import and frozen, since the tests only ever read them.
+_STATUS_UPDATES = tuple(MappingProxyType(update) for update in (
+    {"current_stage": "pre_check", "overall_progress": 5, "status": "in_progress"},
+    {"current_stage": "config_setup", "overall_progress": 10, "status": "in_progress"},
+    {"current_stage": "network_setup", "overall_progress": 15, "status": "in_progress"},
+    {"current_stage": "storage_setup", "overall_progress": 25, "status": "in_progress"},
+    {"current_stage": "service_selection", "overall_progress": 30, "status": "in_progress"},
+    {"current_stage": "dependency_install", "overall_progress": 40, "status": "in_progress"},
+    {"current_stage": "docker_setup", "overall_progress": 55, "status": "in_progress"},
+    {"current_stage": "compose_generation", "overall_progress": 65, "status": "in_progress"},
+    {"current_stage": "container_creation", "overall_progress": 80, "status": "in_progress"},
+    {"current_stage": "post_install", "overall_progress": 90, "status": "in_progress"},
+    {"current_stage": "finalization", "overall_progress": 100, "status": "completed"}
+))
 
-@pytest.fixture
-def client():
-    """Test client fixture."""
-    app = create_app({"TESTING": True})
-    with app.test_client() as client:
-        yield client
+_INSTALLATION_LOGS = (
+    "[2023-08-04 12:30:45] Starting installation process",
+    "[2023-08-04 12:30:46] Step 1: System compatibility check",
+    "[2023-08-04 12:31:15] Step 2: Basic configuration setup",
+    "[2023-08-04 12:32:05] Installation process completed successfully"
+)
 
 
 class TestDashboardFlow:
@@ -88,13 +103,11 @@ class TestDashboardFlow:
             assert "eth0" in network_data["interfaces"]
 
 
-class TestInstallWizardFlow:
-    """Tests for installation wizard flow."""
-
-    def test_complete_installation_flow(self, client):
-        """Test the complete installation wizard flow."""
-        # Mock responses for installation steps
-        compatibility_check = {
+@pytest.fixture(scope='module')
+def install_mocks():
+    """Mock results for each installation wizard step, keyed by function name."""
+    return {
+        "check_system_compatibility": {
             "status": "success",
             "compatible": True,
             "checks": {
@@ -102,72 +115,89 @@ class TestInstallWizardFlow:
                 "disk_space": {"compatible": True},
                 "docker": {"installed": False}
             }
-        }
-        
-        config_result = {
+        },
+        "setup_basic_configuration": {
             "status": "success",
             "message": "Basic configuration setup completed"
-        }
-        
-        network_result = {
+        },
+        "setup_network_configuration": {
             "status": "success",
             "message": "Network configuration setup completed"
-        }
-        
-        storage_result = {
+        },
+        "setup_storage_configuration": {
             "status": "success",
             "message": "Storage configuration setup completed"
-        }
-        
-        services_result = {
+        },
+        "setup_service_selection": {
             "status": "success",
             "message": "Service selection setup completed"
-        }
-        
-        dependencies_result = {
+        },
+        "install_dependencies": {
             "status": "success",
             "message": "Dependencies installed successfully"
-        }
-        
-        docker_result = {
+        },
+        "setup_docker": {
             "status": "success",
             "message": "Docker setup completed successfully"
-        }
-        
-        compose_result = {
+        },
+        "generate_compose_files": {
             "status": "success",
             "message": "Docker Compose files generated successfully"
-        }
-        
-        containers_result = {
+        },
+        "create_containers": {
             "status": "success",
             "message": "Containers created successfully"
         }
-        
-        status_updates = [
-            {"current_stage": "pre_check", "overall_progress": 5, "status": "in_progress"},
-            {"current_stage": "config_setup", "overall_progress": 10, "status": "in_progress"},
-            {"current_stage": "network_setup", "overall_progress": 15, "status": "in_progress"},
-            {"current_stage": "storage_setup", "overall_progress": 25, "status": "in_progress"},
-            {"current_stage": "service_selection", "overall_progress": 30, "status": "in_progress"},
-            {"current_stage": "dependency_install", "overall_progress": 40, "status": "in_progress"},
-            {"current_stage": "docker_setup", "overall_progress": 55, "status": "in_progress"},
-            {"current_stage": "compose_generation", "overall_progress": 65, "status": "in_progress"},
-            {"current_stage": "container_creation", "overall_progress": 80, "status": "in_progress"},
-            {"current_stage": "post_install", "overall_progress": 90, "status": "in_progress"},
-            {"current_stage": "finalization", "overall_progress": 100, "status": "completed"}
-        ]
-        
+    }
+
+
+@pytest.fixture(scope='module')
+def status_updates():
+    """Installation status updates returned by successive status polls."""
+    return _STATUS_UPDATES
+
+
+@pytest.fixture(scope='module')
+def installation_result():
+    """Mock result for the complete installation process."""
+    return {
+        "current_stage": "finalization",
+        "current_stage_name": "Finalizing Installation",
+        "stage_progress": 100,
+        "overall_progress": 100,
+        "status": "completed",
+        "logs": _INSTALLATION_LOGS,
+        "errors": [],
+        "start_time": 1691157045.123456,
+        "end_time": 1691157228.654321,
+        "elapsed_time": 183.530865
+    }
+
+
+class TestInstallWizardFlow:
+    """Tests for installation wizard flow."""
+
+    def test_complete_installation_flow(self, client, install_mocks, status_updates):
+        """Test the complete installation wizard flow."""
         # Set up mocks for individual steps
-        with patch('src.core.install_wizard.check_system_compatibility', return_value=compatibility_check), \
-             patch('src.core.install_wizard.setup_basic_configuration', return_value=config_result), \
-             patch('src.core.install_wizard.setup_network_configuration', return_value=network_result), \
-             patch('src.core.install_wizard.setup_storage_configuration', return_value=storage_result), \
-             patch('src.core.install_wizard.setup_service_selection', return_value=services_result), \
-             patch('src.core.install_wizard.install_dependencies', return_value=dependencies_result), \
-             patch('src.core.install_wizard.setup_docker', return_value=docker_result), \
-             patch('src.core.install_wizard.generate_compose_files', return_value=compose_result), \
-             patch('src.core.install_wizard.create_containers', return_value=containers_result):
+        with patch('src.core.install_wizard.check_system_compatibility',
+                   return_value=install_mocks["check_system_compatibility"]), \
+             patch('src.core.install_wizard.setup_basic_configuration',
+                   return_value=install_mocks["setup_basic_configuration"]), \
+             patch('src.core.install_wizard.setup_network_configuration',
+                   return_value=install_mocks["setup_network_configuration"]), \
+             patch('src.core.install_wizard.setup_storage_configuration',
+                   return_value=install_mocks["setup_storage_configuration"]), \
+             patch('src.core.install_wizard.setup_service_selection',
+                   return_value=install_mocks["setup_service_selection"]), \
+             patch('src.core.install_wizard.install_dependencies',
+                   return_value=install_mocks["install_dependencies"]), \
+             patch('src.core.install_wizard.setup_docker',
+                   return_value=install_mocks["setup_docker"]), \
+             patch('src.core.install_wizard.generate_compose_files',
+                   return_value=install_mocks["generate_compose_files"]), \
+             patch('src.core.install_wizard.create_containers',
+                   return_value=install_mocks["create_containers"]):
             
             # Step 1: Check system compatibility
             response = client.get('/api/install/compatibility')
@@ -240,52 +270,26 @@ class TestInstallWizardFlow:
             assert response.status_code == 200
             assert json.loads(response.data)["status"] == "success"
             
-            # Mock installation status progress updates for polling
-            status_index = 0
-            
-            def mock_get_status():
-                nonlocal status_index
-                if status_index < len(status_updates):
-                    status = status_updates[status_index]
-                    status_index += 1
-                    return status
-                return status_updates[-1]
-            
-            with patch('src.core.install_wizard.get_installation_status', side_effect=mock_get_status):
-                # Step 10: Poll for installation status updates
-                for _ in range(5):  # Simulate polling multiple times
+            # Mock installation status progress updates, one per poll. Each
+            # update is copied to a dict because jsonify cannot serialize the proxies
+            with patch('src.core.install_wizard.get_installation_status',
+                       side_effect=map(dict, status_updates)) as mock_status:
+                # Step 10: Poll the status endpoint through every stage
+                for update in status_updates:
                     response = client.get('/api/install/status')
                     assert response.status_code == 200
-                    status_data = json.loads(response.data)
-                    assert "current_stage" in status_data
-                    assert "overall_progress" in status_data
-                    
-                    # If installation is completed, break the polling loop
-                    if status_data.get("status") == "completed":
-                        assert status_data["overall_progress"] == 100
-                        break
+                    assert response.get_json() == dict(update)
+                
+                assert mock_status.call_count == len(status_updates)
+                
+                # The final poll reports the completed installation
+                status_data = response.get_json()
+                assert status_data["status"] == "completed"
+                assert status_data["current_stage"] == "finalization"
+                assert status_data["overall_progress"] == 100
 
-    def test_installation_run_endpoint(self, client):
+    def test_installation_run_endpoint(self, client, installation_result):
         """Test the single API endpoint for running the entire installation."""
-        # Mock result for the complete installation process
-        installation_result = {
-            "current_stage": "finalization",
-            "current_stage_name": "Finalizing Installation",
-            "stage_progress": 100,
-            "overall_progress": 100,
-            "status": "completed",
-            "logs": [
-                "[2023-08-04 12:30:45] Starting installation process",
-                "[2023-08-04 12:30:46] Step 1: System compatibility check",
-                "[2023-08-04 12:31:15] Step 2: Basic configuration setup",
-                "[2023-08-04 12:32:05] Installation process completed successfully"
-            ],
-            "errors": [],
-            "start_time": 1691157045.123456,
-            "end_time": 1691157228.654321,
-            "elapsed_time": 183.530865
-        }
-        
         with patch('src.core.install_wizard.run_installation', return_value=installation_result):
             # Run the complete installation with a single API call
             installation_config = {
@@ -1,25 +1,22 @@
 """
 Unit tests for the network API endpoints.
 """
-import pytest
 import json
-from unittest.mock import patch, MagicMock
+import pytest
+from unittest.mock import patch, Mock
+
+from src.core import network_manager
+
 
-from src.api.server import create_app
+# Keep the API tests on one xdist worker so they share the session app
+pytestmark = pytest.mark.xdist_group("api")
 
 
 @pytest.mark.unit
 class TestNetworkAPI:
     """Tests for the network API endpoints."""
     
-    @pytest.fixture
-    def client(self):
-        """Flask test client fixture."""
-        app = create_app({'TESTING': True})
-        with app.test_client() as client:
-            yield client
-    
-    def test_get_network_interfaces(self, client):
+    def test_get_network_interfaces(self, wsgi_get):
         """Test getting network interface information."""
         mock_interfaces = {
             'status': 'success',
@@ -35,17 +32,16 @@ class TestNetworkAPI:
             }
         }
         
-        with patch('src.core.network_manager.get_network_interfaces', return_value=mock_interfaces):
-            response = client.get('/api/network/interfaces')
+        with patch.object(network_manager, 'get_network_interfaces', new_callable=Mock, return_value=mock_interfaces):
+            status_code, body = wsgi_get('/api/network/interfaces')
             
-            assert response.status_code == 200
-            data = json.loads(response.data)
+            assert status_code == 200
+            data = json.loads(body)
             
             assert data['status'] == 'success'
-            assert 'interfaces' in data
-            assert 'eth0' in data['interfaces']
+            assert data['interfaces']['eth0']['mac'] == '00:11:22:33:44:55'
     
-    def test_get_network_info(self, client):
+    def test_get_network_info(self, wsgi_get):
         """Test getting comprehensive network information."""
         mock_info = {
             'interfaces': {'eth0': {'type': 'ethernet'}},
@@ -53,15 +49,11 @@ class TestNetworkAPI:
             'tailscale': {'installed': True, 'running': True}
         }
         
-        with patch('src.core.network_manager.get_network_info', return_value=mock_info):
-            response = client.get('/api/network/info')
-            
-            assert response.status_code == 200
-            data = json.loads(response.data)
+        with patch.object(network_manager, 'get_network_info', new_callable=Mock, return_value=mock_info):
+            status_code, body = wsgi_get('/api/network/info')
             
-            assert 'interfaces' in data
-            assert 'vpn' in data
-            assert 'tailscale' in data
+            assert status_code == 200
+            assert json.loads(body) == mock_info
     
     def test_get_vpn_status(self, client):
         """Test getting VPN status."""
@@ -75,16 +67,14 @@ class TestNetworkAPI:
             }
         }
         
-        with patch('src.core.network_manager.get_vpn_status', return_value=mock_status):
+        with patch.object(network_manager, 'get_vpn_status', new_callable=Mock, return_value=mock_status):
             response = client.get('/api/network/vpn/status')
             
             assert response.status_code == 200
-            data = json.loads(response.data)
+            data = response.get_json()
             
             assert data['status'] == 'success'
-            assert 'vpn' in data
-            assert data['vpn']['connected'] is True
-            assert data['vpn']['provider'] == 'gluetun'
+            assert {'connected': True, 'provider': 'gluetun'}.items() <= data['vpn'].items()
     
     def test_configure_vpn(self, client):
         """Test configuring VPN."""
@@ -106,11 +96,11 @@ class TestNetworkAPI:
             'region': 'Netherlands'
         }
         
-        with patch('src.core.network_manager.configure_vpn', return_value=mock_result):
+        with patch.object(network_manager, 'configure_vpn', new_callable=Mock, return_value=mock_result):
             response = client.post('/api/network/vpn/configure', json=vpn_config)
             
             assert response.status_code == 200
-            data = json.loads(response.data)
+            data = response.get_json()
             
             assert data['status'] == 'success'
             assert 'VPN configuration updated' in data['message']
@@ -127,16 +117,14 @@ class TestNetworkAPI:
             }
         }
         
-        with patch('src.core.network_manager.get_tailscale_status', return_value=mock_status):
+        with patch.object(network_manager, 'get_tailscale_status', new_callable=Mock, return_value=mock_status):
             response = client.get('/api/network/tailscale/status')
             
             assert response.status_code == 200
-            data = json.loads(response.data)
+            data = response.get_json()
             
             assert data['status'] == 'success'
-            assert 'tailscale' in data
-            assert data['tailscale']['installed'] is True
-            assert data['tailscale']['running'] is True
+            assert {'installed': True, 'running': True}.items() <= data['tailscale'].items()
     
     def test_configure_tailscale(self, client):
         """Test configuring Tailscale."""
@@ -150,11 +138,11 @@ class TestNetworkAPI:
             'auth_key': 'tskey-abcdef123456'
         }
         
-        with patch('src.core.network_manager.configure_tailscale', return_value=mock_result):
+        with patch.object(network_manager, 'configure_tailscale', new_callable=Mock, return_value=mock_result):
             response = client.post('/api/network/tailscale/configure', json=tailscale_config)
             
             assert response.status_code == 200
-            data = json.loads(response.data)
+            data = response.get_json()
             
             assert data['status'] == 'success'
-            assert 'Tailscale configured and started' in data['message']
\ No newline at end of file
+            assert data['message'] == 'Tailscale configured and started'
\ No newline at end of file
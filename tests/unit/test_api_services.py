@@ -2,292 +2,142 @@
 Unit tests for the service API endpoints.
 """
 
-import json
 import pytest
-from unittest.mock import patch, MagicMock
-
-from src.api.server import create_app
-
-
-@pytest.fixture
-def client():
-    """Test client fixture."""
-    app = create_app({"TESTING": True})
-    with app.test_client() as client:
-        yield client
-
-
-@pytest.fixture
-def mock_service_info():
-    """Fixture with mock service information."""
-    return {
-        "arr_apps": {
-            "sonarr": {
-                "name": "sonarr",
-                "enabled": True,
-                "description": "TV Series Management",
-                "default_port": 8989,
-                "docker_image": "linuxserver/sonarr:latest",
-                "status": "running",
-                "url": "http://localhost:8989",
-                "ports": [{"container": "8989", "host": "8989", "protocol": "tcp"}]
-            },
-            "radarr": {
-                "name": "radarr",
-                "enabled": True,
-                "description": "Movie Management",
-                "default_port": 7878,
-                "docker_image": "linuxserver/radarr:latest",
-                "status": "running",
-                "url": "http://localhost:7878",
-                "ports": [{"container": "7878", "host": "7878", "protocol": "tcp"}]
-            }
-        },
-        "download_clients": {
-            "transmission": {
-                "name": "transmission",
-                "enabled": True,
-                "description": "Torrent Client",
-                "default_port": 9091,
-                "docker_image": "linuxserver/transmission:latest",
-                "status": "running",
-                "url": "http://localhost:9091",
-                "ports": [{"container": "9091", "host": "9091", "protocol": "tcp"}]
-            }
+from unittest.mock import Mock
+
+from src.core import service_manager
+from tests.fixtures.mock_service_data import (
+    get_mock_service_info,
+    get_mock_compatibility_info,
+    get_mock_docker_compose_result,
+    get_mock_service_installation_status,
+)
+
+
+# Keep the API tests on one xdist worker so they share the session app
+pytestmark = pytest.mark.xdist_group("api")
+
+
+# Mock payloads returned by the stubbed service_manager functions; the tests
+# only read them, so they are built once at import
+_SERVICE_INFO = get_mock_service_info()
+_COMPATIBILITY_INFO = get_mock_compatibility_info()
+_DOCKER_COMPOSE_RESULT = get_mock_docker_compose_result()
+_INSTALLATION_STATUS = get_mock_service_installation_status()
+
+
+_ENV_RESULT = {
+    "status": "success",
+    "message": ".env file generated successfully",
+    "env_file": "PUID=1000\nPGID=1000\nTIMEZONE=UTC\n",
+    "temp_file_path": "/tmp/env-12345"
+}
+
+_APPLY_RESULT = {
+    "status": "success",
+    "message": "Service changes applied successfully",
+    "docker_compose_path": "/home/user/.config/pi-pvarr/docker-compose/docker-compose.yml",
+    "env_path": "/home/user/.config/pi-pvarr/.env"
+}
+
+
+# (HTTP method, URL, patched service_manager function, mock result, request body,
+# positional arguments the endpoint must pass, expected subset of the response JSON)
+_SERVICE_ENDPOINTS = [
+    pytest.param(
+        'GET', '/api/services/info', 'get_service_info', _SERVICE_INFO, None, (),
+        {"arr_apps": _SERVICE_INFO["arr_apps"]},
+        id='info'),
+    pytest.param(
+        'POST', '/api/services/toggle', 'toggle_service',
+        {"status": "success", "message": "Service 'sonarr' enabled successfully"},
+        {"service_name": "sonarr", "enabled": True}, ('sonarr', True),
+        {"status": "success", "message": "Service 'sonarr' enabled successfully"},
+        id='toggle'),
+    pytest.param(
+        'GET', '/api/services/compatibility', 'get_service_compatibility',
+        _COMPATIBILITY_INFO, None, (),
+        {"status": "success",
+         "system_info": _COMPATIBILITY_INFO["system_info"],
+         "compatibility": _COMPATIBILITY_INFO["compatibility"]},
+        id='compatibility'),
+    pytest.param(
+        'GET', '/api/services/compose', 'generate_docker_compose',
+        _DOCKER_COMPOSE_RESULT, None, (),
+        {"status": "success", "compose_file": _DOCKER_COMPOSE_RESULT["compose_file"]},
+        id='compose'),
+    pytest.param(
+        'GET', '/api/services/env', 'generate_env_file', _ENV_RESULT, None, (),
+        {"status": "success", "env_file": "PUID=1000\nPGID=1000\nTIMEZONE=UTC\n"},
+        id='env'),
+    pytest.param(
+        'POST', '/api/services/apply', 'apply_service_changes', _APPLY_RESULT, None, (),
+        {"status": "success",
+         "docker_compose_path": _APPLY_RESULT["docker_compose_path"],
+         "env_path": _APPLY_RESULT["env_path"]},
+        id='apply'),
+    pytest.param(
+        'POST', '/api/services/start', 'start_services',
+        {
+            "status": "success",
+            "message": "Services started successfully",
+            "output": "Creating network container_network\nCreating container sonarr\n"
         },
-        "media_servers": {
-            "jellyfin": {
-                "name": "jellyfin",
-                "enabled": True,
-                "description": "Media Server",
-                "default_port": 8096,
-                "docker_image": "linuxserver/jellyfin:latest",
-                "status": "running",
-                "url": "http://localhost:8096",
-                "ports": [{"container": "8096", "host": "8096", "protocol": "tcp"}]
-            }
+        None, (),
+        {"status": "success", "output": "Creating network container_network\nCreating container sonarr\n"},
+        id='start'),
+    pytest.param(
+        'POST', '/api/services/stop', 'stop_services',
+        {
+            "status": "success",
+            "message": "Services stopped successfully",
+            "output": "Stopping container sonarr\nRemoving network container_network\n"
         },
-        "utilities": {
-            "portainer": {
-                "name": "portainer",
-                "enabled": True,
-                "description": "Docker Management",
-                "default_port": 9000,
-                "docker_image": "portainer/portainer-ce:latest",
-                "status": "running",
-                "url": "http://localhost:9000",
-                "ports": [{"container": "9000", "host": "9000", "protocol": "tcp"}]
-            }
-        }
-    }
-
-
-@pytest.fixture
-def mock_compatibility_info():
-    """Fixture with mock compatibility information."""
-    return {
-        "status": "success",
-        "system_info": {
-            "architecture": "aarch64",
-            "memory_gb": 4,
-            "is_raspberry_pi": True,
-            "pi_model": "Raspberry Pi 4 Model B Rev 1.2",
-            "has_hw_transcoding": True
+        None, (),
+        {"status": "success", "output": "Stopping container sonarr\nRemoving network container_network\n"},
+        id='stop'),
+    pytest.param(
+        'POST', '/api/services/restart', 'restart_services',
+        {
+            "status": "success",
+            "message": "Services restarted successfully",
+            "output": "Restarting sonarr\nRestarting radarr\n"
         },
-        "compatibility": {
-            "media_servers": {
-                "jellyfin": {
-                    "compatible": True,
-                    "recommended": True,
-                    "notes": "Recommended for ARM platforms"
-                },
-                "plex": {
-                    "compatible": True,
-                    "recommended": False,
-                    "notes": "Limited transcoding on ARM platforms"
-                }
-            },
-            "arr_apps": {
-                "sonarr": {"compatible": True, "recommended": True, "notes": "Core service"},
-                "radarr": {"compatible": True, "recommended": True, "notes": "Core service"}
-            }
-        }
-    }
-
-
-@pytest.fixture
-def mock_docker_compose_result():
-    """Fixture with mock Docker Compose generation result."""
-    return {
-        "status": "success",
-        "message": "Docker Compose file generated successfully",
-        "compose_file": "version: '3.7'\nservices:\n  sonarr:\n    image: linuxserver/sonarr:latest\n",
-        "temp_file_path": "/tmp/docker-compose-12345.yml"
-    }
-
-
-@pytest.fixture
-def mock_installation_status():
-    """Fixture with mock installation status."""
-    return {
-        "status": "success",
-        "installation_status": "running",
-        "compose_file_exists": True,
-        "active_services": 5,
-        "enabled_services": 6,
-        "service_info": {}  # This would contain the full service info, omitted for brevity
-    }
+        None, (),
+        {"status": "success", "output": "Restarting sonarr\nRestarting radarr\n"},
+        id='restart'),
+    pytest.param(
+        'GET', '/api/services/status', 'get_installation_status',
+        _INSTALLATION_STATUS, None, (),
+        {"status": "success", "installation_status": "running",
+         "active_services": 5, "enabled_services": 6},
+        id='status'),
+]
 
 
 class TestServicesAPI:
     """Tests for service API endpoints."""
 
-    def test_get_services_info(self, client, mock_service_info):
-        """Test getting comprehensive service information."""
-        with patch('src.core.service_manager.get_service_info', return_value=mock_service_info):
-            response = client.get('/api/services/info')
-            assert response.status_code == 200
-            data = json.loads(response.data)
-            assert data == mock_service_info
-            assert "arr_apps" in data
-            assert "sonarr" in data["arr_apps"]
-            assert data["arr_apps"]["sonarr"]["enabled"] is True
-            assert data["arr_apps"]["sonarr"]["status"] == "running"
-
-    def test_toggle_service(self, client):
-        """Test toggling service enabled status."""
-        toggle_result = {"status": "success", "message": "Service 'sonarr' enabled successfully"}
-        with patch('src.core.service_manager.toggle_service', return_value=toggle_result):
-            response = client.post(
-                '/api/services/toggle',
-                json={"service_name": "sonarr", "enabled": True},
-                content_type='application/json'
-            )
-            assert response.status_code == 200
-            data = json.loads(response.data)
-            assert data["status"] == "success"
-            assert "sonarr" in data["message"]
+    @pytest.mark.parametrize('method,url,function,result,payload,expected_args,expected',
+                             _SERVICE_ENDPOINTS)
+    def test_endpoint(self, client, monkeypatch, method, url, function, result, payload,
+                      expected_args, expected):
+        """Test that each service endpoint passes its arguments through and returns the result."""
+        mock_function = Mock(return_value=result)
+        monkeypatch.setattr(service_manager, function, mock_function)
+        response = client.open(url, method=method, json=payload)
+        assert response.status_code == 200
+        mock_function.assert_called_once_with(*expected_args)
+        data = response.get_json()
+        assert {key: data.get(key) for key in expected} == expected
 
     def test_toggle_service_missing_params(self, client):
         """Test toggling service with missing parameters."""
         response = client.post(
             '/api/services/toggle',
-            json={"service_name": "sonarr"},  # Missing 'enabled' parameter
-            content_type='application/json'
+            json={"service_name": "sonarr"}  # Missing 'enabled' parameter
         )
         assert response.status_code == 200  # Flask still returns 200 for JSON responses
-        data = json.loads(response.data)
+        data = response.get_json()
         assert data["status"] == "error"
         assert "Missing required parameters" in data["message"]
-
-    def test_get_service_compatibility(self, client, mock_compatibility_info):
-        """Test getting service compatibility information."""
-        with patch('src.core.service_manager.get_service_compatibility', return_value=mock_compatibility_info):
-            response = client.get('/api/services/compatibility')
-            assert response.status_code == 200
-            data = json.loads(response.data)
-            assert data["status"] == "success"
-            assert "system_info" in data
-            assert "compatibility" in data
-            assert data["system_info"]["is_raspberry_pi"] is True
-            assert "jellyfin" in data["compatibility"]["media_servers"]
-            assert data["compatibility"]["media_servers"]["jellyfin"]["compatible"] is True
-
-    def test_generate_docker_compose(self, client, mock_docker_compose_result):
-        """Test generating Docker Compose file."""
-        with patch('src.core.service_manager.generate_docker_compose', return_value=mock_docker_compose_result):
-            response = client.get('/api/services/compose')
-            assert response.status_code == 200
-            data = json.loads(response.data)
-            assert data["status"] == "success"
-            assert "compose_file" in data
-            assert "version: '3.7'" in data["compose_file"]
-
-    def test_generate_env_file(self, client):
-        """Test generating environment file."""
-        env_result = {
-            "status": "success",
-            "message": ".env file generated successfully",
-            "env_file": "PUID=1000\nPGID=1000\nTIMEZONE=UTC\n",
-            "temp_file_path": "/tmp/env-12345"
-        }
-        with patch('src.core.service_manager.generate_env_file', return_value=env_result):
-            response = client.get('/api/services/env')
-            assert response.status_code == 200
-            data = json.loads(response.data)
-            assert data["status"] == "success"
-            assert "env_file" in data
-            assert "PUID=1000" in data["env_file"]
-
-    def test_apply_service_changes(self, client):
-        """Test applying service changes."""
-        apply_result = {
-            "status": "success",
-            "message": "Service changes applied successfully",
-            "docker_compose_path": "/home/user/.config/pi-pvarr/docker-compose/docker-compose.yml",
-            "env_path": "/home/user/.config/pi-pvarr/.env"
-        }
-        with patch('src.core.service_manager.apply_service_changes', return_value=apply_result):
-            response = client.post('/api/services/apply')
-            assert response.status_code == 200
-            data = json.loads(response.data)
-            assert data["status"] == "success"
-            assert "docker_compose_path" in data
-            assert "env_path" in data
-
-    def test_start_services(self, client):
-        """Test starting services."""
-        start_result = {
-            "status": "success",
-            "message": "Services started successfully",
-            "output": "Creating network container_network\nCreating container sonarr\n"
-        }
-        with patch('src.core.service_manager.start_services', return_value=start_result):
-            response = client.post('/api/services/start')
-            assert response.status_code == 200
-            data = json.loads(response.data)
-            assert data["status"] == "success"
-            assert "output" in data
-            assert "Creating" in data["output"]
-
-    def test_stop_services(self, client):
-        """Test stopping services."""
-        stop_result = {
-            "status": "success",
-            "message": "Services stopped successfully",
-            "output": "Stopping container sonarr\nRemoving network container_network\n"
-        }
-        with patch('src.core.service_manager.stop_services', return_value=stop_result):
-            response = client.post('/api/services/stop')
-            assert response.status_code == 200
-            data = json.loads(response.data)
-            assert data["status"] == "success"
-            assert "output" in data
-            assert "Stopping" in data["output"]
-
-    def test_restart_services(self, client):
-        """Test restarting services."""
-        restart_result = {
-            "status": "success",
-            "message": "Services restarted successfully",
-            "output": "Restarting sonarr\nRestarting radarr\n"
-        }
-        with patch('src.core.service_manager.restart_services', return_value=restart_result):
-            response = client.post('/api/services/restart')
-            assert response.status_code == 200
-            data = json.loads(response.data)
-            assert data["status"] == "success"
-            assert "output" in data
-            assert "Restarting" in data["output"]
-
-    def test_get_installation_status(self, client, mock_installation_status):
-        """Test getting installation status."""
-        with patch('src.core.service_manager.get_installation_status', return_value=mock_installation_status):
-            response = client.get('/api/services/status')
-            assert response.status_code == 200
-            data = json.loads(response.data)
-            assert data["status"] == "success"
-            assert "installation_status" in data
-            assert data["installation_status"] == "running"
-            assert data["active_services"] == 5
-            assert data["enabled_services"] == 6
\ No newline at end of file
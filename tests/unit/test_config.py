@@ -1,7 +1,7 @@
 """
 Unit tests for the configuration module.
 """
-import os
+import io
 import json
 import pytest
 from unittest.mock import patch, mock_open
@@ -9,14 +9,37 @@ from unittest.mock import patch, mock_open
 from src.core import config
 
 
+# Configuration file contents, serialized once for the load tests
+_FILE_CONFIG = {
+    "puid": 1000,
+    "pgid": 1000,
+    "timezone": "Europe/London",
+    "docker_dir": "/home/pi/docker",
+    "media_dir": "/mnt/media",
+    "downloads_dir": "/mnt/downloads",
+    "vpn": {"enabled": True, "provider": "private internet access"},
+    "tailscale": {"enabled": False}
+}
+_SERIALIZED_CONFIG = json.dumps(_FILE_CONFIG)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _home_env():
+    """Point HOME at a fixed test user for every test in this module."""
+    mp = pytest.MonkeyPatch()
+    mp.setenv('HOME', '/home/testuser')
+    mp.delenv('XDG_CONFIG_HOME', raising=False)
+    yield
+    mp.undo()
+
+
 @pytest.mark.unit
 class TestConfig:
     """Tests for the config module."""
 
     def test_get_config_dir(self):
         """Test getting the config directory."""
-        with patch.dict(os.environ, {'HOME': '/home/testuser'}):
-            assert config.get_config_dir() == '/home/testuser/.config/pi-pvarr'
+        assert config.get_config_dir() == '/home/testuser/.config/pi-pvarr'
 
     def test_ensure_config_dir_exists(self):
         """Test ensuring config directory exists."""
@@ -28,24 +51,23 @@ class TestConfig:
 
     def test_get_default_config(self):
         """Test getting default configuration."""
-        with patch.dict(os.environ, {'HOME': '/home/testuser'}):
-            default_config = config.get_default_config()
-            
-            assert default_config['puid'] == 1000
-            assert default_config['pgid'] == 1000
-            assert default_config['timezone'] == 'UTC'
-            assert default_config['docker_dir'] == '/home/testuser/docker'
-            assert default_config['vpn']['enabled'] is True
-            assert default_config['tailscale']['enabled'] is False
-
-    def test_load_config_file_exists(self, mock_config):
+        default_config = config.get_default_config()
+        
+        assert default_config['puid'] == 1000
+        assert default_config['pgid'] == 1000
+        assert default_config['timezone'] == 'UTC'
+        assert default_config['docker_dir'] == '/home/testuser/docker'
+        assert default_config['vpn']['enabled'] is True
+        assert default_config['tailscale']['enabled'] is False
+
+    def test_load_config_file_exists(self):
         """Test loading config when file exists."""
         with patch('os.path.exists', return_value=True), \
-             patch('builtins.open', mock_open(read_data=json.dumps(mock_config))):
+             patch('builtins.open', return_value=io.StringIO(_SERIALIZED_CONFIG)):
             
             loaded_config = config.load_config('/test/config/file.json')
             
-            assert loaded_config == mock_config
+            assert loaded_config == _FILE_CONFIG
 
     def test_load_config_file_not_exists(self):
         """Test loading config when file does not exist."""
@@ -65,7 +87,9 @@ class TestConfig:
             config.save_config(test_config, '/test/config/file.json')
             
         mock_file.assert_called_once_with('/test/config/file.json', 'w')
-        mock_file().write.assert_called_once_with(json.dumps(test_config, indent=2))
+        mock_file().write.assert_called_once()
+        written, = mock_file().write.call_args.args
+        assert json.loads(written) == test_config
 
     def test_get_config_no_args(self):
         """Test get_config with no arguments."""
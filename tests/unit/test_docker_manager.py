@@ -1,144 +1,221 @@
 """
 Unit tests for the Docker manager module.
 """
+import types
+
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 from src.core import docker_manager
 
 
+class FakeContainer:
+    """Lightweight stand-in for a docker-py container that records method calls."""
+
+    __slots__ = ('name', 'status', 'ports', 'attrs', 'logs_data', 'error', 'calls')
+
+    def __init__(self, name='test', status='running', ports=None, attrs=None,
+                 logs_data=b'', error=None):
+        self.name = name
+        self.status = status
+        self.ports = ports if ports is not None else {}
+        self.attrs = attrs if attrs is not None else {}
+        self.logs_data = logs_data
+        self.error = error
+        self.calls = []
+
+    def _call(self, method, **kwargs):
+        self.calls.append((method, kwargs))
+        if self.error is not None:
+            raise self.error
+
+    def start(self):
+        self._call('start')
+
+    def stop(self):
+        self._call('stop')
+
+    def restart(self):
+        self._call('restart')
+
+    def logs(self, **kwargs):
+        self._call('logs', **kwargs)
+        return self.logs_data
+
+
+class FakeContainerCollection:
+    """Stand-in for ``client.containers`` backed by a name-to-container dict."""
+
+    __slots__ = ('items', 'error')
+
+    def __init__(self, containers=(), error=None):
+        self.items = {container.name: container for container in containers}
+        self.error = error
+
+    def add(self, *containers):
+        for container in containers:
+            self.items[container.name] = container
+
+    def get(self, name):
+        if self.error is not None:
+            raise self.error
+        return self.items[name]
+
+    def list(self, all=False):
+        return list(self.items.values())
+
+
+class FakeImageCollection:
+    """Stand-in for ``client.images`` that records pulled image names."""
+
+    __slots__ = ('pulled', 'error')
+
+    def __init__(self, error=None):
+        self.pulled = []
+        self.error = error
+
+    def pull(self, image_name):
+        if self.error is not None:
+            raise self.error
+        self.pulled.append(image_name)
+
+
+class FakeClient:
+    """Stand-in for the client returned by ``docker.from_env``."""
+
+    __slots__ = ('containers', 'images')
+
+    def __init__(self, containers=(), container_error=None, pull_error=None):
+        self.containers = FakeContainerCollection(containers, container_error)
+        self.images = FakeImageCollection(pull_error)
+
+
+class FakeDockerModule(types.ModuleType):
+    """Stand-in for the docker package whose from_env returns the current FakeClient."""
+
+    def __init__(self):
+        super().__init__('docker')
+        self.client = FakeClient()
+        self.error = None
+
+    def from_env(self):
+        if self.error is not None:
+            raise self.error
+        return self.client
+
+
+@pytest.fixture(scope="module")
+def fake_docker():
+    """Swap docker_manager's docker module for a FakeDockerModule once per module."""
+    mp = pytest.MonkeyPatch()
+    module = FakeDockerModule()
+    mp.setattr(docker_manager, 'docker', module)
+    mp.setattr(docker_manager, 'DOCKER_AVAILABLE', True)
+    yield module
+    mp.undo()
+
+
+# Lookup tables for the update_all_containers tests: container info by name and
+# pull results by image, served through their bound __getitem__ as side effects
+_INFO_BY_NAME = {
+    'test1': {'image': 'test/image1:latest'},
+    'test2': {'image': 'test/image2:latest'}
+}
+
+_PULL_SUCCESS_BY_IMAGE = {
+    'test/image1:latest': {'status': 'success', 'message': 'Pulled image1'},
+    'test/image2:latest': {'status': 'success', 'message': 'Pulled image2'}
+}
+
+_PULL_PARTIAL_BY_IMAGE = {
+    'test/image1:latest': {'status': 'success', 'message': 'Pulled image1'},
+    'test/image2:latest': {'status': 'error', 'message': 'Image2 not found'}
+}
+
+
 @pytest.mark.unit
 class TestDockerManager:
     """Tests for the docker_manager module."""
 
-    def test_get_container_status(self):
+    @pytest.fixture(autouse=True)
+    def docker_client(self, fake_docker):
+        """Give each test an empty FakeClient to populate from docker.from_env."""
+        fake_docker.client = FakeClient()
+        fake_docker.error = None
+        return fake_docker.client
+
+    def test_get_container_status(self, docker_client):
         """Test getting container status."""
-        # Create mock container objects
-        mock_container1 = MagicMock()
-        mock_container1.name = 'test1'
-        mock_container1.status = 'running'
-        mock_container1.ports = {'8080/tcp': [{'HostIp': '0.0.0.0', 'HostPort': '8080'}]}
-        
-        mock_container2 = MagicMock()
-        mock_container2.name = 'test2'
-        mock_container2.status = 'exited'
-        mock_container2.ports = {}
+        docker_client.containers.add(
+            FakeContainer(name='test1', status='running',
+                          ports={'8080/tcp': [{'HostIp': '0.0.0.0', 'HostPort': '8080'}]}),
+            FakeContainer(name='test2', status='exited')
+        )
         
-        # Mock docker client
-        mock_client = MagicMock()
-        mock_client.containers.list.return_value = [mock_container1, mock_container2]
+        container_status = docker_manager.get_container_status()
         
-        with patch('docker.from_env', return_value=mock_client):
-            container_status = docker_manager.get_container_status()
-            
-            assert len(container_status) == 2
-            assert container_status['test1']['status'] == 'running'
-            assert container_status['test1']['ports'][0]['host'] == '8080'
-            assert container_status['test2']['status'] == 'exited'
-            assert container_status['test2']['ports'] == []
+        assert len(container_status) == 2
+        assert container_status['test1']['status'] == 'running'
+        assert container_status['test1']['ports'][0]['host'] == '8080'
+        assert container_status['test2']['status'] == 'exited'
+        assert container_status['test2']['ports'] == []
 
-    def test_get_container_status_with_error(self):
+    def test_get_container_status_with_error(self, fake_docker):
         """Test handling errors when getting container status."""
-        with patch('docker.from_env', side_effect=Exception("Test error")):
-            container_status = docker_manager.get_container_status()
-            
-            assert 'error' in container_status
-            assert container_status['error']['status'] == 'error'
-            assert "Test error" in container_status['error']['message']
+        fake_docker.error = Exception("Test error")
+        
+        container_status = docker_manager.get_container_status()
+        
+        assert 'error' in container_status
+        assert container_status['error']['status'] == 'error'
+        assert "Test error" in container_status['error']['message']
 
-    def test_get_container_logs(self):
+    def test_get_container_logs(self, docker_client):
         """Test getting container logs."""
-        # Mock container
-        mock_container = MagicMock()
-        mock_container.logs.return_value = b"Test log\nAnother line"
+        mock_container = FakeContainer(logs_data=b"Test log\nAnother line")
+        docker_client.containers.add(mock_container)
         
-        # Mock docker client
-        mock_client = MagicMock()
-        mock_client.containers.get.return_value = mock_container
+        logs = docker_manager.get_container_logs('test', 10)
         
-        with patch('docker.from_env', return_value=mock_client):
-            logs = docker_manager.get_container_logs('test', 10)
-            
-            assert logs == "Test log\nAnother line"
-            mock_container.logs.assert_called_once_with(tail=10)
+        assert logs == "Test log\nAnother line"
+        assert mock_container.calls == [('logs', {'tail': 10})]
 
-    def test_get_container_logs_with_error(self):
+    def test_get_container_logs_with_error(self, docker_client):
         """Test handling errors when getting container logs."""
-        # Mock docker client
-        mock_client = MagicMock()
-        mock_client.containers.get.side_effect = Exception("Container not found")
-        
-        with patch('docker.from_env', return_value=mock_client):
-            logs = docker_manager.get_container_logs('test', 10)
-            
-            assert "Error getting logs" in logs
-            assert "Container not found" in logs
-
-    def test_start_container(self):
-        """Test starting a container."""
-        # Mock container
-        mock_container = MagicMock()
+        docker_client.containers.error = Exception("Container not found")
         
-        # Mock docker client
-        mock_client = MagicMock()
-        mock_client.containers.get.return_value = mock_container
+        logs = docker_manager.get_container_logs('test', 10)
         
-        with patch('docker.from_env', return_value=mock_client):
-            result = docker_manager.start_container('test')
-            
-            assert result['status'] == 'success'
-            mock_container.start.assert_called_once()
+        assert "Error getting logs" in logs
+        assert "Container not found" in logs
 
-    def test_start_container_with_error(self):
-        """Test handling errors when starting a container."""
-        # Mock docker client
-        mock_client = MagicMock()
-        mock_client.containers.get.return_value = MagicMock()
-        mock_client.containers.get.return_value.start.side_effect = Exception("Test error")
+    @pytest.mark.parametrize('action,method', [
+        ('start_container', 'start'),
+        ('stop_container', 'stop'),
+        ('restart_container', 'restart'),
+    ])
+    def test_container_lifecycle(self, docker_client, action, method):
+        """Test starting, stopping and restarting a container."""
+        mock_container = FakeContainer()
+        docker_client.containers.add(mock_container)
         
-        with patch('docker.from_env', return_value=mock_client):
-            result = docker_manager.start_container('test')
-            
-            assert result['status'] == 'error'
-            assert "Test error" in result['message']
-
-    def test_stop_container(self):
-        """Test stopping a container."""
-        # Mock container
-        mock_container = MagicMock()
-        
-        # Mock docker client
-        mock_client = MagicMock()
-        mock_client.containers.get.return_value = mock_container
+        result = getattr(docker_manager, action)('test')
         
-        with patch('docker.from_env', return_value=mock_client):
-            result = docker_manager.stop_container('test')
-            
-            assert result['status'] == 'success'
-            mock_container.stop.assert_called_once()
+        assert result['status'] == 'success'
+        assert mock_container.calls == [(method, {})]
 
-    def test_restart_container(self):
-        """Test restarting a container."""
-        # Mock container
-        mock_container = MagicMock()
+    def test_start_container_with_error(self, docker_client):
+        """Test handling errors when starting a container."""
+        docker_client.containers.add(FakeContainer(error=Exception("Test error")))
         
-        # Mock docker client
-        mock_client = MagicMock()
-        mock_client.containers.get.return_value = mock_container
+        result = docker_manager.start_container('test')
         
-        with patch('docker.from_env', return_value=mock_client):
-            result = docker_manager.restart_container('test')
-            
-            assert result['status'] == 'success'
-            mock_container.restart.assert_called_once()
+        assert result['status'] == 'error'
+        assert "Test error" in result['message']
 
-    def test_get_container_info(self):
+    def test_get_container_info(self, docker_client):
         """Test getting container information."""
-        # Mock container
-        mock_container = MagicMock()
-        mock_container.name = 'test'
-        mock_container.status = 'running'
-        mock_container.attrs = {
+        docker_client.containers.add(FakeContainer(name='test', status='running', attrs={
             'Config': {
                 'Image': 'test/image:latest',
                 'Labels': {'test.label': 'value'}
@@ -148,83 +225,55 @@ class TestDockerManager:
                     '8080/tcp': [{'HostIp': '0.0.0.0', 'HostPort': '8080'}]
                 }
             }
-        }
+        }))
         
-        # Mock docker client
-        mock_client = MagicMock()
-        mock_client.containers.get.return_value = mock_container
+        info = docker_manager.get_container_info('test')
         
-        with patch('docker.from_env', return_value=mock_client):
-            info = docker_manager.get_container_info('test')
+        assert info['name'] == 'test'
+        assert info['status'] == 'running'
+        assert info['image'] == 'test/image:latest'
+        assert info['ports'][0]['host'] == '8080'
+        assert info['ports'][0]['container'] == '8080'
             
-            assert info['name'] == 'test'
-            assert info['status'] == 'running'
-            assert info['image'] == 'test/image:latest'
-            assert info['ports'][0]['host'] == '8080'
-            assert info['ports'][0]['container'] == '8080'
-            
-    def test_get_container_info_with_error(self):
+    def test_get_container_info_with_error(self, docker_client):
         """Test handling errors when getting container info."""
-        mock_client = MagicMock()
-        mock_client.containers.get.side_effect = Exception("Container not found")
+        docker_client.containers.error = Exception("Container not found")
         
-        with patch('docker.from_env', return_value=mock_client):
-            info = docker_manager.get_container_info('test')
-            
-            assert info['status'] == 'error'
-            assert 'Container not found' in info['message']
+        info = docker_manager.get_container_info('test')
+        
+        assert info['status'] == 'error'
+        assert 'Container not found' in info['message']
             
-    def test_pull_image(self):
+    def test_pull_image(self, docker_client):
         """Test pulling a Docker image."""
-        mock_client = MagicMock()
-        mock_client.images.pull.return_value = MagicMock()
+        result = docker_manager.pull_image('test/image:latest')
         
-        with patch('docker.from_env', return_value=mock_client):
-            result = docker_manager.pull_image('test/image:latest')
-            
-            assert result['status'] == 'success'
-            assert 'pulled successfully' in result['message']
-            mock_client.images.pull.assert_called_once_with('test/image:latest')
+        assert result['status'] == 'success'
+        assert 'pulled successfully' in result['message']
+        assert docker_client.images.pulled == ['test/image:latest']
             
-    def test_pull_image_with_error(self):
+    def test_pull_image_with_error(self, docker_client):
         """Test handling errors when pulling an image."""
-        mock_client = MagicMock()
-        mock_client.images.pull.side_effect = Exception("Image not found")
+        docker_client.images.error = Exception("Image not found")
         
-        with patch('docker.from_env', return_value=mock_client):
-            result = docker_manager.pull_image('test/image:latest')
-            
-            assert result['status'] == 'error'
-            assert 'Image not found' in result['message']
+        result = docker_manager.pull_image('test/image:latest')
+        
+        assert result['status'] == 'error'
+        assert 'Image not found' in result['message']
             
-    def test_update_all_containers(self):
+    def test_update_all_containers(self, docker_client):
         """Test updating all containers."""
-        # Mock containers
-        mock_container1 = MagicMock()
-        mock_container1.name = 'test1'
-        mock_container1.status = 'running'
-        
-        mock_container2 = MagicMock()
-        mock_container2.name = 'test2'
-        mock_container2.status = 'exited'
+        mock_container1 = FakeContainer(name='test1', status='running')
+        mock_container2 = FakeContainer(name='test2', status='exited')
+        docker_client.containers.add(mock_container1, mock_container2)
         
-        mock_client = MagicMock()
-        mock_client.containers.list.return_value = [mock_container1, mock_container2]
-        
-        with patch('docker.from_env', return_value=mock_client), \
-             patch('src.core.docker_manager.get_container_info') as mock_get_info, \
+        with patch('src.core.docker_manager.get_container_info') as mock_get_info, \
              patch('src.core.docker_manager.pull_image') as mock_pull:
             
             # Mock container info and pull results
-            mock_get_info.side_effect = lambda name: {
-                'test1': {'image': 'test/image1:latest'},
-                'test2': {'image': 'test/image2:latest'}
-            }[name]
+            mock_get_info.side_effect = _INFO_BY_NAME.__getitem__
             
-            mock_pull.side_effect = lambda image: {
-                'test/image1:latest': {'status': 'success', 'message': 'Pulled image1'},
-                'test/image2:latest': {'status': 'success', 'message': 'Pulled image2'}
-            }[image]
+            mock_pull.side_effect = _PULL_SUCCESS_BY_IMAGE.__getitem__
             
             result = docker_manager.update_all_containers()
             
@@ -236,45 +285,33 @@ class TestDockerManager:
             assert result['details'][1]['status'] == 'updated'
             
             # Verify that container1 was restarted (was running)
-            mock_container1.restart.assert_called_once()
+            assert mock_container1.calls == [('restart', {})]
             # Verify that container2 was not restarted (was exited)
-            mock_container2.restart.assert_not_called()
+            assert mock_container2.calls == []
             
-    def test_update_all_containers_with_error(self):
+    def test_update_all_containers_with_error(self, fake_docker, docker_client):
         """Test handling errors when updating containers."""
         # Test global error
-        with patch('docker.from_env', side_effect=Exception("Docker error")):
-            result = docker_manager.update_all_containers()
-            
-            assert result['status'] == 'error'
-            assert 'Docker error' in result['message']
-            
-        # Test partial success with some container errors
-        mock_container1 = MagicMock()
-        mock_container1.name = 'test1'
-        mock_container1.status = 'running'
+        fake_docker.error = Exception("Docker error")
+        result = docker_manager.update_all_containers()
         
-        mock_container2 = MagicMock()
-        mock_container2.name = 'test2'
-        mock_container2.status = 'running'
+        assert result['status'] == 'error'
+        assert 'Docker error' in result['message']
         
-        mock_client = MagicMock()
-        mock_client.containers.list.return_value = [mock_container1, mock_container2]
+        # Test partial success with some container errors
+        fake_docker.error = None
+        docker_client.containers.add(
+            FakeContainer(name='test1', status='running'),
+            FakeContainer(name='test2', status='running')
+        )
         
-        with patch('docker.from_env', return_value=mock_client), \
-             patch('src.core.docker_manager.get_container_info') as mock_get_info, \
+        with patch('src.core.docker_manager.get_container_info') as mock_get_info, \
              patch('src.core.docker_manager.pull_image') as mock_pull:
             
             # Mock container info and pull results - one succeeds, one fails
-            mock_get_info.side_effect = lambda name: {
-                'test1': {'image': 'test/image1:latest'},
-                'test2': {'image': 'test/image2:latest'}
-            }[name]
+            mock_get_info.side_effect = _INFO_BY_NAME.__getitem__
             
-            mock_pull.side_effect = lambda image: {
-                'test/image1:latest': {'status': 'success', 'message': 'Pulled image1'},
-                'test/image2:latest': {'status': 'error', 'message': 'Image2 not found'}
-            }[image]
+            mock_pull.side_effect = _PULL_PARTIAL_BY_IMAGE.__getitem__
             
             result = docker_manager.update_all_containers()
             
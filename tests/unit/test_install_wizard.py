@@ -5,12 +5,121 @@ Unit tests for the install_wizard module.
 import os
 import time
 import pytest
-from unittest.mock import patch, MagicMock, call
+from types import MappingProxyType
+from unittest.mock import patch, MagicMock, call, DEFAULT
 
 from src.core import install_wizard
 from src.core.install_wizard import InstallationStatus
 
 
+# install_wizard step functions called in order by run_installation
+_INSTALLATION_STEPS = (
+    'check_system_compatibility',
+    'setup_basic_configuration',
+    'setup_network_configuration',
+    'setup_storage_configuration',
+    'setup_service_selection',
+    'install_dependencies',
+    'setup_docker',
+    'generate_compose_files',
+    'create_containers',
+    'perform_post_installation',
+    'finalize_installation'
+)
+
+
+# subprocess.run results shared by the side_effect sequences below. The wizard
+# only reads returncode and stdout, so the same instances are reused.
+_OK = MagicMock(returncode=0)
+_OK_USER = MagicMock(stdout="user", returncode=0)
+_OK_INACTIVE = MagicMock(stdout="inactive", returncode=0)
+
+_DEPENDENCY_RUNS = (
+    _OK,  # sudo check
+    _OK,  # apt update
+    _OK,  # apt install
+    _OK   # pip install
+)
+
+_DOCKER_SETUP_RUNS = (
+    _OK,           # sudo check
+    _OK,           # curl download
+    _OK,           # docker install
+    _OK,           # groups check
+    _OK_USER,      # groups output
+    _OK,           # sudo usermod
+    _OK_INACTIVE,  # systemctl check
+    _OK            # systemctl start
+)
+
+
+# Config module results shared across tests. Mocks return the proxy directly
+# when the wizard only reads the result and a dict copy when it mutates it.
+_DEFAULT_CONFIG = MappingProxyType({
+    "puid": 1000,
+    "pgid": 1000,
+    "timezone": "UTC",
+    "media_dir": "/media",
+    "downloads_dir": "/downloads"
+})
+
+_CURRENT_CONFIG = MappingProxyType({
+    "puid": 1000,
+    "pgid": 1000,
+    "timezone": "UTC"
+})
+
+_DEFAULT_SERVICES = MappingProxyType({
+    "arr_apps": MappingProxyType({
+        "sonarr": False,
+        "radarr": False,
+        "prowlarr": False
+    }),
+    "download_clients": MappingProxyType({
+        "transmission": False,
+        "qbittorrent": False
+    }),
+    "media_servers": MappingProxyType({
+        "jellyfin": False,
+        "plex": False
+    }),
+    "utilities": MappingProxyType({
+        "portainer": False
+    })
+})
+
+# Read-only docker_manager and service_manager results used by finalize_installation
+_CONTAINER_STATUS = MappingProxyType({
+    "sonarr": MappingProxyType({
+        "status": "running",
+        "url": "http://localhost:8989"
+    }),
+    "radarr": MappingProxyType({
+        "status": "running",
+        "url": "http://localhost:7878"
+    }),
+    "stopped_container": MappingProxyType({
+        "status": "stopped",
+        "url": "http://localhost:9999"
+    })
+})
+
+_SERVICE_INFO = MappingProxyType({
+    "arr_apps": MappingProxyType({
+        "sonarr": MappingProxyType({"enabled": True, "status": "running"}),
+        "radarr": MappingProxyType({"enabled": True, "status": "running"})
+    })
+})
+
+
+@pytest.fixture
+def frozen_time(monkeypatch):
+    """Replace time.time with a clock that only moves when the test sets it."""
+    clock = [1_700_000_000.0]
+    monkeypatch.setattr(time, 'time', lambda: clock[0])
+    return clock
+
+
 class TestInstallationStatus:
     """Tests for the InstallationStatus class."""
 
@@ -61,47 +170,80 @@ class TestInstallationStatus:
         assert len(status.logs) == 2  # Error also added to logs
         assert "ERROR: Test error message" in status.logs[1]
 
-    def test_update_progress(self):
-        """Test updating progress for different stages."""
+    def test_logs_keep_most_recent_entries(self, monkeypatch):
+        """Test that the log only keeps the most recent MAX_LOG_ENTRIES entries."""
+        monkeypatch.setattr(install_wizard, 'MAX_LOG_ENTRIES', 3)
         status = InstallationStatus()
         
-        # Test pre_check stage (weight 5)
-        status.update_progress("pre_check", 100)
-        assert status.stage_progress == 100
-        assert status.overall_progress == 5
+        for index in range(5):
+            status.add_log(f"Log message {index}")
+        
+        assert len(status.logs) == 3
+        assert "Log message 2" in status.logs[0]
+        assert "Log message 4" in status.logs[-1]
+
+    def test_add_warning(self):
+        """Test that warnings are logged and recorded in the warnings set."""
+        status = InstallationStatus()
         
-        # Test config_setup stage (weight 5)
-        status.update_progress("config_setup", 100)
-        assert status.stage_progress == 100
-        assert status.overall_progress == 10  # 5 (pre_check) + 5 (config_setup)
+        status.add_warning("Test warning message")
+        status.add_warning("Test warning message")
         
-        # Test partial progress in a higher weighted stage
-        status.update_progress("docker_setup", 50)  # Weight 15
-        assert status.stage_progress == 50
-        # The actual calculation is more complex due to the weights of previous stages
-        # Just verify it's between 10 and 100
-        assert 10 < status.overall_progress < 100
+        assert status.warnings == {"Test warning message"}
+        assert len(status.logs) == 2
+        assert "WARNING: Test warning message" in status.logs[0]
+        assert len(status.errors) == 0
 
-    def test_elapsed_time(self):
-        """Test elapsed time calculation."""
+    @pytest.mark.parametrize('stage,progress,expected_overall', [
+        ('pre_check', 100, 5),       # Weight 5
+        ('config_setup', 100, 10),   # 5 (pre_check) + 5 (config_setup)
+        ('docker_setup', 50, 52),    # 45 from earlier stages + half of weight 15
+    ])
+    def test_update_progress(self, stage, progress, expected_overall):
+        """Test updating progress for different stages."""
         status = InstallationStatus()
-        start_time = time.time() - 60  # 60 seconds ago
-        end_time = time.time()
         
-        status.start_time = start_time
-        status.end_time = end_time
+        status.update_progress(stage, progress)
+        assert status.current_stage == stage
+        assert status.stage_progress == progress
+        assert status.overall_progress == expected_overall
+
+    def test_elapsed_time(self, frozen_time):
+        """Test elapsed time calculation."""
+        status = InstallationStatus()
+        status.start_time = time.time()
+        frozen_time[0] += 60
+        status.end_time = time.time()
         
         result = status.to_dict()
-        assert abs(result["elapsed_time"] - 60) < 1  # Allow small time differences
+        assert result["elapsed_time"] == 60.0
 
 
 class TestInstallWizardFunctions:
     """Tests for the main functions in the install_wizard module."""
 
+    @pytest.fixture(autouse=True)
+    def install_state_file(self, tmp_path, monkeypatch):
+        """Keep the resume checkpoint in a temporary directory."""
+        state_file = tmp_path / 'install_state.json'
+        monkeypatch.setattr(install_wizard, '_get_install_state_file', lambda: str(state_file))
+        return state_file
+
+    @pytest.fixture(autouse=True)
+    def _seed_log(self, request, installation_status):
+        """Add the message from a test's seed_log marker to the fresh status logs."""
+        marker = request.node.get_closest_marker("seed_log")
+        if marker:
+            installation_status.add_log(marker.args[0])
+
+    @pytest.fixture
+    def seeded_status(self, installation_status, frozen_time):
+        """Installation status whose run started 60 seconds before the frozen clock."""
+        installation_status.start_time = frozen_time[0] - 60
+        return installation_status
+
     def test_get_installation_status(self):
         """Test retrieving the installation status."""
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
         install_wizard._installation_status.current_stage = "docker_setup"
         install_wizard._installation_status.status = "in_progress"
         
@@ -109,72 +251,37 @@ class TestInstallWizardFunctions:
         assert result["current_stage"] == "docker_setup"
         assert result["status"] == "in_progress"
 
+    @pytest.mark.parametrize('system_info,expected_compatible', [
+        ({"memory_total_gb": 4, "disk_free_gb": 20, "docker_installed": True}, True),
+        # Below the 2GB memory and 10GB disk recommendations, without Docker
+        ({"memory_total_gb": 1, "disk_free_gb": 5, "docker_installed": False}, False),
+    ], ids=['compatible', 'insufficient_resources'])
     @patch('src.core.system_info.get_system_info')
-    def test_check_system_compatibility(self, mock_get_system_info):
+    def test_check_system_compatibility(self, mock_get_system_info, system_info, expected_compatible):
         """Test system compatibility check."""
         # Setup mock
-        mock_get_system_info.return_value = {
-            "memory": {"total_gb": 4},
-            "disk": {"free_gb": 20},
-            "docker_installed": True
-        }
-        
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
-        
-        # Add a basic log message to ensure there's content in logs
-        install_wizard._installation_status.add_log("Starting system compatibility check")
+        mock_get_system_info.return_value = system_info
         
         result = install_wizard.check_system_compatibility()
         
         # Verify the result
         assert result["status"] == "success"
         assert "system_info" in result
-        assert "checks" in result
+        assert result["compatible"] is expected_compatible
+        assert result["checks"]["memory"]["compatible"] is expected_compatible
+        assert result["checks"]["disk_space"]["compatible"] is expected_compatible
+        assert result["checks"]["docker"]["installed"] is expected_compatible
         
         # Verify that progress was updated
         assert install_wizard._installation_status.overall_progress > 0
 
-    @patch('src.core.system_info.get_system_info')
-    def test_check_system_compatibility_insufficient_resources(self, mock_get_system_info):
-        """Test system compatibility check with insufficient resources."""
-        # Setup mock
-        mock_get_system_info.return_value = {
-            "memory": {"total_gb": 1},  # Below 2GB recommended
-            "disk": {"free_gb": 5},     # Below 10GB recommended
-            "docker_installed": False
-        }
-        
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
-        
-        result = install_wizard.check_system_compatibility()
-        
-        # Verify the result
-        assert result["status"] == "success"
-        assert result["compatible"] is False  # Not fully compatible
-        assert result["checks"]["memory"]["compatible"] is False
-        assert result["checks"]["disk_space"]["compatible"] is False
-        assert result["checks"]["docker"]["installed"] is False
-
+    @pytest.mark.seed_log("Starting basic configuration setup")
     @patch('src.core.config.get_default_config')
     @patch('src.core.config.save_config_wrapper')
     def test_setup_basic_configuration(self, mock_save_config, mock_get_default_config):
         """Test setting up basic configuration."""
         # Setup mocks
-        mock_get_default_config.return_value = {
-            "puid": 1000,
-            "pgid": 1000,
-            "timezone": "UTC",
-            "media_dir": "/media",
-            "downloads_dir": "/downloads"
-        }
-        
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
-        
-        # Add log message to ensure there's content in logs
-        install_wizard._installation_status.add_log("Starting basic configuration setup")
+        mock_get_default_config.return_value = _DEFAULT_CONFIG
         
         # Test with valid configuration
         user_config = {
@@ -202,9 +309,6 @@ class TestInstallWizardFunctions:
             # Missing required fields
         }
         
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
-        
         # Test with incomplete default config
         user_config = {
             "timezone": "Europe/London"
@@ -223,6 +327,7 @@ class TestInstallWizardFunctions:
         # Verify errors were logged
         assert len(install_wizard._installation_status.errors) > 0
 
+    @pytest.mark.seed_log("Starting network configuration")
     @patch('src.core.config.get_config')
     @patch('src.core.config.save_config_wrapper')
     @patch('src.core.network_manager.configure_vpn')
@@ -231,20 +336,10 @@ class TestInstallWizardFunctions:
                                        mock_save_config, mock_get_config):
         """Test setting up network configuration."""
         # Setup mocks
-        mock_get_config.return_value = {
-            "puid": 1000,
-            "pgid": 1000,
-            "timezone": "UTC"
-        }
+        mock_get_config.return_value = dict(_CURRENT_CONFIG)
         mock_configure_vpn.return_value = {"status": "success"}
         mock_configure_tailscale.return_value = {"status": "success"}
         
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
-        
-        # Add log message to ensure there's content in logs
-        install_wizard._installation_status.add_log("Starting network configuration")
-        
         # Test with VPN and Tailscale configuration
         network_config = {
             "vpn": {
@@ -272,39 +367,29 @@ class TestInstallWizardFunctions:
         # Verify that save_config was called
         mock_save_config.assert_called_once()
 
-    @patch('src.core.config.get_config')
-    @patch('src.core.config.save_config_wrapper')
-    @patch('src.core.storage_manager.validate_device')
-    @patch('src.core.storage_manager.verify_mount')
-    @patch('src.core.storage_manager.mount_drive')
-    @patch('src.core.storage_manager.create_media_directories')
-    @patch('src.core.storage_manager.add_share')
-    @patch('os.path.exists')
-    @patch('os.makedirs')
-    @patch('os.chown')
-    def test_setup_storage_configuration(self, mock_chown, mock_makedirs, mock_exists,
-                                       mock_add_share, mock_create_media_directories,
-                                       mock_mount_drive, mock_verify_mount, mock_validate_device,
-                                       mock_save_config, mock_get_config):
+    @pytest.fixture
+    def storage_mocks(self):
+        """Patch every config, storage_manager and os call made by setup_storage_configuration."""
+        with patch.multiple('src.core.storage_manager', validate_device=DEFAULT,
+                            verify_mount=DEFAULT, mount_drive=DEFAULT,
+                            create_media_directories=DEFAULT, add_share=DEFAULT) as storage, \
+             patch.multiple('src.core.config', get_config=DEFAULT,
+                            save_config_wrapper=DEFAULT) as config, \
+             patch.multiple('os', makedirs=DEFAULT, chown=DEFAULT) as os_mocks, \
+             patch('os.path.exists') as mock_exists:
+            yield {**storage, **config, **os_mocks, 'exists': mock_exists}
+
+    @pytest.mark.seed_log("Starting storage configuration")
+    def test_setup_storage_configuration(self, storage_mocks):
         """Test setting up storage configuration."""
         # Setup mocks
-        mock_get_config.return_value = {
-            "puid": 1000,
-            "pgid": 1000,
-            "timezone": "UTC"
-        }
-        mock_validate_device.return_value = {"status": "success", "message": "Device is valid"}
-        mock_verify_mount.return_value = {"status": "success", "message": "Mount is verified"}
-        mock_mount_drive.return_value = {"status": "success"}
-        mock_create_media_directories.return_value = {"status": "success"}
-        mock_add_share.return_value = {"status": "success"}
-        mock_exists.return_value = False
-        
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
-        
-        # Add log message to ensure there's content in logs
-        install_wizard._installation_status.add_log("Starting storage configuration")
+        storage_mocks['get_config'].return_value = dict(_CURRENT_CONFIG)
+        storage_mocks['validate_device'].return_value = {"status": "success", "message": "Device is valid"}
+        storage_mocks['verify_mount'].return_value = {"status": "success", "message": "Mount is verified"}
+        storage_mocks['mount_drive'].return_value = {"status": "success"}
+        storage_mocks['create_media_directories'].return_value = {"status": "success"}
+        storage_mocks['add_share'].return_value = {"status": "success"}
+        storage_mocks['exists'].return_value = False
         
         # Test with storage configuration
         storage_config = {
@@ -336,50 +421,31 @@ class TestInstallWizardFunctions:
         assert result["status"] == "success"
         
         # Verify that storage manager functions were called
-        mock_mount_drive.assert_called_once_with("/dev/sda1", "/mnt/media", "ext4", None, True)
-        mock_validate_device.assert_called_with("/dev/sda1", "ext4")
-        mock_verify_mount.assert_called_with("/mnt/media", uid=1000, gid=1000)
-        mock_create_media_directories.assert_called_once()
-        mock_add_share.assert_called_once()
+        storage_mocks['mount_drive'].assert_called_once_with("/dev/sda1", "/mnt/media", "ext4", None, True)
+        storage_mocks['validate_device'].assert_called_with("/dev/sda1", "ext4")
+        storage_mocks['verify_mount'].assert_called_with("/mnt/media", uid=1000, gid=1000)
+        storage_mocks['create_media_directories'].assert_called_once()
+        storage_mocks['add_share'].assert_called_once()
         
         # Verify that directories were created
-        mock_exists.assert_called()
-        mock_makedirs.assert_called_once()
-        mock_chown.assert_called_once()
+        storage_mocks['exists'].assert_called()
+        storage_mocks['makedirs'].assert_called_once()
+        storage_mocks['chown'].assert_called_once()
         
         # Verify that save_config was called
-        mock_save_config.assert_called_once()
+        storage_mocks['save_config_wrapper'].assert_called_once()
 
+    @pytest.mark.seed_log("Starting service selection")
     @patch('src.core.config.get_default_services')
     @patch('src.core.config.save_services_config')
     def test_setup_service_selection(self, mock_save_services_config, mock_get_default_services):
         """Test setting up service selection."""
         # Setup mocks
+        # setup_service_selection updates each category in place
         mock_get_default_services.return_value = {
-            "arr_apps": {
-                "sonarr": False,
-                "radarr": False,
-                "prowlarr": False
-            },
-            "download_clients": {
-                "transmission": False,
-                "qbittorrent": False
-            },
-            "media_servers": {
-                "jellyfin": False,
-                "plex": False
-            },
-            "utilities": {
-                "portainer": False
-            }
+            category: dict(services) for category, services in _DEFAULT_SERVICES.items()
         }
         
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
-        
-        # Add log message to ensure there's content in logs
-        install_wizard._installation_status.add_log("Starting service selection")
-        
         # Test with service selection
         services_config = {
             "arr_apps": {
@@ -409,20 +475,12 @@ class TestInstallWizardFunctions:
         """Test installing dependencies."""
         # Setup mocks
         mock_geteuid.return_value = 1000  # Non-root
-        mock_subprocess_run.side_effect = [
-            MagicMock(returncode=0),  # sudo check
-            MagicMock(returncode=0),  # apt update
-            MagicMock(returncode=0),  # apt install
-            MagicMock(returncode=0)   # pip install
-        ]
+        mock_subprocess_run.side_effect = _DEPENDENCY_RUNS
         
         # Mock platform
         with patch('platform.system', return_value="Linux"), \
              patch('os.path.exists', return_value=True):  # Debian
             
-            # Reset the global installation status
-            install_wizard._installation_status = InstallationStatus()
-            
             result = install_wizard.install_dependencies()
             
             # Verify the result
@@ -447,21 +505,9 @@ class TestInstallWizardFunctions:
         # Setup mocks
         mock_is_docker_installed.return_value = False
         mock_geteuid.return_value = 1000  # Non-root
-        mock_subprocess_run.side_effect = [
-            MagicMock(returncode=0),  # sudo check
-            MagicMock(returncode=0),  # curl download
-            MagicMock(returncode=0),  # docker install
-            MagicMock(returncode=0),  # groups check
-            MagicMock(stdout="user", returncode=0),  # groups output
-            MagicMock(returncode=0),  # sudo usermod
-            MagicMock(stdout="inactive", returncode=0),  # systemctl check
-            MagicMock(returncode=0)   # systemctl start
-        ]
+        mock_subprocess_run.side_effect = _DOCKER_SETUP_RUNS
         mock_exists.return_value = True
         
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
-        
         result = install_wizard.setup_docker()
         
         # Verify the result
@@ -501,9 +547,6 @@ class TestInstallWizardFunctions:
             "env_path": "/path/to/.env"
         }
         
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
-        
         result = install_wizard.generate_compose_files()
         
         # Verify the result
@@ -530,9 +573,6 @@ class TestInstallWizardFunctions:
             "output": "Creating container sonarr\nCreating container radarr"
         }
         
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
-        
         result = install_wizard.create_containers()
         
         # Verify the result
@@ -557,14 +597,7 @@ class TestInstallWizardFunctions:
             "arr_apps": {"sonarr": True},
             "media_servers": {"jellyfin": True}
         }
-        mock_get_config.return_value = {
-            "puid": 1000,
-            "pgid": 1000,
-            "timezone": "UTC"
-        }
-        
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
+        mock_get_config.return_value = dict(_CURRENT_CONFIG)
         
         result = install_wizard.perform_post_installation()
         
@@ -586,33 +619,12 @@ class TestInstallWizardFunctions:
 
     @patch('src.core.docker_manager.get_container_status')
     @patch('src.core.service_manager.get_service_info')
-    def test_finalize_installation(self, mock_get_service_info, mock_get_container_status):
+    def test_finalize_installation(self, mock_get_service_info, mock_get_container_status,
+                                   seeded_status):
         """Test finalizing the installation."""
         # Setup mocks
-        mock_get_container_status.return_value = {
-            "sonarr": {
-                "status": "running",
-                "url": "http://localhost:8989"
-            },
-            "radarr": {
-                "status": "running",
-                "url": "http://localhost:7878"
-            },
-            "stopped_container": {
-                "status": "stopped",
-                "url": "http://localhost:9999"
-            }
-        }
-        mock_get_service_info.return_value = {
-            "arr_apps": {
-                "sonarr": {"enabled": True, "status": "running"},
-                "radarr": {"enabled": True, "status": "running"}
-            }
-        }
-        
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
-        install_wizard._installation_status.start_time = time.time() - 60  # 60 seconds ago
+        mock_get_container_status.return_value = _CONTAINER_STATUS
+        mock_get_service_info.return_value = _SERVICE_INFO
         
         result = install_wizard.finalize_installation()
         
@@ -625,7 +637,7 @@ class TestInstallWizardFunctions:
         assert result["container_summary"]["stopped"] == 1
         assert "container_urls" in result
         assert "sonarr" in result["container_urls"]
-        assert "installation_time" in result
+        assert result["installation_time"] == 60.0
         
         # Verify function calls
         mock_get_container_status.assert_called_once()
@@ -633,39 +645,23 @@ class TestInstallWizardFunctions:
         
         # Verify status updates
         assert install_wizard._installation_status.status == "completed"
-        assert install_wizard._installation_status.end_time is not None
+        assert install_wizard._installation_status.end_time == time.time()
         
         # Verify logs
         assert "Finalizing installation" in install_wizard._installation_status.logs[0]
 
-    @patch('src.core.install_wizard.check_system_compatibility')
-    @patch('src.core.install_wizard.setup_basic_configuration')
-    @patch('src.core.install_wizard.setup_network_configuration')
-    @patch('src.core.install_wizard.setup_storage_configuration')
-    @patch('src.core.install_wizard.setup_service_selection')
-    @patch('src.core.install_wizard.install_dependencies')
-    @patch('src.core.install_wizard.setup_docker')
-    @patch('src.core.install_wizard.generate_compose_files')
-    @patch('src.core.install_wizard.create_containers')
-    @patch('src.core.install_wizard.perform_post_installation')
-    @patch('src.core.install_wizard.finalize_installation')
-    def test_run_installation(self, mock_finalize, mock_post_install, mock_create_containers,
-                             mock_generate_compose, mock_setup_docker, mock_install_deps,
-                             mock_setup_services, mock_setup_storage, mock_setup_network,
-                             mock_setup_config, mock_check_compatibility):
+    @pytest.fixture
+    def step_mocks(self):
+        """Patch every installation step called by run_installation."""
+        with patch.multiple(install_wizard, **dict.fromkeys(_INSTALLATION_STEPS, DEFAULT)) as mocks:
+            yield mocks
+
+    def test_run_installation(self, step_mocks):
         """Test running the complete installation process."""
         # Setup mocks with successful results
-        mock_check_compatibility.return_value = {"status": "success", "compatible": True}
-        mock_setup_config.return_value = {"status": "success"}
-        mock_setup_network.return_value = {"status": "success"}
-        mock_setup_storage.return_value = {"status": "success"}
-        mock_setup_services.return_value = {"status": "success"}
-        mock_install_deps.return_value = {"status": "success"}
-        mock_setup_docker.return_value = {"status": "success"}
-        mock_generate_compose.return_value = {"status": "success"}
-        mock_create_containers.return_value = {"status": "success"}
-        mock_post_install.return_value = {"status": "success"}
-        mock_finalize.return_value = {"status": "success"}
+        for mock_step in step_mocks.values():
+            mock_step.return_value = {"status": "success"}
+        step_mocks['check_system_compatibility'].return_value = {"status": "success", "compatible": True}
         
         # Test data
         installation_config = {
@@ -694,21 +690,22 @@ class TestInstallWizardFunctions:
         assert result["status"] == "completed"
         
         # Verify all function calls
-        mock_check_compatibility.assert_called_once()
-        mock_setup_config.assert_called_once_with(installation_config.get("user_config", {}))
-        mock_setup_network.assert_called_once_with(installation_config.get("network_config", {}))
-        mock_setup_storage.assert_called_once_with(installation_config.get("storage_config", {}))
-        mock_setup_services.assert_called_once_with(installation_config.get("services_config", {}))
-        mock_install_deps.assert_called_once()
-        mock_setup_docker.assert_called_once()
-        mock_generate_compose.assert_called_once()
-        mock_create_containers.assert_called_once()
-        mock_post_install.assert_called_once()
-        mock_finalize.assert_called_once()
+        step_mocks['check_system_compatibility'].assert_called_once()
+        step_mocks['setup_basic_configuration'].assert_called_once_with(installation_config.get("user_config", {}))
+        step_mocks['setup_network_configuration'].assert_called_once_with(installation_config.get("network_config", {}))
+        step_mocks['setup_storage_configuration'].assert_called_once_with(installation_config.get("storage_config", {}))
+        step_mocks['setup_service_selection'].assert_called_once_with(installation_config.get("services_config", {}))
+        step_mocks['install_dependencies'].assert_called_once()
+        step_mocks['setup_docker'].assert_called_once()
+        step_mocks['generate_compose_files'].assert_called_once()
+        step_mocks['create_containers'].assert_called_once()
+        step_mocks['perform_post_installation'].assert_called_once()
+        step_mocks['finalize_installation'].assert_called_once()
 
     @patch('src.core.install_wizard.check_system_compatibility')
     @patch('src.core.install_wizard.setup_basic_configuration')
-    def test_run_installation_error_handling(self, mock_setup_config, mock_check_compatibility):
+    def test_run_installation_error_handling(self, mock_setup_config, mock_check_compatibility,
+                                             seeded_status):
         """Test error handling during installation process."""
         # Setup mocks with error in basic configuration
         mock_check_compatibility.return_value = {"status": "success", "compatible": True}
@@ -724,8 +721,6 @@ class TestInstallWizardFunctions:
         }
         
         # Ensure the installation status is in the correct state for testing errors
-        install_wizard._installation_status = InstallationStatus()
-        install_wizard._installation_status.start_time = time.time()
         install_wizard._installation_status.status = "in_progress"
         install_wizard._installation_status.add_error("Configuration error")
         
@@ -739,11 +734,83 @@ class TestInstallWizardFunctions:
         mock_check_compatibility.assert_called_once()
         mock_setup_config.assert_called_once()
 
-    @patch('src.core.install_wizard.check_system_compatibility')
-    def test_run_installation_not_compatible(self, mock_check_compatibility):
+    def test_run_installation_stops_at_failed_step(self, step_mocks):
+        """Test that no later step runs once a step fails."""
+        for mock_step in step_mocks.values():
+            mock_step.return_value = {"status": "success"}
+        step_mocks['setup_storage_configuration'].return_value = {"status": "error", "message": "Mount failed"}
+        
+        result = install_wizard.run_installation({})
+        
+        assert result["status"] == "failed"
+        step_mocks['setup_storage_configuration'].assert_called_once_with({})
+        for name in _INSTALLATION_STEPS[_INSTALLATION_STEPS.index('setup_storage_configuration') + 1:]:
+            step_mocks[name].assert_not_called()
+
+    def test_run_installation_resumes_after_failure(self, step_mocks, install_state_file):
+        """Test that a retry skips the steps completed before the failure."""
+        for mock_step in step_mocks.values():
+            mock_step.return_value = {"status": "success"}
+        step_mocks['setup_docker'].return_value = {"status": "error", "message": "Docker failed"}
+        
+        assert install_wizard.run_installation({})["status"] == "failed"
+        assert install_state_file.exists()
+        
+        # Retry with the same configuration once Docker setup succeeds
+        for mock_step in step_mocks.values():
+            mock_step.reset_mock()
+        step_mocks['setup_docker'].return_value = {"status": "success"}
+        
+        result = install_wizard.run_installation({})
+        
+        assert result["status"] == "completed"
+        resume_index = _INSTALLATION_STEPS.index('setup_docker')
+        for name in _INSTALLATION_STEPS[:resume_index]:
+            step_mocks[name].assert_not_called()
+        for name in _INSTALLATION_STEPS[resume_index:]:
+            step_mocks[name].assert_called_once()
+        
+        # A completed installation clears the checkpoint
+        assert not install_state_file.exists()
+
+    @pytest.mark.parametrize('retry_config,force', [
+        ({"user_config": {"timezone": "UTC"}}, False),
+        ({}, True),
+    ], ids=['changed_config', 'force'])
+    def test_run_installation_ignores_checkpoint(self, step_mocks, retry_config, force):
+        """Test that a changed configuration or force reruns every step."""
+        for mock_step in step_mocks.values():
+            mock_step.return_value = {"status": "success"}
+        step_mocks['setup_docker'].return_value = {"status": "error", "message": "Docker failed"}
+        install_wizard.run_installation({})
+        
+        for mock_step in step_mocks.values():
+            mock_step.reset_mock()
+        step_mocks['setup_docker'].return_value = {"status": "success"}
+        
+        result = install_wizard.run_installation(retry_config, force=force)
+        
+        assert result["status"] == "completed"
+        for name in _INSTALLATION_STEPS:
+            step_mocks[name].assert_called_once()
+
+    @pytest.mark.parametrize('content', [
+        '[]',
+        '{"config_hash": "x", "completed_steps": "setup_docker"}',
+        'not json',
+    ], ids=['not_a_dict', 'steps_not_a_list', 'invalid_json'])
+    def test_load_completed_steps_ignores_malformed_checkpoint(self, install_state_file, content):
+        """Test that a checkpoint of the wrong shape is treated as absent."""
+        install_state_file.write_text(content)
+        
+        assert install_wizard._load_completed_steps("x") == []
+
+    def test_run_installation_not_compatible(self, step_mocks):
         """Test installation with system not compatible but continuing anyway."""
-        # Setup mock with not compatible result
-        mock_check_compatibility.return_value = {
+        # Setup mocks with successful results and a not compatible check
+        for mock_step in step_mocks.values():
+            mock_step.return_value = {"status": "success"}
+        step_mocks['check_system_compatibility'].return_value = {
             "status": "success", 
             "compatible": False,
             "checks": {
@@ -753,31 +820,11 @@ class TestInstallWizardFunctions:
             }
         }
         
-        # Reset the global installation status
-        install_wizard._installation_status = InstallationStatus()
-        
-        # Create a mock for all steps after compatibility check
-        with patch('src.core.install_wizard.setup_basic_configuration', return_value={"status": "success"}), \
-             patch('src.core.install_wizard.setup_network_configuration', return_value={"status": "success"}), \
-             patch('src.core.install_wizard.setup_storage_configuration', return_value={"status": "success"}), \
-             patch('src.core.install_wizard.setup_service_selection', return_value={"status": "success"}), \
-             patch('src.core.install_wizard.install_dependencies', return_value={"status": "success"}), \
-             patch('src.core.install_wizard.setup_docker', return_value={"status": "success"}), \
-             patch('src.core.install_wizard.generate_compose_files', return_value={"status": "success"}), \
-             patch('src.core.install_wizard.create_containers', return_value={"status": "success"}), \
-             patch('src.core.install_wizard.perform_post_installation', return_value={"status": "success"}), \
-             patch('src.core.install_wizard.finalize_installation', return_value={"status": "success"}):
-             
-            installation_config = {"user_config": {}}
-            result = install_wizard.run_installation(installation_config)
-            
-            # Verify the installation continued despite compatibility warning
-            assert result["status"] == "completed"
-            
-            # Verify warning log
-            warning_log = False
-            for log in install_wizard._installation_status.logs:
-                if "System may not be fully compatible. Continuing anyway" in log:
-                    warning_log = True
-                    break
-            assert warning_log
\ No newline at end of file
+        installation_config = {"user_config": {}}
+        result = install_wizard.run_installation(installation_config)
+        
+        # Verify the installation continued despite compatibility warning
+        assert result["status"] == "completed"
+        
+        # Verify the warning was raised
+        assert "System may not be fully compatible. Continuing anyway." in install_wizard._installation_status.warnings
\ No newline at end of file
@@ -2,14 +2,31 @@
 Unit tests for the network manager module.
 """
 import pytest
+from collections import namedtuple
 from unittest.mock import patch, MagicMock
 import json
 import os
+import subprocess
+import time
 import psutil
 
 from src.core import network_manager
 
 
+# Lightweight stand-ins for psutil's snicaddr / snicstats and docker's ExecResult
+_Addr = namedtuple('Addr', 'family address netmask broadcast')
+_Stats = namedtuple('Stats', 'isup speed mtu')
+_ExecResult = namedtuple('ExecResult', 'exit_code output')
+
+
+@pytest.fixture(autouse=True)
+def _clear_network_cache():
+    """Start every test without cached VPN or Tailscale results."""
+    network_manager._clear_cache()
+    yield
+    network_manager._clear_cache()
+
+
 @pytest.mark.unit
 class TestNetworkManager:
     """Tests for the network_manager module."""
@@ -19,22 +36,22 @@ class TestNetworkManager:
         # Mock psutil network functions
         mock_if_addrs = {
             'eth0': [
-                MagicMock(family=psutil.AF_LINK, address='00:11:22:33:44:55'),
-                MagicMock(family=2, address='192.168.1.100', netmask='255.255.255.0', broadcast='192.168.1.255')
+                _Addr(psutil.AF_LINK, '00:11:22:33:44:55', None, None),
+                _Addr(2, '192.168.1.100', '255.255.255.0', '192.168.1.255')
             ],
             'wlan0': [
-                MagicMock(family=psutil.AF_LINK, address='AA:BB:CC:DD:EE:FF'),
-                MagicMock(family=2, address='192.168.1.101', netmask='255.255.255.0', broadcast='192.168.1.255')
+                _Addr(psutil.AF_LINK, 'AA:BB:CC:DD:EE:FF', None, None),
+                _Addr(2, '192.168.1.101', '255.255.255.0', '192.168.1.255')
             ],
             'lo': [
-                MagicMock(family=2, address='127.0.0.1', netmask='255.0.0.0', broadcast=None)
+                _Addr(2, '127.0.0.1', '255.0.0.0', None)
             ]
         }
         
         mock_if_stats = {
-            'eth0': MagicMock(isup=True, speed=1000, mtu=1500),
-            'wlan0': MagicMock(isup=True, speed=100, mtu=1500),
-            'lo': MagicMock(isup=True, speed=0, mtu=65536)
+            'eth0': _Stats(True, 1000, 1500),
+            'wlan0': _Stats(True, 100, 1500),
+            'lo': _Stats(True, 0, 65536)
         }
         
         with patch('psutil.net_if_addrs', return_value=mock_if_addrs), \
@@ -72,23 +89,15 @@ class TestNetworkManager:
     
     def test_get_vpn_status(self):
         """Test getting VPN status."""
-        with patch('subprocess.run') as mock_run:
-            # Mock docker ps command
-            mock_docker_ps = MagicMock()
-            mock_docker_ps.stdout = "container1\ngluetun\ncontainer3"
-            mock_docker_ps.returncode = 0
-            
-            # Mock curl command for IP info
-            mock_curl = MagicMock()
-            mock_curl.stdout = json.dumps({
+        with patch('src.core.network_manager._get_docker_client') as mock_client:
+            # Mock the running gluetun container and its IP info lookup
+            mock_container = MagicMock()
+            mock_container.exec_run.return_value = _ExecResult(0, json.dumps({
                 'ip': '123.45.67.89',
                 'city': 'Amsterdam',
                 'country': 'NL'
-            })
-            mock_curl.returncode = 0
-            
-            # Configure mock to return different values for different commands
-            mock_run.side_effect = [mock_docker_ps, mock_curl]
+            }).encode())
+            mock_client.return_value.containers.list.return_value = [mock_container]
             
             result = network_manager.get_vpn_status()
             
@@ -98,16 +107,17 @@ class TestNetworkManager:
             assert result['vpn']['provider'] == 'gluetun'
             assert result['vpn']['ip_address'] == '123.45.67.89'
             assert result['vpn']['location'] == 'Amsterdam, NL'
+            
+            mock_client.return_value.containers.list.assert_called_once_with(
+                filters={'name': ['gluetun', 'vpn']}
+            )
+            mock_container.exec_run.assert_called_once_with(network_manager._IPINFO_ARGV)
     
     def test_get_vpn_status_not_connected(self):
         """Test getting VPN status when not connected."""
-        with patch('subprocess.run') as mock_run:
-            # Mock docker ps command with no VPN container
-            mock_docker_ps = MagicMock()
-            mock_docker_ps.stdout = "container1\ncontainer2\ncontainer3"
-            mock_docker_ps.returncode = 0
-            
-            mock_run.return_value = mock_docker_ps
+        with patch('src.core.network_manager._get_docker_client') as mock_client:
+            # No VPN container matches the name filters
+            mock_client.return_value.containers.list.return_value = []
             
             result = network_manager.get_vpn_status()
             
@@ -118,7 +128,7 @@ class TestNetworkManager:
     
     def test_get_vpn_status_with_error(self):
         """Test handling errors when getting VPN status."""
-        with patch('subprocess.run', side_effect=Exception("Test error")):
+        with patch('src.core.network_manager._get_docker_client', side_effect=Exception("Test error")):
             result = network_manager.get_vpn_status()
             
             assert result['status'] == 'error'
@@ -142,6 +152,20 @@ class TestNetworkManager:
         assert result['details']['region'] == 'Netherlands'
         assert result['details']['credentials_set'] is True
     
+    def test_configure_vpn_canonical_provider(self):
+        """Test that the wizard's short provider value maps to the gluetun name."""
+        vpn_config = {
+            'enabled': True,
+            'provider': 'PIA',
+            'username': 'test_user',
+            'password': 'test_pass'
+        }
+        
+        result = network_manager.configure_vpn(vpn_config)
+        
+        assert result['status'] == 'success'
+        assert result['details']['provider'] == 'private internet access'
+    
     def test_configure_vpn_disabled(self):
         """Test configuring VPN when disabled."""
         vpn_config = {'enabled': False}
@@ -189,8 +213,9 @@ class TestNetworkManager:
         with patch('os.path.exists', return_value=True), \
              patch('subprocess.run') as mock_run:
             
-            mock_run.return_value.returncode = 0
-            mock_run.return_value.stdout = mock_status_json
+            mock_run.return_value = subprocess.CompletedProcess(
+                network_manager._TAILSCALE_STATUS_ARGV, 0, stdout=mock_status_json
+            )
             
             result = network_manager.get_tailscale_status()
             
@@ -211,6 +236,42 @@ class TestNetworkManager:
             assert result['tailscale']['installed'] is False
             assert result['tailscale']['running'] is False
     
+    def test_get_tailscale_status_not_installed_skips_probe(self):
+        """Test that the cached binary check avoids repeated stat and subprocess calls."""
+        with patch('os.path.exists', return_value=False) as mock_exists, \
+             patch('subprocess.run') as mock_run:
+            network_manager.get_tailscale_status()
+            
+            # Expire only the status result; the binary check is still cached
+            network_manager._TTL_CACHE.pop('get_tailscale_status')
+            result = network_manager.get_tailscale_status()
+            
+            assert result['tailscale']['installed'] is False
+            mock_exists.assert_called_once_with('/usr/bin/tailscale')
+            mock_run.assert_not_called()
+
+    def test_get_tailscale_status_reuses_parsed_output(self):
+        """Test that unchanged status output is parsed only once."""
+        mock_status_json = json.dumps({
+            'BackendState': 'Running',
+            'Self': {'HostName': 'test-host', 'TailscaleIPs': ['100.100.100.100']}
+        })
+
+        with patch('os.path.exists', return_value=True), \
+             patch('subprocess.run') as mock_run, \
+             patch.object(network_manager, '_json_loads', wraps=json.loads) as mock_loads:
+            mock_run.return_value = subprocess.CompletedProcess(
+                network_manager._TAILSCALE_STATUS_ARGV, 0, stdout=mock_status_json
+            )
+
+            network_manager.get_tailscale_status()
+            network_manager._TTL_CACHE.pop('get_tailscale_status')
+            result = network_manager.get_tailscale_status()
+
+            assert mock_run.call_count == 2
+            mock_loads.assert_called_once_with(mock_status_json)
+            assert result['tailscale']['hostname'] == 'test-host'
+
     def test_configure_tailscale(self):
         """Test configuring Tailscale."""
         tailscale_config = {
@@ -221,7 +282,9 @@ class TestNetworkManager:
         with patch('os.path.exists', return_value=True), \
              patch('subprocess.run') as mock_run:
             
-            mock_run.return_value.returncode = 0
+            mock_run.return_value = subprocess.CompletedProcess(
+                ["tailscale", "up"], 0, stdout="", stderr=""
+            )
             
             result = network_manager.configure_tailscale(tailscale_config)
             
@@ -290,4 +353,80 @@ class TestNetworkManager:
             assert 'tailscale' in result
             assert result['interfaces'] == interfaces_result['interfaces']
             assert result['vpn'] == vpn_result['vpn']
-            assert result['tailscale'] == tailscale_result['tailscale']
\ No newline at end of file
+            assert result['tailscale'] == tailscale_result['tailscale']
+    
+    def test_get_network_info_with_probe_error(self):
+        """Test that a failing probe does not prevent the other results."""
+        interfaces_result = {
+            'status': 'success',
+            'interfaces': {
+                'eth0': {'type': 'ethernet', 'addresses': []}
+            }
+        }
+        
+        tailscale_result = {
+            'status': 'success',
+            'tailscale': {
+                'installed': True,
+                'running': True
+            }
+        }
+        
+        with patch('src.core.network_manager.get_network_interfaces', return_value=interfaces_result), \
+             patch('src.core.network_manager.get_vpn_status', side_effect=Exception("Test error")), \
+             patch('src.core.network_manager.get_tailscale_status', return_value=tailscale_result):
+            
+            result = network_manager.get_network_info()
+            
+            assert result['interfaces'] == interfaces_result['interfaces']
+            assert result['vpn'] == {'connected': False, 'provider': None}
+            assert result['tailscale'] == tailscale_result['tailscale']
+    
+    def test_get_tailscale_status_is_cached(self):
+        """Test that repeated Tailscale polls reuse the cached result."""
+        with patch('os.path.exists', return_value=True), \
+             patch('subprocess.run') as mock_run:
+            
+            mock_run.return_value = subprocess.CompletedProcess(
+                network_manager._TAILSCALE_STATUS_ARGV, 0, stdout=json.dumps({'BackendState': 'Running'})
+            )
+            
+            first = network_manager.get_tailscale_status()
+            second = network_manager.get_tailscale_status()
+            
+            # Each caller gets its own copy of the cached result, nested dicts included
+            assert second == first
+            assert second is not first
+            first['tailscale']['running'] = False
+            assert network_manager.get_tailscale_status()['tailscale']['running'] is True
+            mock_run.assert_called_once()
+            
+            # Clearing the cache forces a fresh probe
+            network_manager._clear_cache()
+            network_manager.get_tailscale_status()
+            assert mock_run.call_count == 2
+    
+    def test_configure_tailscale_invalidates_status(self):
+        """Test that a status poll after tailscale down probes again."""
+        with patch('os.path.exists', return_value=True), \
+             patch('subprocess.run') as mock_run:
+            
+            mock_run.return_value = subprocess.CompletedProcess(
+                network_manager._TAILSCALE_STATUS_ARGV, 0, stdout=json.dumps({'BackendState': 'Running'})
+            )
+            assert network_manager.get_tailscale_status()['tailscale']['running'] is True
+            
+            network_manager.configure_tailscale({'enabled': False})
+            
+            mock_run.return_value = subprocess.CompletedProcess(
+                network_manager._TAILSCALE_STATUS_ARGV, 0, stdout=json.dumps({'BackendState': 'Stopped'})
+            )
+            assert network_manager.get_tailscale_status()['tailscale']['running'] is False
+    
+    def test_configure_vpn_invalidates_status(self):
+        """Test that configuring the VPN drops the cached VPN status."""
+        network_manager._TTL_CACHE['get_vpn_status'] = (time.monotonic(), 3, {'connected': False})
+        
+        network_manager.configure_vpn({'enabled': False})
+        
+        assert 'get_vpn_status' not in network_manager._TTL_CACHE
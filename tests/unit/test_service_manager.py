@@ -3,19 +3,29 @@ Unit tests for the service_manager module.
 """
 
 import os
-import json
+import copy
+import shutil
+import subprocess
 import tempfile
-import yaml
 import pytest
-from unittest.mock import patch, MagicMock, mock_open
+from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
+from unittest.mock import patch, MagicMock
 
-from src.core import service_manager
+from src.core import config, docker_manager, service_manager, system_info
 
 
-@pytest.fixture
-def mock_services_config():
-    """Fixture providing sample services configuration."""
-    return {
+# Config directory returned by the patched config.get_config_dir
+_CONFIG_DIR = "/home/user/.config/pi-pvarr"
+
+
+# Sample data built once at import. The session-scoped fixtures below hand
+# out these shared instances; patched_core gives the code under test mutable
+# copies, since it mutates the configs it loads. The services config is
+# frozen per category so a missed copy fails loudly
+_MOCK_SERVICES_CONFIG = MappingProxyType({
+    category: MappingProxyType(services)
+    for category, services in {
         "arr_apps": {
             "sonarr": True,
             "radarr": True,
@@ -44,529 +54,430 @@ def mock_services_config():
             "nginx_proxy_manager": False,
             "get_iplayer": True
         }
+    }.items()
+})
+
+_MOCK_SYSTEM_CONFIG = {
+    "puid": 1000,
+    "pgid": 1000,
+    "timezone": "Europe/London",
+    "media_dir": "/mnt/media",
+    "downloads_dir": "/mnt/downloads",
+    "docker_dir": "/home/user/docker",
+    "vpn": {
+        "enabled": True,
+        "provider": "private internet access",
+        "username": "testuser",
+        "password": "testpass",
+        "region": "Netherlands"
+    },
+    "tailscale": {
+        "enabled": False,
+        "auth_key": ""
+    },
+    "installation_status": "not_started"
+}
+
+# Container status is frozen, down to the port mappings, so the shared
+# instance can be handed out without copying
+_MOCK_CONTAINER_STATUS = MappingProxyType({
+    name: MappingProxyType({
+        "status": status,
+        "ports": (MappingProxyType({"container": port, "host": port, "protocol": "tcp"}),),
+        "type": service_type,
+        "description": description,
+        "url": url
+    })
+    for name, status, port, service_type, description, url in (
+        ("sonarr", "running", "8989", "media", "TV Series Management", "http://localhost:8989"),
+        ("radarr", "running", "7878", "media", "Movie Management", "http://localhost:7878"),
+        ("prowlarr", "running", "9696", "media", "Indexer Management", "http://localhost:9696"),
+        ("transmission", "running", "9091", "download", "Torrent Client", "http://localhost:9091"),
+        ("nzbget", "stopped", "6789", "download", "Usenet Client", None),
+        ("jellyfin", "running", "8096", "media", "Media Server", "http://localhost:8096"),
+        ("portainer", "running", "9000", "utility", "Docker Management", "http://localhost:9000"),
+        ("get_iplayer", "running", "1935", "utility", "BBC Content Downloader", "http://localhost:1935"),
+    )
+})
+
+_MOCK_SYSTEM_INFO = {
+    "hostname": "raspberry-pi",
+    "architecture": "aarch64",
+    "memory": {
+        "total_gb": 4,
+        "available_gb": 2.5
+    },
+    "raspberry_pi": {
+        "is_raspberry_pi": True,
+        "model": "Raspberry Pi 4 Model B Rev 1.2"
+    },
+    "transcoding": {
+        "vaapi_available": False,
+        "nvdec_available": False,
+        "v4l2_available": True,
+        "recommended_method": "v4l2"
     }
+}
 
+_MOCK_SERVICE_INFO_SUMMARY = {
+    "arr_apps": {
+        "sonarr": {"enabled": True, "status": "running"},
+        "radarr": {"enabled": True, "status": "running"}
+    },
+    "download_clients": {
+        "transmission": {"enabled": True, "status": "running"},
+        "nzbget": {"enabled": True, "status": "stopped"}
+    },
+    "media_servers": {
+        "jellyfin": {"enabled": True, "status": "running"}
+    },
+    "utilities": {
+        "portainer": {"enabled": True, "status": "running"}
+    }
+}
 
-@pytest.fixture
+
+@pytest.fixture(scope="session")
+def mock_services_config():
+    """Fixture providing sample services configuration, shared read-only across the session."""
+    return _MOCK_SERVICES_CONFIG
+
+
+@pytest.fixture(scope="session")
 def mock_system_config():
-    """Fixture providing sample system configuration."""
-    return {
-        "puid": 1000,
-        "pgid": 1000,
-        "timezone": "Europe/London",
-        "media_dir": "/mnt/media",
-        "downloads_dir": "/mnt/downloads",
-        "docker_dir": "/home/user/docker",
-        "vpn": {
-            "enabled": True,
-            "provider": "private internet access",
-            "username": "testuser",
-            "password": "testpass",
-            "region": "Netherlands"
-        },
-        "tailscale": {
-            "enabled": False,
-            "auth_key": ""
-        },
-        "installation_status": "not_started"
-    }
+    """Fixture providing sample system configuration, shared read-only across the session."""
+    return _MOCK_SYSTEM_CONFIG
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_container_status():
-    """Fixture providing sample container status."""
-    return {
-        "sonarr": {
-            "status": "running",
-            "ports": [{"container": "8989", "host": "8989", "protocol": "tcp"}],
-            "type": "media",
-            "description": "TV Series Management",
-            "url": "http://localhost:8989"
-        },
-        "radarr": {
-            "status": "running",
-            "ports": [{"container": "7878", "host": "7878", "protocol": "tcp"}],
-            "type": "media",
-            "description": "Movie Management",
-            "url": "http://localhost:7878"
-        },
-        "prowlarr": {
-            "status": "running",
-            "ports": [{"container": "9696", "host": "9696", "protocol": "tcp"}],
-            "type": "media",
-            "description": "Indexer Management",
-            "url": "http://localhost:9696"
-        },
-        "transmission": {
-            "status": "running",
-            "ports": [{"container": "9091", "host": "9091", "protocol": "tcp"}],
-            "type": "download",
-            "description": "Torrent Client",
-            "url": "http://localhost:9091"
-        },
-        "nzbget": {
-            "status": "stopped",
-            "ports": [{"container": "6789", "host": "6789", "protocol": "tcp"}],
-            "type": "download",
-            "description": "Usenet Client",
-            "url": None
-        },
-        "jellyfin": {
-            "status": "running",
-            "ports": [{"container": "8096", "host": "8096", "protocol": "tcp"}],
-            "type": "media",
-            "description": "Media Server",
-            "url": "http://localhost:8096"
-        },
-        "portainer": {
-            "status": "running",
-            "ports": [{"container": "9000", "host": "9000", "protocol": "tcp"}],
-            "type": "utility",
-            "description": "Docker Management",
-            "url": "http://localhost:9000"
-        },
-        "get_iplayer": {
-            "status": "running",
-            "ports": [{"container": "1935", "host": "1935", "protocol": "tcp"}],
-            "type": "utility",
-            "description": "BBC Content Downloader",
-            "url": "http://localhost:1935"
-        }
-    }
+    """Fixture providing sample container status, shared read-only across the session."""
+    return _MOCK_CONTAINER_STATUS
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def mock_system_info():
-    """Fixture providing sample system information."""
-    return {
-        "hostname": "raspberry-pi",
-        "architecture": "aarch64",
-        "memory": {
-            "total_gb": 4,
-            "available_gb": 2.5
-        },
-        "raspberry_pi": {
-            "is_raspberry_pi": True,
-            "model": "Raspberry Pi 4 Model B Rev 1.2"
-        },
-        "transcoding": {
-            "vaapi_available": False,
-            "nvdec_available": False,
-            "v4l2_available": True,
-            "recommended_method": "v4l2"
-        }
-    }
+    """Fixture providing sample system information, shared read-only across the session."""
+    return _MOCK_SYSTEM_INFO
+
+
+@pytest.fixture(scope="session")
+def mock_service_info_summary():
+    """Fixture providing enabled state and status per service, shared read-only across the session."""
+    return _MOCK_SERVICE_INFO_SUMMARY
+
+
+@pytest.fixture(scope="module")
+def compatibility_result(mock_system_info):
+    """Service compatibility for the sample system, computed once and shared read-only."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(system_info, 'get_system_info', lambda: mock_system_info)
+        return service_manager.get_service_compatibility()
+
+
+@pytest.fixture
+def temp_files(tmp_path, monkeypatch):
+    """Create the files service_manager writes with tempfile in a per-test directory."""
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def patched_core(monkeypatch, recorder, mock_services_config, mock_system_config):
+    """
+    Point the config accessors used by service_manager at the sample data.
+
+    The loaders return a fresh deep copy, as reading the config file would,
+    and the save functions are replaced by recorders exposed on the returned
+    namespace.
+    """
+    saves = SimpleNamespace(save_services_config=recorder(), save_config_wrapper=recorder())
+    monkeypatch.setattr(config, 'get_services_config',
+                        lambda: {k: dict(v) for k, v in mock_services_config.items()})
+    monkeypatch.setattr(config, 'get_config', lambda: copy.deepcopy(mock_system_config))
+    monkeypatch.setattr(config, 'get_config_dir', lambda: _CONFIG_DIR)
+    monkeypatch.setattr(config, 'save_services_config', saves.save_services_config)
+    monkeypatch.setattr(config, 'save_config_wrapper', saves.save_config_wrapper)
+    return saves
+
+
+@pytest.fixture
+def docker_env(patched_core, monkeypatch):
+    """
+    Make the Docker Compose file exist and use the built-in compose command.
+
+    Returns:
+        str: Path of the Docker Compose file under the patched config directory.
+    """
+    monkeypatch.setattr(os.path, 'exists', lambda path: True)
+    monkeypatch.setattr(service_manager, 'get_docker_compose_cmd', lambda: "docker compose")
+    return os.path.join(_CONFIG_DIR, "docker-compose", "docker-compose.yml")
+
+
+@pytest.fixture
+def popen_result(monkeypatch, recorder):
+    """
+    Factory that patches subprocess.Popen to return a finished process.
+
+    Call it with the process's returncode, stdout and stderr; it returns the
+    recorder standing in for Popen.
+    """
+    def make(returncode=0, stdout="", stderr=""):
+        process = SimpleNamespace(returncode=returncode, communicate=lambda: (stdout, stderr))
+        popen = recorder(process)
+        monkeypatch.setattr(subprocess, 'Popen', popen)
+        return popen
+    return make
 
 
 class TestServiceManager:
     """Tests for service_manager module."""
 
-    def test_get_service_info(self, mock_services_config, mock_container_status):
+    def test_get_service_info(self, patched_core, monkeypatch, mock_container_status):
         """Test get_service_info function."""
-        with patch('src.core.config.get_services_config', return_value=mock_services_config), \
-             patch('src.core.docker_manager.get_container_status', return_value=mock_container_status):
-            result = service_manager.get_service_info()
-            
-            # Check structure
-            assert isinstance(result, dict)
-            assert set(result.keys()) == set(["arr_apps", "download_clients", "media_servers", "utilities"])
-            
-            # Check that the result contains all services from the configuration
-            assert "sonarr" in result["arr_apps"]
-            assert "transmission" in result["download_clients"]
-            assert "jellyfin" in result["media_servers"]
-            assert "portainer" in result["utilities"]
-            
-            # Check that container status is integrated
-            assert result["arr_apps"]["sonarr"]["status"] == "running"
-            assert result["arr_apps"]["sonarr"]["url"] == "http://localhost:8989"
-            assert result["download_clients"]["nzbget"]["status"] == "stopped"
-            
-            # Check that non-running containers still have basic info
-            assert result["arr_apps"]["lidarr"]["enabled"] is False
-            assert result["arr_apps"]["lidarr"]["status"] == "not_installed"
-            assert "url" not in result["arr_apps"]["lidarr"]
+        monkeypatch.setattr(docker_manager, 'get_container_status', lambda: mock_container_status)
+        result = service_manager.get_service_info()
+        
+        # Check structure
+        assert isinstance(result, dict)
+        assert set(result.keys()) == set(["arr_apps", "download_clients", "media_servers", "utilities"])
+        
+        # Check that the result contains all services from the configuration
+        assert "sonarr" in result["arr_apps"]
+        assert "transmission" in result["download_clients"]
+        assert "jellyfin" in result["media_servers"]
+        assert "portainer" in result["utilities"]
+        
+        # Check that container status is integrated
+        assert result["arr_apps"]["sonarr"]["status"] == "running"
+        assert result["arr_apps"]["sonarr"]["url"] == "http://localhost:8989"
+        assert result["download_clients"]["nzbget"]["status"] == "stopped"
+        
+        # Check that non-running containers still have basic info
+        assert result["arr_apps"]["lidarr"]["enabled"] is False
+        assert result["arr_apps"]["lidarr"]["status"] == "not_installed"
+        assert "url" not in result["arr_apps"]["lidarr"]
     
-    def test_toggle_service_enable(self, mock_services_config):
+    def test_toggle_service_enable(self, assert_ok, patched_core):
         """Test toggle_service function to enable a service."""
-        with patch('src.core.config.get_services_config', return_value=mock_services_config), \
-             patch('src.core.config.save_services_config') as mock_save:
-            # Toggle service from False to True
-            result = service_manager.toggle_service("lidarr", True)
-            
-            assert result["status"] == "success"
-            assert "lidarr" in result["message"]
-            assert "enabled" in result["message"]
-            
-            # Verify save was called with updated config
-            updated_config = mock_services_config.copy()
-            updated_config["arr_apps"]["lidarr"] = True
-            mock_save.assert_called_once()
-            assert mock_save.call_args[0][0]["arr_apps"]["lidarr"] is True
+        # Toggle service from False to True
+        result = service_manager.toggle_service("lidarr", True)
+        
+        assert_ok(result, "Service 'lidarr' enabled successfully")
+        
+        # Verify save was called with updated config
+        mock_save = patched_core.save_services_config
+        assert mock_save.call_count == 1
+        assert mock_save.call_args[0][0]["arr_apps"]["lidarr"] is True
     
-    def test_toggle_service_disable(self, mock_services_config):
+    def test_toggle_service_disable(self, assert_ok, patched_core):
         """Test toggle_service function to disable a service."""
-        with patch('src.core.config.get_services_config', return_value=mock_services_config), \
-             patch('src.core.config.save_services_config') as mock_save:
-            # Toggle service from True to False
-            result = service_manager.toggle_service("sonarr", False)
-            
-            assert result["status"] == "success"
-            assert "sonarr" in result["message"]
-            assert "disabled" in result["message"]
-            
-            # Verify save was called with updated config
-            mock_save.assert_called_once()
-            assert mock_save.call_args[0][0]["arr_apps"]["sonarr"] is False
+        # Toggle service from True to False
+        result = service_manager.toggle_service("sonarr", False)
+        
+        assert_ok(result, "Service 'sonarr' disabled successfully")
+        
+        # Verify save was called with updated config
+        mock_save = patched_core.save_services_config
+        assert mock_save.call_count == 1
+        assert mock_save.call_args[0][0]["arr_apps"]["sonarr"] is False
     
-    def test_toggle_service_not_found(self, mock_services_config):
+    def test_toggle_service_not_found(self, patched_core):
         """Test toggle_service function with a non-existent service."""
-        with patch('src.core.config.get_services_config', return_value=mock_services_config):
-            result = service_manager.toggle_service("non_existent_service", True)
-            
-            assert result["status"] == "error"
-            assert "not found" in result["message"]
+        result = service_manager.toggle_service("non_existent_service", True)
+        
+        assert result["status"] == "error"
+        assert "not found" in result["message"]
+        assert patched_core.save_services_config.call_count == 0
     
-    def test_get_service_compatibility(self, mock_system_info):
+    def test_get_service_compatibility(self, assert_ok, compatibility_result):
         """Test get_service_compatibility function."""
-        with patch('src.core.system_info.get_system_info', return_value=mock_system_info):
-            result = service_manager.get_service_compatibility()
-            
-            assert result["status"] == "success"
-            assert "system_info" in result
-            assert "compatibility" in result
-            assert "is_raspberry_pi" in result["system_info"]
-            assert result["system_info"]["is_raspberry_pi"] is True
-            
-            # Check that compatibility info is present for services
-            assert "media_servers" in result["compatibility"]
-            assert "arr_apps" in result["compatibility"]
-            assert "download_clients" in result["compatibility"]
-            assert "utilities" in result["compatibility"]
-            
-            # Check compatibility for specific services
-            assert result["compatibility"]["media_servers"]["jellyfin"]["compatible"] is True
-            assert result["compatibility"]["media_servers"]["jellyfin"]["recommended"] is True
-            
-            # Plex is not ideal for Pi but should be compatible on ARM64
-            assert result["compatibility"]["media_servers"]["plex"]["compatible"] is True
-            # But not recommended without more memory and transcoding
-            assert result["compatibility"]["media_servers"]["plex"]["recommended"] is False
-            
-            # Core services should always be compatible
-            assert result["compatibility"]["arr_apps"]["sonarr"]["compatible"] is True
-            assert result["compatibility"]["download_clients"]["transmission"]["compatible"] is True
+        result = compatibility_result
+        
+        assert_ok(result)
+        assert "system_info" in result
+        assert "compatibility" in result
+        assert "is_raspberry_pi" in result["system_info"]
+        assert result["system_info"]["is_raspberry_pi"] is True
+        
+        # Check that compatibility info is present for services
+        assert "media_servers" in result["compatibility"]
+        assert "arr_apps" in result["compatibility"]
+        assert "download_clients" in result["compatibility"]
+        assert "utilities" in result["compatibility"]
+    
+    @pytest.mark.parametrize('category,service,field,expected', [
+        ("media_servers", "jellyfin", "compatible", True),
+        ("media_servers", "jellyfin", "recommended", True),
+        # Plex is not ideal for Pi but should be compatible on ARM64,
+        # but not recommended without more memory and transcoding
+        ("media_servers", "plex", "compatible", True),
+        ("media_servers", "plex", "recommended", False),
+        # Core services should always be compatible
+        ("arr_apps", "sonarr", "compatible", True),
+        ("download_clients", "transmission", "compatible", True),
+    ])
+    def test_service_compatibility(self, compatibility_result, category, service, field, expected):
+        """Test the compatibility reported for specific services."""
+        assert compatibility_result["compatibility"][category][service][field] is expected
     
-    def test_generate_docker_compose(self, mock_services_config, mock_system_config):
+    def test_generate_docker_compose(self, assert_ok, patched_core, temp_files):
         """Test generate_docker_compose function."""
-        with patch('src.core.config.get_services_config', return_value=mock_services_config), \
-             patch('src.core.config.get_config', return_value=mock_system_config), \
-             patch('tempfile.NamedTemporaryFile') as mock_tempfile, \
-             patch('yaml.dump', return_value="dummy yaml content"):
-            
-            # Setup mock temporary file
-            mock_file = MagicMock()
-            mock_file.name = "/tmp/test-docker-compose.yml"
-            mock_tempfile.return_value.__enter__.return_value = mock_file
-            
-            result = service_manager.generate_docker_compose()
-            
-            assert result["status"] == "success"
-            assert result["message"] == "Docker Compose file generated successfully"
-            assert "compose_file" in result
-            assert result["temp_file_path"] == "/tmp/test-docker-compose.yml"
-            
-            # Verify file was written
-            mock_file.write.assert_called_once()
+        result = service_manager.generate_docker_compose()
+        
+        assert_ok(result, "Docker Compose file generated successfully")
+        assert "compose_file" in result
+        
+        # Verify the compose file was written to a temporary file
+        compose_file = Path(result["temp_file_path"])
+        assert compose_file.parent == temp_files
+        assert compose_file.suffix == ".yml"
+        assert compose_file.read_text() == result["compose_file"]
+        assert "sonarr:" in result["compose_file"]
     
-    def test_generate_env_file(self, mock_system_config):
+    def test_generate_env_file(self, assert_ok, patched_core, temp_files):
         """Test generate_env_file function."""
-        with patch('src.core.config.get_config', return_value=mock_system_config), \
-             patch('tempfile.NamedTemporaryFile') as mock_tempfile:
-            
-            # Setup mock temporary file
-            mock_file = MagicMock()
-            mock_file.name = "/tmp/test.env"
-            mock_tempfile.return_value.__enter__.return_value = mock_file
-            
-            result = service_manager.generate_env_file()
-            
-            assert result["status"] == "success"
-            assert result["message"] == ".env file generated successfully"
-            assert "env_file" in result
-            assert result["temp_file_path"] == "/tmp/test.env"
-            
-            # Verify env file contains expected variables
-            env_content = result["env_file"]
-            assert "PUID=1000" in env_content
-            assert "PGID=1000" in env_content
-            assert "TIMEZONE=Europe/London" in env_content
-            assert "MEDIA_DIR=/mnt/media" in env_content
-            assert "DOWNLOADS_DIR=/mnt/downloads" in env_content
-            
+        result = service_manager.generate_env_file()
+        
+        assert_ok(result, ".env file generated successfully")
+        assert "env_file" in result
+        
+        # Verify the env file was written to a temporary file
+        env_file = Path(result["temp_file_path"])
+        assert env_file.parent == temp_files
+        assert env_file.read_text() == result["env_file"]
+        
+        # Verify env file contains expected variables, each on its own line
+        env_lines = set(result["env_file"].splitlines())
+        assert {
+            "PUID=1000",
+            "PGID=1000",
+            "TIMEZONE=Europe/London",
+            "MEDIA_DIR=/mnt/media",
+            "DOWNLOADS_DIR=/mnt/downloads",
             # VPN config should be included since it's enabled
-            assert "VPN_CONTAINER=gluetun" in env_content
-            assert "OPENVPN_USER=testuser" in env_content
-            
-            # Tailscale should not be included since it's disabled
-            assert "TAILSCALE_AUTH_KEY=" not in env_content
+            "VPN_CONTAINER=gluetun",
+            "OPENVPN_USER=testuser",
+        } <= env_lines
+        
+        # Tailscale should not be included since it's disabled
+        assert not any(line.startswith("TAILSCALE_AUTH_KEY=") for line in env_lines)
     
-    def test_apply_service_changes(self, mock_services_config, mock_system_config):
+    def test_apply_service_changes(self, assert_ok, patched_core, monkeypatch, recorder):
         """Test apply_service_changes function."""
         compose_file_path = "/tmp/test-docker-compose.yml"
         env_file_path = "/tmp/test.env"
-        config_dir = "/home/user/.config/pi-pvarr"
-        
-        with patch('src.core.service_manager.generate_docker_compose') as mock_generate_compose, \
-             patch('src.core.service_manager.generate_env_file') as mock_generate_env, \
-             patch('src.core.config.get_config_dir', return_value=config_dir), \
-             patch('os.makedirs') as mock_makedirs, \
-             patch('shutil.copy') as mock_copy, \
-             patch('os.unlink') as mock_unlink, \
-             patch('src.core.config.get_config', return_value=mock_system_config), \
-             patch('src.core.config.save_config_wrapper') as mock_save:
-            
-            # Setup mock returns
-            mock_generate_compose.return_value = {
-                "status": "success",
-                "message": "Docker Compose file generated successfully",
-                "compose_file": "dummy yaml content",
-                "temp_file_path": compose_file_path
-            }
-            
-            mock_generate_env.return_value = {
-                "status": "success", 
-                "message": ".env file generated successfully",
-                "env_file": "dummy env content",
-                "temp_file_path": env_file_path
-            }
-            
-            result = service_manager.apply_service_changes()
-            
-            assert result["status"] == "success"
-            assert result["message"] == "Service changes applied successfully"
-            assert "docker_compose_path" in result
-            assert "env_path" in result
-            
-            # Verify directories were created
-            mock_makedirs.assert_called_with(os.path.join(config_dir, "docker-compose"), exist_ok=True)
-            
-            # Verify files were copied and cleaned up
-            assert mock_copy.call_count == 2
-            assert mock_unlink.call_count == 2
-            
-            # Verify config was updated
-            mock_save.assert_called_once()
-            updated_config = mock_system_config.copy()
-            updated_config["installation_status"] = "configured"
-            assert mock_save.call_args[0][0]["installation_status"] == "configured"
-    
-    def test_get_docker_compose_cmd_builtin(self):
-        """Test get_docker_compose_cmd with built-in Docker Compose."""
-        with patch('subprocess.run') as mock_run:
-            # Mock successful 'docker compose' command
-            mock_process = MagicMock()
-            mock_process.returncode = 0
-            mock_run.return_value = mock_process
-            
-            cmd = service_manager.get_docker_compose_cmd()
-            assert cmd == "docker compose"
-            
-            # Verify 'docker compose' was checked
-            mock_run.assert_called_with(
-                ["docker", "compose", "version"],
-                stdout=-1,
-                stderr=-1,
-                check=False
-            )
+        
+        mock_generate_compose = recorder({
+            "status": "success",
+            "message": "Docker Compose file generated successfully",
+            "compose_file": "dummy yaml content",
+            "temp_file_path": compose_file_path
+        })
+        mock_generate_env = recorder({
+            "status": "success", 
+            "message": ".env file generated successfully",
+            "env_file": "dummy env content",
+            "temp_file_path": env_file_path
+        })
+        mock_makedirs = recorder()
+        mock_copy = recorder()
+        mock_unlink = recorder()
+        monkeypatch.setattr(service_manager, 'generate_docker_compose', mock_generate_compose)
+        monkeypatch.setattr(service_manager, 'generate_env_file', mock_generate_env)
+        monkeypatch.setattr(os, 'makedirs', mock_makedirs)
+        monkeypatch.setattr(shutil, 'copy', mock_copy)
+        monkeypatch.setattr(os, 'unlink', mock_unlink)
+        
+        result = service_manager.apply_service_changes()
+        
+        assert_ok(result, "Service changes applied successfully")
+        assert "docker_compose_path" in result
+        assert "env_path" in result
+        
+        # Verify directories were created
+        assert mock_makedirs.call_args == (
+            (os.path.join(_CONFIG_DIR, "docker-compose"),), {"exist_ok": True}
+        )
+        
+        # Verify files were copied and cleaned up
+        assert mock_copy.call_count == 2
+        assert mock_unlink.call_count == 2
+        
+        # Verify config was updated
+        mock_save = patched_core.save_config_wrapper
+        assert mock_save.call_count == 1
+        assert mock_save.call_args[0][0]["installation_status"] == "configured"
     
-    def test_get_docker_compose_cmd_standalone(self):
-        """Test get_docker_compose_cmd with standalone docker-compose."""
-        with patch('subprocess.run') as mock_run:
-            # Mock failure of 'docker compose' but success of 'docker-compose'
-            mock_run.side_effect = [
-                # First call fails (docker compose)
-                MagicMock(returncode=1),
-                # Second call succeeds (docker-compose)
-                MagicMock(returncode=0)
-            ]
+    @pytest.mark.parametrize('returncodes,expected', [
+        ((0,), "docker compose"),
+        ((1, 0), "docker-compose"),
+    ], ids=['builtin', 'standalone'])
+    def test_get_docker_compose_cmd(self, returncodes, expected):
+        """Test get_docker_compose_cmd with built-in and standalone Docker Compose."""
+        probes = [
+            ["docker", "compose", "version"],
+            ["docker-compose", "--version"]
+        ]
+        
+        with patch.object(subprocess, 'run') as mock_run:
+            # Each probe fails until one returns 0
+            mock_run.side_effect = [MagicMock(returncode=r) for r in returncodes]
             
             cmd = service_manager.get_docker_compose_cmd()
-            assert cmd == "docker-compose"
+            assert cmd == expected
             
-            # Verify both commands were checked
-            assert mock_run.call_count == 2
-            mock_run.assert_any_call(
-                ["docker", "compose", "version"],
-                stdout=-1,
-                stderr=-1,
-                check=False
-            )
-            mock_run.assert_any_call(
-                ["docker-compose", "--version"],
-                stdout=-1,
-                stderr=-1,
-                check=False
-            )
+            # Verify the probes were checked in order, stopping at the first success
+            assert [c.args[0] for c in mock_run.call_args_list] == probes[:len(returncodes)]
+            for c in mock_run.call_args_list:
+                assert c.kwargs == {"stdout": -1, "stderr": -1, "check": False}
     
-    def test_start_services_success(self):
-        """Test start_services function with successful execution."""
-        docker_compose_file = "/home/user/.config/pi-pvarr/docker-compose/docker-compose.yml"
-        
-        with patch('os.path.exists', return_value=True), \
-             patch('src.core.config.get_config_dir', return_value="/home/user/.config/pi-pvarr"), \
-             patch('src.core.service_manager.get_docker_compose_cmd', return_value="docker compose"), \
-             patch('subprocess.Popen') as mock_popen, \
-             patch('src.core.config.get_config', return_value={"installation_status": "configured"}), \
-             patch('src.core.config.save_config_wrapper') as mock_save:
-            
-            # Mock successful process execution
-            mock_process = MagicMock()
-            mock_process.returncode = 0
-            mock_process.communicate.return_value = ("Services started", "")
-            mock_popen.return_value = mock_process
-            
-            result = service_manager.start_services()
-            
-            assert result["status"] == "success"
-            assert result["message"] == "Services started successfully"
-            assert result["output"] == "Services started"
-            
-            # Verify command was executed with correct parameters
-            mock_popen.assert_called_with(
-                f"docker compose -f {docker_compose_file} up -d",
-                shell=True,
-                stdout=-1,
-                stderr=-1,
-                text=True
-            )
-            
-            # Verify status was updated
-            mock_save.assert_called_once()
-            assert mock_save.call_args[0][0]["installation_status"] == "running"
+    @pytest.mark.parametrize('func_name,subcmd,success_msg,output,saved_status', [
+        ('start_services', 'up -d', 'Services started successfully', 'Services started', ['running']),
+        ('stop_services', 'down', 'Services stopped successfully', 'Services stopped', ['configured']),
+        ('restart_services', 'restart', 'Services restarted successfully', 'Services restarted', []),
+    ])
+    def test_service_lifecycle(self, assert_ok, patched_core, docker_env, popen_result,
+                               func_name, subcmd, success_msg, output, saved_status):
+        """Test the start, stop and restart functions with successful execution."""
+        mock_popen = popen_result(0, output, "")
+        
+        result = getattr(service_manager, func_name)()
+        
+        assert_ok(result, success_msg)
+        assert result["output"] == output
+        
+        # Verify command was executed with correct parameters
+        assert mock_popen.call_args == (
+            (f"docker compose -f {docker_env} {subcmd}",),
+            {"shell": True, "stdout": -1, "stderr": -1, "text": True}
+        )
+        
+        # Verify the installation status saved, if any
+        saved_configs = [args[0] for args, _ in patched_core.save_config_wrapper.calls]
+        assert [c["installation_status"] for c in saved_configs] == saved_status
     
-    def test_start_services_error(self):
+    def test_start_services_error(self, patched_core, docker_env, popen_result):
         """Test start_services function with execution error."""
-        # Unused but kept for context
-        # docker_compose_file = "/home/user/.config/pi-pvarr/docker-compose/docker-compose.yml"
+        popen_result(1, "", "Error starting services")
         
-        with patch('os.path.exists', return_value=True), \
-             patch('src.core.config.get_config_dir', return_value="/home/user/.config/pi-pvarr"), \
-             patch('src.core.service_manager.get_docker_compose_cmd', return_value="docker compose"), \
-             patch('subprocess.Popen') as mock_popen:
-            
-            # Mock failed process execution
-            mock_process = MagicMock()
-            mock_process.returncode = 1
-            mock_process.communicate.return_value = ("", "Error starting services")
-            mock_popen.return_value = mock_process
-            
-            result = service_manager.start_services()
-            
-            assert result["status"] == "error"
-            assert "Error starting services" in result["message"]
-            assert result["output"] == "Error starting services"
-    
-    def test_stop_services_success(self):
-        """Test stop_services function with successful execution."""
-        docker_compose_file = "/home/user/.config/pi-pvarr/docker-compose/docker-compose.yml"
-        
-        with patch('os.path.exists', return_value=True), \
-             patch('src.core.config.get_config_dir', return_value="/home/user/.config/pi-pvarr"), \
-             patch('src.core.service_manager.get_docker_compose_cmd', return_value="docker compose"), \
-             patch('subprocess.Popen') as mock_popen, \
-             patch('src.core.config.get_config', return_value={"installation_status": "running"}), \
-             patch('src.core.config.save_config_wrapper') as mock_save:
-            
-            # Mock successful process execution
-            mock_process = MagicMock()
-            mock_process.returncode = 0
-            mock_process.communicate.return_value = ("Services stopped", "")
-            mock_popen.return_value = mock_process
-            
-            result = service_manager.stop_services()
-            
-            assert result["status"] == "success"
-            assert result["message"] == "Services stopped successfully"
-            assert result["output"] == "Services stopped"
-            
-            # Verify command was executed with correct parameters
-            mock_popen.assert_called_with(
-                f"docker compose -f {docker_compose_file} down",
-                shell=True,
-                stdout=-1,
-                stderr=-1,
-                text=True
-            )
-            
-            # Verify status was updated
-            mock_save.assert_called_once()
-            assert mock_save.call_args[0][0]["installation_status"] == "configured"
-    
-    def test_restart_services_success(self):
-        """Test restart_services function with successful execution."""
-        docker_compose_file = "/home/user/.config/pi-pvarr/docker-compose/docker-compose.yml"
-        
-        with patch('os.path.exists', return_value=True), \
-             patch('src.core.config.get_config_dir', return_value="/home/user/.config/pi-pvarr"), \
-             patch('src.core.service_manager.get_docker_compose_cmd', return_value="docker compose"), \
-             patch('subprocess.Popen') as mock_popen:
-            
-            # Mock successful process execution
-            mock_process = MagicMock()
-            mock_process.returncode = 0
-            mock_process.communicate.return_value = ("Services restarted", "")
-            mock_popen.return_value = mock_process
-            
-            result = service_manager.restart_services()
-            
-            assert result["status"] == "success"
-            assert result["message"] == "Services restarted successfully"
-            assert result["output"] == "Services restarted"
-            
-            # Verify command was executed with correct parameters
-            mock_popen.assert_called_with(
-                f"docker compose -f {docker_compose_file} restart",
-                shell=True,
-                stdout=-1,
-                stderr=-1,
-                text=True
-            )
+        result = service_manager.start_services()
+        
+        assert result["status"] == "error"
+        assert "Error starting services" in result["message"]
+        assert result["output"] == "Error starting services"
+        assert patched_core.save_config_wrapper.call_count == 0
     
-    def test_get_installation_status_fixed(self):
+    def test_get_installation_status_fixed(self, assert_ok, docker_env, monkeypatch,
+                                           mock_service_info_summary):
         """Test get_installation_status function with a simplified approach."""
+        monkeypatch.setattr(config, 'get_config', lambda: {"installation_status": "running"})
+        monkeypatch.setattr(service_manager, 'get_service_info', lambda: mock_service_info_summary)
         
-        # Mock configuration
-        mock_config = {"installation_status": "running"}
-        
-        # Create a direct mock for get_service_info outside the patch
-        service_info_mock = {
-            "arr_apps": {
-                "sonarr": {"enabled": True, "status": "running"},
-                "radarr": {"enabled": True, "status": "running"}
-            },
-            "download_clients": {
-                "transmission": {"enabled": True, "status": "running"},
-                "nzbget": {"enabled": True, "status": "stopped"}
-            },
-            "media_servers": {
-                "jellyfin": {"enabled": True, "status": "running"}
-            },
-            "utilities": {
-                "portainer": {"enabled": True, "status": "running"}
-            }
-        }
+        # Get the actual result
+        result = service_manager.get_installation_status()
         
-        # Create patches
-        with patch('src.core.config.get_config', return_value=mock_config), \
-             patch('src.core.config.get_config_dir', return_value="/home/user/.config/pi-pvarr"), \
-             patch('os.path.exists', return_value=True), \
-             patch('src.core.service_manager.get_service_info', return_value=service_info_mock):
-            
-            # Get the actual result
-            result = service_manager.get_installation_status()
-            
-            # Test the basic result structure
-            assert result["status"] == "success"
-            assert result["installation_status"] == "running"
-            assert result["compose_file_exists"] is True
\ No newline at end of file
+        # Test the basic result structure
+        assert_ok(result)
+        assert result["installation_status"] == "running"
+        assert result["compose_file_exists"] is True
@@ -3,15 +3,63 @@ Unit tests for the storage manager module.
 """
 import os
 import pytest
+from collections import namedtuple
+from contextlib import nullcontext
 from unittest.mock import patch, mock_open, MagicMock, call
 
 from src.core import storage_manager
 
 
+# Plain stand-ins for psutil partitions and scandir entries; the code under
+# test only reads their attributes, so MagicMock's machinery is not needed
+_Partition = namedtuple('_Partition', ['device', 'mountpoint', 'fstype'])
+
+
+def _dir_stat(mode, uid, gid):
+    """Build an os.stat result for a directory with the given mode and owner."""
+    # mode, ino, dev, nlink, uid, gid, size, atime, mtime, ctime
+    return os.stat_result((0o040000 | mode, 0, 0, 2, uid, gid, 4096, 0, 0, 0))
+
+
+class _DirEntry:
+    """os.DirEntry stand-in that reports a fixed type."""
+
+    def __init__(self, is_dir):
+        self._is_dir = is_dir
+
+    def is_file(self, follow_symlinks=True):
+        return not self._is_dir
+
+    def is_dir(self, follow_symlinks=True):
+        return self._is_dir
+
+
 @pytest.mark.unit
 class TestStorageManager:
     """Tests for the storage_manager module."""
 
+    @pytest.fixture(autouse=True)
+    def _clear_cache(self):
+        """Keep cached disk usage readings from leaking between tests."""
+        storage_manager._clear_cache()
+        yield
+        storage_manager._clear_cache()
+
+    def test_disk_usage_reuses_statvfs(self):
+        """Test that repeated disk usage lookups share a single statvfs call."""
+        # bsize, frsize, blocks, bfree, bavail, files, ffree, favail, flag, namemax
+        mock_stat = os.statvfs_result((4096, 4096, 1000, 400, 350, 0, 0, 0, 0, 255))
+        with patch('os.statvfs', return_value=mock_stat) as mock_statvfs:
+            first = storage_manager._disk_usage('/mnt/media')
+            second = storage_manager._disk_usage('/mnt/media')
+        
+        mock_statvfs.assert_called_once_with('/mnt/media')
+        assert first == second
+        assert first.total == 1000 * 4096
+        assert first.used == 600 * 4096
+        assert first.free == 350 * 4096
+        assert first.percent == 63.2
+
     def test_get_drives_info(self):
         """Test getting drive information."""
         mock_devices = [
@@ -24,16 +72,17 @@ class TestStorageManager:
         ]
         mock_lsblk_output = {'blockdevices': mock_devices}
         
-        mock_disk_usage = MagicMock()
-        mock_disk_usage.total = 2000 * 1024 * 1024 * 1024  # 2TB
-        mock_disk_usage.used = 500 * 1024 * 1024 * 1024    # 500GB
-        mock_disk_usage.free = 1500 * 1024 * 1024 * 1024   # 1.5TB
-        mock_disk_usage.percent = 25
+        mock_disk_usage = storage_manager._DiskUsage(
+            total=2000 * 1024 * 1024 * 1024,  # 2TB
+            used=500 * 1024 * 1024 * 1024,    # 500GB
+            free=1500 * 1024 * 1024 * 1024,   # 1.5TB
+            percent=25
+        )
         
         with patch('subprocess.run') as mock_run, \
              patch('json.loads', return_value=mock_lsblk_output), \
-             patch('psutil.disk_usage', return_value=mock_disk_usage), \
-             patch('os.path.ismount', return_value=True):
+             patch('src.core.storage_manager._disk_usage', return_value=mock_disk_usage), \
+             patch('src.core.storage_manager._mountpoints', return_value=frozenset({'/mnt/media'})):
             
             mock_run.return_value.stdout = '{}'
             mock_run.return_value.returncode = 0
@@ -50,6 +99,40 @@ class TestStorageManager:
             assert 'is_usb' in drives_info[0]
             assert 'label' in drives_info[0]
 
+    def test_mountpoints(self):
+        """Test reading mount points from mountinfo, including escaped spaces."""
+        mock_mountinfo = (
+            "23 28 0:22 / /proc rw,relatime - proc proc rw\n"
+            "40 28 8:1 / /mnt/media rw,relatime - ext4 /dev/sda1 rw\n"
+            "41 28 8:17 / /mnt/usb\\040drive rw,relatime - vfat /dev/sdb1 rw\n"
+        )
+        with patch('builtins.open', mock_open(read_data=mock_mountinfo)):
+            mounted = storage_manager._mountpoints()
+        
+        assert mounted == frozenset({'/proc', '/mnt/media', '/mnt/usb drive'})
+
+    def test_get_drives_info_uses_lsblk_transport(self):
+        """Test that USB drives are detected from lsblk's TRAN column without a separate probe."""
+        mock_lsblk_output = {'blockdevices': [
+            {'name': 'sda', 'type': 'disk', 'size': '64G', 'tran': 'usb', 'children': [
+                {'name': 'sda1', 'type': 'part', 'size': '64G', 'fstype': 'vfat'}
+            ]}
+        ]}
+
+        with patch('subprocess.run') as mock_run, \
+             patch('json.loads', return_value=mock_lsblk_output), \
+             patch('src.core.storage_manager.get_usb_devices') as mock_get_usb_devices:
+
+            mock_run.return_value.stdout = '{}'
+            mock_run.return_value.returncode = 0
+
+            drives_info = storage_manager.get_drives_info()
+
+            assert len(drives_info) == 1
+            assert drives_info[0]['is_usb'] is True
+            mock_run.assert_called_once()
+            mock_get_usb_devices.assert_not_called()
+
     def test_get_drives_info_with_error(self):
         """Test handling errors when getting drive information."""
         with patch('subprocess.run', side_effect=Exception("Test error")):
@@ -60,8 +143,8 @@ class TestStorageManager:
     def test_get_mount_points(self):
         """Test getting mount points."""
         mock_partitions = [
-            MagicMock(device='/dev/sda1', mountpoint='/mnt/media', fstype='ext4'),
-            MagicMock(device='/dev/sdb1', mountpoint='/mnt/downloads', fstype='ext4')
+            _Partition('/dev/sda1', '/mnt/media', 'ext4'),
+            _Partition('/dev/sdb1', '/mnt/downloads', 'ext4')
         ]
         
         with patch('psutil.disk_partitions', return_value=mock_partitions):
@@ -72,6 +155,22 @@ class TestStorageManager:
             assert mount_points[0]['mountpoint'] == '/mnt/media'
             assert mount_points[0]['fstype'] == 'ext4'
 
+    def test_get_mount_points_reuses_snapshot(self):
+        """Test that mount points are only re-read after the mount table changes."""
+        mock_partitions = [_Partition('/dev/sda1', '/mnt/media', 'ext4')]
+        
+        with patch('psutil.disk_partitions', return_value=mock_partitions) as mock_disk_partitions, \
+             patch('src.core.storage_manager._mount_table_changed', side_effect=[True, False, True]):
+            
+            first = storage_manager.get_mount_points()
+            first[0]['mountpoint'] = 'changed by caller'
+            second = storage_manager.get_mount_points()
+            assert mock_disk_partitions.call_count == 1
+            assert second[0]['mountpoint'] == '/mnt/media'
+            
+            storage_manager.get_mount_points()
+            assert mock_disk_partitions.call_count == 2
+
     def test_mount_drive(self):
         """Test mounting a drive."""
         with patch('src.core.storage_manager.validate_device', return_value={'status': 'success'}), \
@@ -114,30 +213,27 @@ class TestStorageManager:
         """Test handling errors when unmounting a drive."""
         with patch('subprocess.run') as mock_run:
             mock_run.return_value.returncode = 1
-            mock_run.return_value.stderr = b'Unmount error'
+            mock_run.return_value.stderr = 'Unmount error'
             
             result = storage_manager.unmount_drive('/mnt/media')
             
             assert result['status'] == 'error'
-            assert 'Unmount error' in result['message']
+            assert result['message'] == "Failed to unmount /mnt/media: Unmount error"
 
     def test_get_directory_info(self):
         """Test getting directory information."""
-        mock_disk_usage = MagicMock()
-        mock_disk_usage.total = 1000 * 1024 * 1024 * 1024  # 1TB
-        mock_disk_usage.used = 300 * 1024 * 1024 * 1024    # 300GB
-        mock_disk_usage.free = 700 * 1024 * 1024 * 1024    # 700GB
-        mock_disk_usage.percent = 30
+        mock_disk_usage = storage_manager._DiskUsage(
+            total=1000 * 1024 * 1024 * 1024,  # 1TB
+            used=300 * 1024 * 1024 * 1024,    # 300GB
+            free=700 * 1024 * 1024 * 1024,    # 700GB
+            percent=30
+        )
         
-        mock_scandir_results = [
-            MagicMock(is_file=lambda: True),
-            MagicMock(is_file=lambda: True),
-            MagicMock(is_file=lambda: True),
-            MagicMock(is_dir=lambda: True),
-            MagicMock(is_dir=lambda: True)
-        ]
+        mock_scandir_results = nullcontext(iter(
+            [_DirEntry(is_dir=False)] * 3 + [_DirEntry(is_dir=True)] * 2
+        ))
         
-        with patch('psutil.disk_usage', return_value=mock_disk_usage), \
+        with patch('src.core.storage_manager._disk_usage', return_value=mock_disk_usage), \
              patch('os.scandir', return_value=mock_scandir_results), \
              patch('os.path.exists', return_value=True):
             
@@ -152,11 +248,12 @@ class TestStorageManager:
     def test_get_directories_info(self):
         """Test getting information for multiple directories."""
         with patch('src.core.storage_manager.get_directory_info') as mock_get_dir_info:
-            mock_get_dir_info.side_effect = [
-                {'path': '/mnt/media/Movies', 'size': '300.0 GB', 'files': 150, 'directories': 5, 'usage': 15},
-                {'path': '/mnt/media/TVShows', 'size': '200.0 GB', 'files': 500, 'directories': 20, 'usage': 10},
-                {'path': '/mnt/downloads', 'size': '100.0 GB', 'files': 25, 'directories': 3, 'usage': 5}
-            ]
+            # Lookups run concurrently, so answer by path rather than call order
+            mock_get_dir_info.side_effect = {
+                '/mnt/media/Movies': {'path': '/mnt/media/Movies', 'size': '300.0 GB', 'files': 150, 'directories': 5, 'usage': 15},
+                '/mnt/media/TVShows': {'path': '/mnt/media/TVShows', 'size': '200.0 GB', 'files': 500, 'directories': 20, 'usage': 10},
+                '/mnt/downloads': {'path': '/mnt/downloads', 'size': '100.0 GB', 'files': 25, 'directories': 3, 'usage': 5}
+            }.get
             
             dirs_info = storage_manager.get_directories_info([
                 '/mnt/media/Movies',
@@ -172,15 +269,34 @@ class TestStorageManager:
     def test_create_directory(self):
         """Test creating a directory."""
         with patch('os.makedirs') as mock_makedirs, \
-             patch('os.chown') as mock_chown, \
-             patch('os.chmod') as mock_chmod:
+             patch('os.open', return_value=42) as mock_os_open, \
+             patch('os.fchown') as mock_fchown, \
+             patch('os.fchmod') as mock_fchmod, \
+             patch('os.close') as mock_close:
             
             result = storage_manager.create_directory('/mnt/media/NewDir', 1000, 1000, 0o755)
             
             assert result['status'] == 'success'
             mock_makedirs.assert_called_once_with('/mnt/media/NewDir', exist_ok=True)
-            mock_chown.assert_called_once_with('/mnt/media/NewDir', 1000, 1000)
-            mock_chmod.assert_called_once_with('/mnt/media/NewDir', 0o755)
+            mock_os_open.assert_called_once_with('/mnt/media/NewDir', os.O_RDONLY | os.O_DIRECTORY)
+            mock_fchown.assert_called_once_with(42, 1000, 1000)
+            mock_fchmod.assert_called_once_with(42, 0o755)
+            mock_close.assert_called_once_with(42)
+
+    def test_create_directory_closes_fd_on_error(self):
+        """Test that the directory descriptor is closed when changing ownership fails."""
+        with patch('os.makedirs'), \
+             patch('os.open', return_value=42), \
+             patch('os.fchown', side_effect=PermissionError("Operation not permitted")), \
+             patch('os.fchmod') as mock_fchmod, \
+             patch('os.close') as mock_close:
+            
+            result = storage_manager.create_directory('/mnt/media/NewDir', 1000, 1000, 0o755)
+            
+            assert result['status'] == 'error'
+            assert 'Operation not permitted' in result['message']
+            mock_fchmod.assert_not_called()
+            mock_close.assert_called_once_with(42)
 
     def test_create_directory_with_error(self):
         """Test handling errors when creating a directory."""
@@ -219,6 +335,39 @@ class TestStorageManager:
             assert shares[1]['name'] == 'TVShows'
             assert shares[1]['path'] == '/mnt/media/TVShows'
 
+    def test_get_shares_reuses_parsed_config(self):
+        """Test that an unchanged smb.conf is only parsed once."""
+        mock_smb_content = "[global]\nworkgroup = WORKGROUP\n[Movies]\npath = /mnt/media/Movies\n"
+        
+        with patch('os.path.exists', return_value=True), \
+             patch('builtins.open', mock_open(read_data=mock_smb_content)):
+            
+            first = storage_manager.get_shares()
+            second = storage_manager.get_shares()
+        
+        assert first == second
+        assert first[0]['path'] == '/mnt/media/Movies'
+        assert storage_manager._parse_shares.cache_info().misses == 1
+
+    def test_iter_shares(self):
+        """Test iterating shares lazily and adding one whose name is a prefix of another."""
+        mock_smb_content = "[global]\nworkgroup = WORKGROUP\n[Movies]\npath = /mnt/media/Movies\n"
+        
+        with patch('os.path.exists', return_value=True), \
+             patch('builtins.open', mock_open(read_data=mock_smb_content)), \
+             patch('src.core.storage_manager._atomic_write'), \
+             patch('subprocess.run'):
+            
+            shares = storage_manager.iter_shares()
+            assert next(shares)['name'] == 'Movies'
+            assert next(shares, None) is None
+            
+            # Share names are compared exactly, not as substrings of the file
+            result = storage_manager.add_share({'name': 'Movie', 'path': '/mnt/media/Movie'})
+            assert result['status'] == 'success'
+            result = storage_manager.add_share({'name': 'Movies', 'path': '/mnt/media/Movies'})
+            assert result['status'] == 'error'
+
     def test_add_share(self):
         """Test adding a network share."""
         mock_smb_content = """
@@ -233,7 +382,8 @@ class TestStorageManager:
         """
         
         with patch('os.path.exists', return_value=True), \
-             patch('builtins.open', mock_open(read_data=mock_smb_content)) as mock_file, \
+             patch('builtins.open', mock_open(read_data=mock_smb_content)), \
+             patch('src.core.storage_manager._atomic_write') as mock_write, \
              patch('subprocess.run') as mock_run:
             
             mock_run.return_value.returncode = 0
@@ -248,7 +398,10 @@ class TestStorageManager:
             result = storage_manager.add_share(new_share)
             
             assert result['status'] == 'success'
-            mock_file().write.assert_called()
+            path, content = mock_write.call_args.args
+            assert path == '/etc/samba/smb.conf'
+            assert content.startswith(mock_smb_content)
+            assert '[TVShows]' in content
             mock_run.assert_called_once()
 
     def test_remove_share(self):
@@ -283,7 +436,8 @@ class TestStorageManager:
         
         mo = mock_open(read_data=mock_smb_content)
         with patch('os.path.exists', return_value=True), \
-             patch('builtins.open', mo) as mock_file, \
+             patch('builtins.open', mo), \
+             patch('src.core.storage_manager._atomic_write') as mock_write, \
              patch('subprocess.run') as mock_run:
             
             mock_run.return_value.returncode = 0
@@ -291,14 +445,15 @@ class TestStorageManager:
             result = storage_manager.remove_share('Movies')
             
             assert result['status'] == 'success'
-            mock_file().write.assert_called()
+            path, content = mock_write.call_args.args
+            assert path == '/etc/samba/smb.conf'
+            assert '[Movies]' not in content
+            assert '[TVShows]' in content
             mock_run.assert_called_once()
             
     def test_configure_samba(self):
         """Test configuring Samba."""
-        mock_file = mock_open()
-        
-        with patch('builtins.open', mock_file), \
+        with patch('src.core.storage_manager._atomic_write') as mock_write, \
              patch('src.core.storage_manager.add_share') as mock_add_share, \
              patch('subprocess.run') as mock_run:
             
@@ -316,9 +471,15 @@ class TestStorageManager:
             result = storage_manager.configure_samba(config)
             
             assert result['status'] == 'success'
-            mock_file.assert_called_once_with('/etc/samba/smb.conf', 'w', encoding='utf-8')
-            assert mock_add_share.call_count == 2
-            mock_run.assert_called_once_with(['systemctl', 'restart', 'smbd'], check=True)
+            mock_write.assert_called_once()
+            assert mock_write.call_args.args[0] == '/etc/samba/smb.conf'
+            content = mock_write.call_args.args[1]
+            assert content.startswith('[global]\nworkgroup = TESTGROUP\nserver string = Test Server\n')
+            # Shares are written with the global section rather than added one by one
+            assert '\n[media]\npath = /mnt/media\nvalid users = \nread only = yes\n' in content
+            assert '\n[downloads]\npath = /mnt/downloads\n' in content
+            mock_add_share.assert_not_called()
+            mock_run.assert_called_once_with(('systemctl', 'restart', 'smbd'), check=True)
             
     def test_configure_samba_with_error(self):
         """Test handling errors when configuring Samba."""
@@ -355,7 +516,9 @@ class TestStorageManager:
              patch('os.makedirs') as mock_makedirs, \
              patch('os.chown') as mock_chown, \
              patch('os.chmod') as mock_chmod, \
-             patch('src.core.storage_manager.create_directory', return_value={'status': 'success'}) as mock_create_dir:
+             patch('os.open', return_value=42) as mock_os_open, \
+             patch('os.close') as mock_close, \
+             patch('src.core.storage_manager._mk_child', return_value={'status': 'success'}) as mock_mk_child:
             
             result = storage_manager.create_media_directories('/mnt/media', 1000, 1000)
             
@@ -363,7 +526,19 @@ class TestStorageManager:
             mock_makedirs.assert_called_once_with('/mnt/media', exist_ok=True)
             mock_chown.assert_called_once_with('/mnt/media', 1000, 1000)
             mock_chmod.assert_called_once_with('/mnt/media', 0o755)
-            assert mock_create_dir.call_count == 5  # 5 standard media directories
+            # The base directory is opened once and every child is created through it
+            mock_os_open.assert_called_once_with('/mnt/media', os.O_RDONLY | os.O_DIRECTORY)
+            mock_close.assert_called_once_with(42)
+            assert mock_mk_child.call_count == 5  # 5 standard media directories
+            assert all(c.args[0] == 42 for c in mock_mk_child.call_args_list)
+
+    def test_create_media_directories_on_disk(self, tmp_path):
+        """Test creating media directories in a real base directory."""
+        result = storage_manager.create_media_directories(str(tmp_path), os.getuid(), os.getgid())
+        
+        assert result['status'] == 'success'
+        assert sorted(os.listdir(tmp_path)) == ['Books', 'Movies', 'Music', 'Photos', 'TVShows']
+        assert (tmp_path / 'Movies').stat().st_mode & 0o777 == 0o755
     
     def test_validate_device_block_device(self):
         """Test validating a block device."""
@@ -397,6 +572,24 @@ class TestStorageManager:
             assert result['status'] == 'success'
             assert mock_run.call_count >= 1
 
+    def test_validate_device_network_nfs_probes(self):
+        """Test that the NFS ping and showmount probes both run and are reported."""
+        returncodes = {'ping': 0, 'showmount': 1}
+        with patch('os.path.exists', return_value=True), \
+             patch('subprocess.run', side_effect=lambda cmd, **kwargs: MagicMock(returncode=returncodes[cmd[0]])) as mock_run:
+            
+            result = storage_manager.validate_device('192.168.1.100:/share', 'nfs')
+            
+            assert result['status'] == 'warning'
+            assert "doesn't respond to showmount" in result['message']
+            assert sorted(c.args[0][0] for c in mock_run.call_args_list) == ['ping', 'showmount']
+            
+            returncodes['ping'] = 1
+            result = storage_manager.validate_device('192.168.1.101:/share', 'nfs')
+            
+            assert result['status'] == 'error'
+            assert 'not reachable' in result['message']
+
     def test_validate_device_network_cifs(self):
         """Test validating a CIFS share."""
         with patch('subprocess.run') as mock_run:
@@ -408,6 +601,31 @@ class TestStorageManager:
             assert result['status'] == 'success'
             assert mock_run.call_count == 1
 
+    def test_validate_device_reuses_successful_ping(self):
+        """Test that shares on the same server only ping it once."""
+        with patch('subprocess.run') as mock_run:
+            
+            mock_run.return_value.returncode = 0
+            
+            for share in ('//192.168.1.100/movies', '//192.168.1.100/tv'):
+                result = storage_manager.validate_device(share, 'cifs')
+                assert result['status'] == 'success'
+            
+            assert mock_run.call_count == 1
+
+    def test_validate_device_retries_failed_ping(self):
+        """Test that a failed ping is not remembered."""
+        with patch('subprocess.run') as mock_run:
+            
+            mock_run.return_value.returncode = 1
+            result = storage_manager.validate_device('//192.168.1.100/movies', 'cifs')
+            assert result['status'] == 'error'
+            
+            mock_run.return_value.returncode = 0
+            result = storage_manager.validate_device('//192.168.1.100/movies', 'cifs')
+            assert result['status'] == 'success'
+            assert mock_run.call_count == 2
+
     def test_validate_device_invalid_format(self):
         """Test validating a device with invalid format."""
         # Test NFS with invalid format
@@ -423,34 +641,31 @@ class TestStorageManager:
     def test_verify_mount(self):
         """Test verifying a mount point."""
         with patch('os.path.ismount', return_value=True), \
+             patch('os.stat', return_value=_dir_stat(0o755, 1000, 1000)) as mock_stat, \
              patch('os.makedirs') as mock_makedirs, \
-             patch('os.chown') as mock_chown, \
-             patch('builtins.open', mock_open()), \
-             patch('os.unlink') as mock_unlink, \
-             patch('os.rmdir') as mock_rmdir, \
-             patch('psutil.disk_usage') as mock_disk_usage:
+             patch('os.statvfs') as mock_statvfs:
             
-            mock_disk_usage.return_value.free = 20 * 1024 * 1024 * 1024  # 20GB free
+            mock_statvfs.return_value.f_flag = 0
+            mock_statvfs.return_value.f_frsize = 4096
+            mock_statvfs.return_value.f_bavail = 20 * 1024 * 1024 * 1024 // 4096  # 20GB free
             
             result = storage_manager.verify_mount('/mnt/media', 1000, 1000)
             
             assert result['status'] == 'success'
-            mock_makedirs.assert_called_once()
-            mock_chown.assert_called_once()
-            mock_unlink.assert_called_once()
-            mock_rmdir.assert_called_once()
+            mock_stat.assert_called_once_with('/mnt/media')
+            mock_statvfs.assert_called_once_with('/mnt/media')
+            # No probe files are written to the mount
+            mock_makedirs.assert_not_called()
 
     def test_verify_mount_low_space(self):
         """Test verifying a mount point with low space."""
         with patch('os.path.ismount', return_value=True), \
-             patch('os.makedirs') as mock_makedirs, \
-             patch('os.chown') as mock_chown, \
-             patch('builtins.open', mock_open()), \
-             patch('os.unlink') as mock_unlink, \
-             patch('os.rmdir') as mock_rmdir, \
-             patch('psutil.disk_usage') as mock_disk_usage:
+             patch('os.stat', return_value=_dir_stat(0o755, 1000, 1000)), \
+             patch('os.statvfs') as mock_statvfs:
             
-            mock_disk_usage.return_value.free = 5 * 1024 * 1024 * 1024  # 5GB free
+            mock_statvfs.return_value.f_flag = 0
+            mock_statvfs.return_value.f_frsize = 4096
+            mock_statvfs.return_value.f_bavail = 5 * 1024 * 1024 * 1024 // 4096  # 5GB free
             
             result = storage_manager.verify_mount('/mnt/media', 1000, 1000)
             
@@ -467,14 +682,80 @@ class TestStorageManager:
 
     def test_verify_mount_permission_error(self):
         """Test verifying a mount point with permission error."""
+        # Owned by root and only writable by its owner
         with patch('os.path.ismount', return_value=True), \
-             patch('os.makedirs', side_effect=PermissionError("Permission denied")):
+             patch('os.stat', return_value=_dir_stat(0o755, 0, 0)), \
+             patch.object(storage_manager, '_user_groups', return_value={1000}), \
+             patch('os.statvfs') as mock_statvfs:
+            
+            mock_statvfs.return_value.f_flag = 0
             
             result = storage_manager.verify_mount('/mnt/media', 1000, 1000)
             
             assert result['status'] == 'error'
             assert 'Cannot write to mount point' in result['message']
 
+    @pytest.mark.parametrize('mode,owner,group,writable', [
+        (0o755, 1000, 0, True),    # Owner with write permission
+        (0o555, 1000, 0, False),   # Owner without write permission
+        (0o775, 0, 1000, True),    # Group with write permission
+        (0o755, 0, 1000, False),   # Group without write permission
+        (0o775, 0, 2000, True),    # Supplementary group with write permission
+        (0o777, 0, 0, True),       # Others with write permission
+        (0o557, 1000, 0, False),   # Owner bits apply even when others may write
+    ])
+    def test_can_write(self, mode, owner, group, writable):
+        """Test the write check for a target uid/gid against the directory mode."""
+        with patch.object(storage_manager, '_user_groups', return_value={1000, 2000}):
+            result = storage_manager._can_write('/mnt/media', _dir_stat(mode, owner, group), 1000, 1000)
+        assert result is writable
+
+    @pytest.mark.parametrize('access', [True, False])
+    def test_can_write_root_asks_kernel(self, access):
+        """Test that root is checked with os.access so root_squash on NFS is honoured."""
+        with patch('os.access', return_value=access) as mock_access:
+            result = storage_manager._can_write('/mnt/nfs', _dir_stat(0o777, 0, 0), 0, 0)
+        
+        assert result is access
+        mock_access.assert_called_once_with('/mnt/nfs', os.W_OK | os.X_OK)
+
+    def test_user_groups(self):
+        """Test that supplementary groups are looked up and unknown users fall back to gid."""
+        with patch('pwd.getpwuid') as mock_getpwuid, \
+             patch('os.getgrouplist', return_value=[1000, 44, 2000]) as mock_grouplist:
+            mock_getpwuid.return_value.pw_name = 'pi'
+            
+            assert storage_manager._user_groups(1000, 1000) == {1000, 44, 2000}
+            mock_grouplist.assert_called_once_with('pi', 1000)
+        
+        with patch('pwd.getpwuid', side_effect=KeyError(1000)):
+            assert storage_manager._user_groups(1000, 1000) == {1000}
+
+    def test_verify_mount_read_only(self):
+        """Test verifying a mount point on a read-only filesystem."""
+        with patch('os.path.ismount', return_value=True), \
+             patch('os.stat', return_value=_dir_stat(0o755, 1000, 1000)), \
+             patch('os.statvfs') as mock_statvfs:
+            
+            mock_statvfs.return_value.f_flag = os.ST_RDONLY
+            
+            result = storage_manager.verify_mount('/mnt/media', 1000, 1000)
+            
+            assert result['status'] == 'error'
+            assert 'read-only' in result['message']
+
+    def test_atomic_write(self, tmp_path):
+        """Test that an atomic write replaces the contents and keeps the file mode."""
+        target = tmp_path / 'fstab'
+        target.write_text('old\n')
+        target.chmod(0o600)
+        
+        storage_manager._atomic_write(str(target), 'new\n')
+        
+        assert target.read_text() == 'new\n'
+        assert target.stat().st_mode & 0o777 == 0o600
+        assert os.listdir(tmp_path) == ['fstab']
+
     def test_add_to_fstab(self):
         """Test adding an entry to fstab."""
         mock_blkid_output = 'abcdef12-3456-7890-abcd-1234567890ab\n'
@@ -485,7 +766,8 @@ UUID=12345 / ext4 defaults 0 1
         fstab_mock = mock_open(read_data=mock_fstab_content)
         
         with patch('subprocess.run') as mock_run, \
-             patch('builtins.open', fstab_mock):
+             patch('builtins.open', fstab_mock), \
+             patch('src.core.storage_manager._atomic_write') as mock_write:
             
             mock_run.return_value.returncode = 0
             mock_run.return_value.stdout = mock_blkid_output
@@ -494,8 +776,11 @@ UUID=12345 / ext4 defaults 0 1
             
             assert result['status'] == 'success'
             assert mock_run.call_count >= 1
-            # Check that write was called with the fstab line
-            assert any('Added by Pi-PVARR' in str(args) for args in fstab_mock().write.call_args_list)
+            # The whole file is rewritten with the new entry appended
+            path, content = mock_write.call_args.args
+            assert path == '/etc/fstab'
+            assert content.startswith(mock_fstab_content)
+            assert 'Added by Pi-PVARR' in content
 
     def test_add_to_fstab_network(self):
         """Test adding a network mount to fstab."""
@@ -505,12 +790,13 @@ UUID=12345 / ext4 defaults 0 1
 """
         fstab_mock = mock_open(read_data=mock_fstab_content)
         
-        with patch('builtins.open', fstab_mock):
+        with patch('builtins.open', fstab_mock), \
+             patch('src.core.storage_manager._atomic_write') as mock_write:
             result = storage_manager.add_to_fstab('192.168.1.100:/share', '/mnt/share', 'nfs', 'rw,soft,intr')
             
             assert result['status'] == 'success'
             # Should use direct path for network mounts, not UUID
-            assert '192.168.1.100:/share' in str(fstab_mock().write.call_args_list[-1])
+            assert '192.168.1.100:/share /mnt/share nfs' in mock_write.call_args.args[1]
 
     def test_add_to_fstab_existing(self):
         """Test adding an entry to fstab when it already exists."""
@@ -527,6 +813,22 @@ UUID=12345 / ext4 defaults 0 1
             assert result['status'] == 'warning'
             assert 'already exists' in result['message']
 
+    def test_add_to_fstab_similar_mountpoint(self):
+        """Test that a mount point sharing a prefix with an fstab entry is not a duplicate."""
+        mock_fstab_content = """
+# /etc/fstab
+/dev/sdb1 /mnt/media2 ext4 defaults 0 2
+"""
+        fstab_mock = mock_open(read_data=mock_fstab_content)
+        
+        with patch('src.core.storage_manager._get_uuid', return_value=''), \
+             patch('builtins.open', fstab_mock), \
+             patch('src.core.storage_manager._atomic_write') as mock_write:
+            result = storage_manager.add_to_fstab('/dev/sda1', '/mnt/media', 'ext4')
+            
+            assert result['status'] == 'success'
+            assert '/dev/sda1 /mnt/media ext4 defaults 0 2' in mock_write.call_args.args[1]
+
     def test_mount_drive_network(self):
         """Test mounting a network drive."""
         with patch('src.core.storage_manager.validate_device', return_value={'status': 'success', 'message': 'Valid'}), \
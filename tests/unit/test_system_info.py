@@ -10,6 +10,30 @@ from unittest.mock import patch, mock_open, MagicMock
 from src.core import system_info
 
 
+# Facts that system_info reads once per process
+_CACHED_READERS = (
+    system_info._read_device_model,
+    system_info._read_os_info,
+    system_info._get_cpu_model,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_temperature_fd(monkeypatch):
+    """Open the (patched) thermal zone afresh in every test."""
+    monkeypatch.setattr(system_info, '_temp_fd', None)
+
+
+@pytest.fixture(autouse=True)
+def _clear_static_caches():
+    """Read the patched files and platform values in every test."""
+    for reader in _CACHED_READERS:
+        reader.cache_clear()
+    yield
+    for reader in _CACHED_READERS:
+        reader.cache_clear()
+
+
 @pytest.mark.unit
 class TestSystemInfo:
     """Tests for the system_info module."""
@@ -33,6 +57,19 @@ class TestSystemInfo:
             assert os_info['release'] == '5.10.0'
             assert os_info['pretty_name'] == 'Debian GNU/Linux 11'
 
+    def test_get_os_info_reads_os_release_once(self):
+        """Test that os-release is read on the first call and copies are returned after."""
+        with patch('platform.system', return_value='Linux'), \
+             patch('os.path.exists', return_value=True), \
+             patch('builtins.open', mock_open(read_data='PRETTY_NAME="Debian GNU/Linux 12"\n')) as mock_file:
+            
+            first = system_info.get_os_info()
+            first['pretty_name'] = 'changed by caller'
+            second = system_info.get_os_info()
+            
+            assert second['pretty_name'] == 'Debian GNU/Linux 12'
+            mock_file.assert_called_once_with('/etc/os-release', 'r')
+
     def test_get_memory_info(self):
         """Test getting memory information."""
         mock_virtual_memory = MagicMock()
@@ -49,13 +86,12 @@ class TestSystemInfo:
 
     def test_get_disk_info(self):
         """Test getting disk information."""
-        mock_disk_usage = MagicMock()
-        mock_disk_usage.total = 32 * 1024 * 1024 * 1024  # 32GB
-        mock_disk_usage.free = 20 * 1024 * 1024 * 1024  # 20GB
-        mock_disk_usage.used = 12 * 1024 * 1024 * 1024  # 12GB
-        mock_disk_usage.percent = 37.5
+        mock_statvfs = MagicMock(f_frsize=4096)
+        mock_statvfs.f_blocks = 32 * 1024 * 1024 * 1024 // 4096  # 32GB
+        mock_statvfs.f_bfree = 20 * 1024 * 1024 * 1024 // 4096   # 20GB, no reserved blocks
+        mock_statvfs.f_bavail = 20 * 1024 * 1024 * 1024 // 4096  # 20GB
         
-        with patch('psutil.disk_usage', return_value=mock_disk_usage):
+        with patch('os.statvfs', return_value=mock_statvfs):
             disk_info = system_info.get_disk_info('/')
             
             assert disk_info['total'] == 32 * 1024 * 1024 * 1024
@@ -80,29 +116,56 @@ class TestSystemInfo:
         # Mock for Raspberry Pi temperature
         mock_temp_content = "45200\n"  # 45.2°C in millidegrees
         
-        with patch('os.path.exists', side_effect=lambda path: path == '/sys/class/thermal/thermal_zone0/temp'), \
-             patch('builtins.open', mock_open(read_data=mock_temp_content)):
+        with patch('os.open', return_value=42) as mock_os_open, \
+             patch('os.pread', return_value=mock_temp_content.encode()) as mock_pread:
+            
+            assert system_info.get_temperature() == 45.2
+            assert system_info.get_temperature() == 45.2
+            
+            # The thermal zone is opened once and re-read from the start
+            mock_os_open.assert_called_once_with('/sys/class/thermal/thermal_zone0/temp', os.O_RDONLY)
+            assert mock_pread.call_args_list == [((42, 16, 0),)] * 2
+
+    def test_get_temperature_unavailable(self):
+        """Test that a missing thermal zone falls back and is retried later."""
+        with patch('os.open', side_effect=FileNotFoundError) as mock_os_open, \
+             patch('os.path.exists', return_value=False):
             
-            temp = system_info.get_temperature()
-            assert temp == 45.2
+            assert system_info.get_temperature() is None
+            assert system_info.get_temperature() is None
+            assert mock_os_open.call_count == 2
 
     def test_is_raspberry_pi(self):
         """Test detecting Raspberry Pi."""
         with patch('os.path.exists', return_value=True), \
-             patch('builtins.open', mock_open(read_data='Raspberry Pi 4 Model B Rev 1.4\n')):
+             patch('builtins.open', mock_open(read_data=b'Raspberry Pi 4 Model B Rev 1.4\n')):
             
             result = system_info.is_raspberry_pi()
             assert result['is_raspberry_pi'] is True
             assert result['model'] == 'Raspberry Pi 4 Model B Rev 1.4'
 
+    def test_is_raspberry_pi_reads_model_once(self):
+        """Test that the device tree model is only read on the first check."""
+        with patch('os.path.exists', return_value=True), \
+             patch('builtins.open', mock_open(read_data=b'Raspberry Pi 5 Model B Rev 1.0\0')) as mock_file:
+            
+            system_info.is_raspberry_pi()
+            result = system_info.is_raspberry_pi()
+            
+            assert result['model'] == 'Raspberry Pi 5 Model B Rev 1.0'
+            mock_file.assert_called_once_with('/proc/device-tree/model', 'rb')
+
     def test_is_docker_installed(self):
         """Test detecting Docker installation."""
-        with patch('subprocess.run') as mock_run:
-            mock_run.return_value.returncode = 0
+        with patch('shutil.which', return_value='/usr/bin/docker') as mock_which, \
+             patch('subprocess.run') as mock_run:
             assert system_info.is_docker_installed() is True
             
-            mock_run.side_effect = Exception("Docker not found")
+            mock_which.return_value = None
             assert system_info.is_docker_installed() is False
+            
+            mock_which.assert_called_with('docker')
+            mock_run.assert_not_called()
 
     def test_get_system_info(self):
         """Test getting complete system information."""
@@ -123,4 +186,28 @@ class TestSystemInfo:
             assert system_info_data['memory_total'] == 4*1024*1024*1024
             assert system_info_data['temperature_celsius'] == 45.2
             assert system_info_data['docker_installed'] is True
-            assert system_info_data['raspberry_pi']['is_raspberry_pi'] is True
\ No newline at end of file
+            assert system_info_data['raspberry_pi']['is_raspberry_pi'] is True
+
+    def test_get_system_info_probe_error(self):
+        """Test that a failing probe still yields the minimal fallback information."""
+        # Every probe but the disk one is patched so nothing touches the host
+        with patch('src.core.system_info.get_hostname', return_value='raspberrypi'), \
+             patch('src.core.system_info.get_os_info', return_value={'name': 'linux', 'release': '5.10.0', 'pretty_name': 'Debian GNU/Linux 11'}), \
+             patch('src.core.system_info.get_memory_info', return_value={'total': 4*1024*1024*1024, 'available': 2*1024*1024*1024, 'used': 2*1024*1024*1024, 'percent': 50.0}), \
+             patch('src.core.system_info.get_disk_info', side_effect=RuntimeError("disk probe failed")), \
+             patch('src.core.system_info.get_cpu_info', return_value={'model': 'ARMv8', 'cores': 4, 'percent': 15.5}), \
+             patch('src.core.system_info.get_temperature', return_value=45.2), \
+             patch('src.core.system_info.is_raspberry_pi', return_value={'is_raspberry_pi': True, 'model': 'Raspberry Pi 4 Model B Rev 1.4'}), \
+             patch('src.core.system_info.is_docker_installed', return_value=True), \
+             patch('src.core.system_info.is_tailscale_installed', return_value=False), \
+             patch('src.core.system_info.get_network_info', return_value={}), \
+             patch('platform.node', return_value='raspberrypi'), \
+             patch('platform.system', return_value='Linux'), \
+             patch('platform.machine', return_value='aarch64'):
+            
+            system_info_data = system_info.get_system_info()
+            
+            assert system_info_data['error'] == 'disk probe failed'
+            assert system_info_data['hostname'] == 'raspberrypi'
+            assert system_info_data['platform'] == 'linux'
+            assert system_info_data['docker_installed'] is False